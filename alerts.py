@@ -0,0 +1,293 @@
+"""
+Price alerts, evaluated on every run as save_results stores it.
+
+Each book of the run is compared against the wishlist's latest state
+(latest_state.py) as it was before the run, so no history is read. The
+configured rules are compiled into checks over whole columns: with NumPy a
+rule is a handful of array operations for every book of the run at once;
+without it the same expressions run per book on floats. Missing values are
+NaN, which fails every comparison, so a new book never triggers a drop.
+
+Rule types (config "alerts.rules", each optionally limited to "wishlists"):
+
+- drop: the price fell by at least "amount" since the last observation
+- percent_drop: the price fell by at least "percent" percent
+- all_time_low: the price is below every earlier observation
+- below_target: the price is at or under the book's entry in "alerts.targets"
+- value_per_page_below: value_per_page is at or under "threshold"
+
+Alerts are deduplicated per (rule, ASIN, price): a book that stays under its
+target is reported once, and again only when the price moves. The keys sent
+in the last `dedupe_days` are kept in <dir>/sent.json. New alerts go to an
+outbox in <dir>:
+
+- jsonl: outbox.jsonl, one alert per line
+- mbox: outbox.mbox, one message per alert, for any mail client
+- webhook: webhook.jsonl, the POST requests a sender would make (a stub;
+  nothing leaves the machine)
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+from atomic_write import atomic_write
+from book_record import as_dicts
+from product_key import asin_of
+
+NAN = float("nan")
+np = None       # Loaded on the first evaluation; without numpy the checks run per book
+
+
+def _require_numpy():
+    """numpy, or None when it is not installed."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        return NAN
+    return float(value)
+
+
+# --- Rules ---
+# A check takes the run's columns (arrays, or floats for one book) and returns a mask (or a bool).
+# Comparisons are combined with `&`, which works on both.
+
+def _drop(amount):
+    return lambda c: (c["previous"] - c["price"]) >= amount
+
+def _percent_drop(percent):
+    return lambda c: (c["previous"] > 0) & ((c["previous"] - c["price"]) >= c["previous"] * (percent / 100))
+
+def _all_time_low():
+    return lambda c: c["price"] < c["low"]
+
+def _below_target():
+    return lambda c: c["price"] <= c["target"]
+
+def _value_per_page_below(threshold):
+    return lambda c: c["value_per_page"] <= threshold
+
+
+RULES = {
+    "drop": (_drop, ["amount"]),
+    "percent_drop": (_percent_drop, ["percent"]),
+    "all_time_low": (_all_time_low, []),
+    "below_target": (_below_target, []),
+    "value_per_page_below": (_value_per_page_below, ["threshold"]),
+}
+
+
+class Rule:
+    def __init__(self, spec):
+        kind = spec.get("type")
+        if kind not in RULES:
+            raise ValueError(f"Unknown alert rule '{kind}'. Choose from: {', '.join(RULES)}")
+        builder, params = RULES[kind]
+        missing = [p for p in params if p not in spec]
+        if missing:
+            raise ValueError(f"Alert rule '{kind}' needs: {', '.join(missing)}")
+        self.kind = kind
+        self.check = builder(*(spec[p] for p in params))
+        self.id = spec.get("name") or ":".join([kind] + [str(spec[p]) for p in params])
+        self.wishlists = set(spec["wishlists"]) if spec.get("wishlists") else None
+
+    def applies_to(self, wishlist_name):
+        return self.wishlists is None or wishlist_name in self.wishlists
+
+
+# --- Outboxes ---
+
+class JsonlOutbox:
+    name = "jsonl"
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, "outbox.jsonl")
+
+    def write(self, alerts):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(alert, ensure_ascii=False) + "\n" for alert in alerts)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def recent(self, limit=20):
+        if not os.path.exists(self.path): return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+        return [json.loads(line) for line in lines[-limit:]]
+
+
+class MboxOutbox:
+    name = "mbox"
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, "outbox.mbox")
+
+    def write(self, alerts):
+        import mailbox
+        from email.message import EmailMessage
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        box = mailbox.mbox(self.path)
+        box.lock()
+        try:
+            for alert in alerts:
+                message = EmailMessage()
+                message["From"] = "wishlist-alerts@localhost"
+                message["To"] = "me@localhost"
+                message["Subject"] = alert["message"]
+                message["Date"] = datetime.fromisoformat(alert["alerted_at"]).strftime("%a, %d %b %Y %H:%M:%S")
+                message.set_content(json.dumps(alert, indent=4, ensure_ascii=False))
+                box.add(message)
+            box.flush()
+        finally:
+            box.unlock()
+            box.close()
+
+    def recent(self, limit=20):
+        import mailbox
+        if not os.path.exists(self.path): return []
+        box = mailbox.mbox(self.path)
+        try:
+            return [json.loads(message.get_payload(decode=True)) for message in list(box)[-limit:]]
+        finally:
+            box.close()
+
+
+class WebhookOutbox(JsonlOutbox):
+    """Spools the requests a webhook sender would make; nothing is sent."""
+    name = "webhook"
+
+    def __init__(self, directory, webhook_url=None):
+        self.path = os.path.join(directory, "webhook.jsonl")
+        self.url = webhook_url
+
+    def write(self, alerts):
+        super().write({"method": "POST", "url": self.url, "body": alert} for alert in alerts)
+
+    def recent(self, limit=20):
+        return [request["body"] for request in super().recent(limit)]
+
+
+OUTBOXES = {"jsonl": JsonlOutbox, "mbox": MboxOutbox, "webhook": WebhookOutbox}
+
+
+def make_outbox(kind="jsonl", **options):
+    """An outbox by name; options an outbox does not take are ignored."""
+    if kind not in OUTBOXES:
+        raise ValueError(f"Unknown alert outbox '{kind}'. Choose from: {', '.join(OUTBOXES)}")
+    outbox_class = OUTBOXES[kind]
+    accepted = outbox_class.__init__.__code__.co_varnames
+    return outbox_class(**{key: value for key, value in options.items() if key in accepted})
+
+
+# --- Engine ---
+
+def _alert(book, rule, previous, low, now):
+    price = book.get("price")
+    known = _number(price) == _number(price)
+    decrease = previous - price if known and previous == previous else None
+    percent = round(decrease / previous * 100, 2) if decrease is not None and previous > 0 else None
+    title = (book.get("title") or asin_of(book))[:60]
+    shown = f"₹{price:g}" if known else "no price"
+    if decrease:
+        message = f"{title}: ₹{previous:g} -> {shown} ({rule.id})"
+    else:
+        message = f"{title}: {shown} ({rule.id})"
+    return {
+        "rule": rule.id, "message": message, "alerted_at": now,
+        "title": book.get("title"), "author": book.get("author"), "asin": asin_of(book), "link": book.get("link"),
+        "new_price": price, "old_price": previous if decrease is not None else None,
+        "price_decrease_abs": round(decrease, 2) if decrease is not None else None,
+        "price_decrease_perc": percent, "all_time_low": low if low == low else None,
+        "value_per_page": book.get("value_per_page"), "wishlist_name": book.get("wishlist_name"),
+        "format": book.get("format"),
+    }
+
+
+def matches(rules, columns):
+    """(rule, row) pairs for every rule that holds on a row of the columns."""
+    hits = []
+    if _require_numpy() is not None:
+        arrays = {key: np.asarray(values, dtype=np.float64) for key, values in columns.items()}
+        for rule in rules:
+            hits.extend((rule, int(i)) for i in np.flatnonzero(rule.check(arrays)))
+    else:
+        for i in range(len(columns["price"])):
+            row = {key: values[i] for key, values in columns.items()}
+            hits.extend((rule, i) for rule in rules if rule.check(row))
+    return hits
+
+
+class AlertEngine:
+    def __init__(self, rules, outbox, directory, targets=None, dedupe_days=90):
+        self.rules = [rule if isinstance(rule, Rule) else Rule(rule) for rule in rules]
+        self.outbox = outbox
+        self.targets = targets or {}
+        self.dedupe_days = dedupe_days
+        self.sent_path = os.path.join(directory, "sent.json")
+
+    def columns(self, books, state):
+        """price, previous (last known price), low (all-time low before this run), target and value_per_page."""
+        columns = {"price": [], "previous": [], "low": [], "target": [], "value_per_page": []}
+        for book in books:
+            entry = state.get(asin_of(book))
+            columns["price"].append(_number(book.get("price")))
+            columns["previous"].append(_number(entry["record"].get("price")) if entry else NAN)
+            columns["low"].append(_number(entry["min_price"]) if entry else NAN)
+            columns["target"].append(_number(self.targets.get(asin_of(book))))
+            columns["value_per_page"].append(_number(book.get("value_per_page")))
+        return columns
+
+    def evaluate(self, books, state, wishlist_name):
+        """Alerts raised by one run, against the wishlist's latest state before the run (not yet deduplicated)."""
+        rules = [rule for rule in self.rules if rule.applies_to(wishlist_name)]
+        books = [book for book in as_dicts(books) if asin_of(book)]
+        if not rules or not books:
+            return []
+        columns = self.columns(books, state)
+        now = datetime.now().isoformat(timespec="seconds")
+        return [_alert(books[i], rule, columns["previous"][i], columns["low"][i], now)
+                for rule, i in matches(rules, columns)]
+
+    def _load_sent(self):
+        if not os.path.exists(self.sent_path): return {}
+        try:
+            with open(self.sent_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+
+    def emit(self, alerts):
+        """Writes the alerts not sent before to the outbox; returns them."""
+        sent = self._load_sent()
+        fresh = []
+        for alert in alerts:
+            key = f"{alert['rule']}|{alert['asin']}|{alert['new_price']}"
+            if key not in sent:
+                sent[key] = alert["alerted_at"]
+                fresh.append(alert)
+        if fresh:
+            self.outbox.write(fresh)
+        cutoff = (datetime.now() - timedelta(days=self.dedupe_days)).isoformat(timespec="seconds")
+        sent = {key: at for key, at in sent.items() if at >= cutoff}
+        os.makedirs(os.path.dirname(self.sent_path), exist_ok=True)
+        atomic_write(self.sent_path, json.dumps(sent, ensure_ascii=False))
+        return fresh
+
+
+def from_config(settings, output_dir):
+    """The engine for the config's "alerts" section, or None when alerts are disabled."""
+    if not settings.get("enabled", True):
+        return None
+    directory = settings.get("dir") or os.path.join(output_dir, "alerts")
+    outbox = make_outbox(settings.get("outbox", "jsonl"), directory=directory, webhook_url=settings.get("webhook_url"))
+    return AlertEngine(settings.get("rules", []), outbox, directory, settings.get("targets"),
+                       settings.get("dedupe_days", 90))
@@ -0,0 +1,19 @@
+"""
+Amazon wishlist scraper as one importable package.
+
+A scrape is a Pipeline of three pluggable parts:
+
+- Fetcher (fetchers.py): product URL -> page HTML; selenium, http or async
+- Extractor (extractors.py): page HTML -> details dict
+- Store (stores.py): saves runs and streams history; json, jsonl or sqlite
+
+app.py is the application built on them (menu, CLI, daemon, distributed
+mode). The top-level scripts (6.py, 2.py ... wishlist_scraper.py) are thin
+entry points into this package. Nothing here imports Selenium, requests or
+aiohttp until a page is actually fetched.
+"""
+from .common import build_book_record, extract_price, load_config, save_config
+from .extractors import EXTRACTORS, AutoExtractor, Extractor, SoupExtractor, SpecExtractor, make_extractor
+from .fetchers import FETCHERS, AsyncHttpFetcher, Fetcher, HttpFetcher, SeleniumFetcher, make_fetcher, setup_driver
+from .pipeline import Pipeline
+from .stores import STORES, JsonlStore, JsonStore, SqliteStore, Store, make_store
@@ -0,0 +1,873 @@
+"""
+The wishlist scraper application: interactive menu, command line, daemon and
+distributed modes. Scraping itself goes through the package's Pipeline, so a
+fetcher, extractor or store improvement reaches every entry point.
+"""
+import argparse
+import time
+import json
+import signal
+import os
+import runpy
+import sys
+import glob
+from datetime import datetime
+# Selenium, requests, BeautifulSoup, pyarrow and numpy are imported where they are used,
+# so analyze/compare/export start without paying for the scraping stack. So are the
+# analytics, alert, budget, edition, snapshot and daemon modules: each command only
+# loads what it runs (see benchmarks/bench_startup.py).
+from driver_profile import PageStats, get_lean_settings, profile_name
+from json_stream import merge_json_array, iter_json_array
+from book_record import as_dicts
+from product_key import asin_of, canonical_record, canonical_url, record_key
+from refresh_planner import build_stats, change_probability, plan_refresh, refresh_from_list_view, run_budget
+
+from . import fetchers
+from .common import CONFIG_FILE, OUTPUT_DIR, PLAN_FILE, SORTS, extract_price, load_config
+from .extractors import make_extractor
+from .fetchers import FETCHERS, make_fetcher
+from .pipeline import Pipeline
+from .stores import STORES, make_store
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- Configuration ---
+stop_requested = False
+lean_settings = None  # Lean-page driver profile, loaded from config in configure()
+page_stats = None     # Per-run bandwidth/latency collector
+prefilter_pages = True  # Cut pages down to the extracted regions before parsing
+driver_pool = None      # Warm drivers shared across runs, only set in daemon mode
+store = None            # Where runs are saved and history is read from ('scraping.store')
+parquet_dir = None      # Partitioned Parquet export target, None when disabled
+price_index_dir = None  # Binary price-history index, None when disabled
+snapshot_settings = None  # Versioned all_wishlists.json snapshots, None when disabled
+alert_settings = {}     # The config's 'alerts' section
+alert_engine = None     # Price-alert rules and outbox, built by load_alert_engine()
+robot_check_settings = {}  # The 'scraping.robot_check' section
+breaker = None          # Robot-check circuit breaker of the run, built by run_breaker()
+keep_badge = False      # Record the "Customers usually keep this item" badge ('scraping.keep_badge')
+cover_dir = None        # Where cover images are downloaded ('scraping.cover_images'), None when disabled
+script_scraping = {}    # 'scraping' settings the entry-point script turns on (3.py, 4.py), see run()
+
+# --- Core Functions ---
+
+def setup_driver():
+    """A Chrome driver with the configured lean profile."""
+    return fetchers.setup_driver(lean_settings)
+
+def run_breaker():
+    """The run's robot-check circuit breaker, shared by its pipelines; None when disabled."""
+    global breaker
+    if breaker is None and robot_check_settings.get("enabled", True):
+        import robot_check
+        breaker = robot_check.from_config(robot_check_settings)
+    return breaker
+
+def load_alert_engine():
+    """The price-alert engine of the config, built on first use; None when alerts are disabled."""
+    global alert_engine
+    if alert_engine is None and alert_settings.get("enabled", True):
+        import alerts
+        alert_engine = alerts.from_config(alert_settings, OUTPUT_DIR)
+    return alert_engine
+
+def make_pipeline(backend="selenium", max_workers=4, parser_processes=None):
+    """Pipeline for one wishlist; in daemon mode the Selenium fetcher borrows the warm driver pool."""
+    fetcher = make_fetcher(backend, lean_settings=lean_settings, pool=driver_pool, workers=max_workers,
+                           page_stats=page_stats, prefilter=prefilter_pages, breaker=run_breaker())
+    fields = (["customers_keep_item"] if keep_badge else []) + (["image_url"] if cover_dir else [])
+    return Pipeline(fetcher, make_extractor(fields=fields), store, max_workers, parser_processes,
+                    stop_check=lambda: stop_requested)
+
+def acquire_driver():
+    """A driver from the warm pool in daemon mode, otherwise a fresh one."""
+    return driver_pool.acquire() if driver_pool else setup_driver()
+
+def release_driver(driver, broken=False):
+    if driver_pool: driver_pool.release(driver, broken)
+    else: driver.quit()
+
+def load_past_robot_check(driver, url, attempts=3):
+    """driver.get(url), retried behind the circuit breaker while Amazon answers with a robot check; False if it never got through."""
+    import robot_check
+    breaker = run_breaker()
+    for _ in range(attempts):
+        try:
+            if breaker: breaker.wait(lambda: stop_requested)
+        except robot_check.PageBlocked:
+            return False
+        driver.get(url)
+        signature = robot_check.detect(driver.page_source)
+        if not signature:
+            if breaker: breaker.success()
+            return True
+        print(f"🚧 Got a {signature} page for {url}")
+        if breaker: breaker.blocked(signature)
+    return False
+
+def enumerate_wishlist(wishlist_data, driver=None):
+    """Loads a wishlist page, scrolls until every item is present and returns unique book_data tuples."""
+    from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    name, url = wishlist_data["name"], wishlist_data["url"]
+    own_driver = driver is None
+    if own_driver: driver = setup_driver()
+
+    try:
+        if not load_past_robot_check(driver, url):
+            print(f"Skipping '{name}' for now: its wishlist page is behind a robot check.")
+            return []
+        try:
+            WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.ID, "sp-cc-accept"))).click()
+        except (TimeoutException, NoSuchElementException): pass
+
+        print("Scrolling to load all items...")
+        last_height = driver.execute_script("return document.body.scrollHeight")
+        while not stop_requested:
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            time.sleep(2)
+            try:
+                driver.find_element(By.CSS_SELECTOR, "span[data-action='show-more-items'] input").click()
+                time.sleep(2)
+            except (NoSuchElementException, TimeoutException): pass
+            new_height = driver.execute_script("return document.body.scrollHeight")
+            if new_height == last_height: break
+            last_height = new_height
+
+        items = WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li[data-itemid]")))
+        print(f"Found {len(items)} items on the page.")
+
+        book_data_list = []
+        for item in items:
+            try:
+                title_elem = item.find_element(By.CSS_SELECTOR, "h2.a-size-base a.a-link-normal")
+                title = title_elem.get_attribute("title").strip()
+                link = canonical_url(title_elem.get_attribute("href"))
+                price, initial_format = extract_book_price_and_format(item)
+                book_data_list.append((link, title, price, initial_format, name))
+            except (NoSuchElementException, StaleElementReferenceException): continue
+
+        unique_books = {asin_of(book[0]) or book[0]: book for book in book_data_list}
+        return list(unique_books.values())
+    finally:
+        if own_driver: driver.quit()
+
+def plan_wishlist_refresh(name, book_data_list, pages_per_hour):
+    """
+    Volatility-aware refresh: keeps new and likely-changed books within the page budget and
+    returns (book_data to scrape, last known records carried over for the skipped books).
+    """
+    stats = build_stats(iter_historical_data(name))
+    by_asin = {asin_of(book_data[0]): book_data for book_data in book_data_list}
+    asins = [asin for asin in by_asin if asin]
+    budget = run_budget(pages_per_hour, stats, asins)
+    selected, skipped = plan_refresh(asins, stats, budget)
+    latest = load_latest_state(name).records_by_asin()
+    carried = [latest[asin] for asin in skipped if asin in latest]
+    if selected:
+        now = datetime.now().timestamp()
+        known = [change_probability(stats[a], now) for a in selected if a in stats]
+        avg = sum(known) / len(known) if known else 0
+        print(f"📅 Refresh plan: {len(selected)} of {len(asins)} pages (budget {budget}), "
+              f"{len(selected) - len(known)} new, avg change probability {avg:.0%}")
+    selected_data = [by_asin[a] for a in selected] + [b for a, b in by_asin.items() if not a]
+    return selected_data, carried
+
+def iter_historical_data(wishlist_name):
+    """Streams a wishlist's history from the configured store, one record at a time."""
+    return (store or make_store()).history(wishlist_name)
+
+def load_latest_state(wishlist_name):
+    """The wishlist's latest record per ASIN, kept up to date by save_results."""
+    import latest_state
+    return latest_state.load(store or make_store(), wishlist_name, OUTPUT_DIR)
+
+def scrape_wishlist_concurrent(wishlist_data, max_workers=4, backend="selenium", parser_processes=None, refresh=None):
+    """Scrapes a wishlist, handling scrolling, and processes books concurrently."""
+    name = wishlist_data["name"]
+    mode = (refresh or {}).get("mode", "all")
+    driver = acquire_driver()
+    books, carried, list_records = [], [], []
+
+    try:
+        print(f"\n🚀 Processing Wishlist: {name}")
+        book_data_list = enumerate_wishlist(wishlist_data, driver)
+    finally:
+        release_driver(driver)
+
+    if mode == "prices_only":
+        list_records, book_data_list, reasons = refresh_from_list_view(
+            book_data_list, load_latest_state(name).records_by_asin(),
+            refresh.get("max_price_jump", 0.5), refresh.get("details_max_age_days", 30))
+        print(f"⚡ Prices-only: {len(list_records)} books updated from the list view; product pages needed for "
+              f"{len(book_data_list)}" + (f" ({', '.join(f'{n} {r}' for r, n in reasons.items())})" if reasons else ""))
+    elif mode == "volatility":
+        book_data_list, carried = plan_wishlist_refresh(name, book_data_list, refresh.get("pages_per_hour", 60))
+    print(f"Processing {len(book_data_list)} unique books with {max_workers} workers...")
+
+    if book_data_list:
+        with make_pipeline(backend, max_workers, parser_processes) as pipeline:
+            books = pipeline.scrape(book_data_list, f"Scraping '{name}'")
+        if pipeline.blocked:
+            # Still behind a robot check: keep their last known records, like the books a refresh plan skips
+            latest = load_latest_state(name).records_by_asin()
+            carried += [latest[asin] for asin in map(asin_of, (b[0] for b in pipeline.blocked)) if asin in latest]
+
+    books = list_records + books
+    if books:
+        save_results(books, name, carried)
+        print(f"\n✅ Saved {len(books)} books for '{name}' ({len(carried)} unchanged carried over).")
+    return books
+
+# --- Helper & Utility Functions ---
+
+def handle_interrupt(signum, frame):
+    global stop_requested
+    if not stop_requested:
+        stop_requested = True
+        print("\n🛑 Stop requested. Finishing current tasks and saving results...")
+        time.sleep(2)
+
+def extract_book_price_and_format(item):
+    from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+    from selenium.webdriver.common.by import By
+    price, item_format = None, "Unknown"
+    try:
+        price_text = item.find_element(By.CSS_SELECTOR, ".a-price .a-offscreen").get_attribute("innerHTML")
+        price = extract_price(price_text)
+    except (NoSuchElementException, StaleElementReferenceException): pass
+    try:
+        item_format = item.find_element(By.ID, "item-platform").text.strip()
+    except (NoSuchElementException, StaleElementReferenceException):
+        item_text = item.text.lower()
+        if "paperback" in item_text: item_format = "Paperback"
+        elif "hardcover" in item_text: item_format = "Hardcover"
+    return price, item_format
+
+def save_results(books, wishlist_name, carried=None):
+    """
+    Saves a wishlist run with the configured store and updates the combined file and exports.
+    `carried` records (skipped by the refresh planner) complete the snapshot but are not re-added to history.
+    """
+    if not books: return
+    import editions
+    import latest_state
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    # --- 1. Run Snapshot and History, in the configured store; upsert into the latest state ---
+    # Records are normalized here once (clean format, asin filled in, canonical /dp/ link),
+    # so list-view updates and records from older versions are stored the same way.
+    books = [canonical_record(dict(book, format=editions.clean_format(book.get("format")))) for book in as_dicts(books)]
+    carried = [canonical_record(record) for record in carried or []]
+    if cover_dir:
+        from cover_images import download_covers
+        downloaded = download_covers(books, cover_dir)
+        if downloaded: print(f"🖼️ Downloaded {downloaded} cover images to '{cover_dir}'.")
+    # Alerts compare the run with the state as it was before; they are written once everything is saved.
+    state = latest_state.load(store, wishlist_name, OUTPUT_DIR)
+    alert_engine = load_alert_engine()
+    raised = alert_engine.evaluate(books, state, wishlist_name) if alert_engine else []
+    store.save(books, wishlist_name, carried)
+    state.update(books)
+    state.save(latest_state.history_key(store, wishlist_name))
+    print(f"Updated historical data for '{wishlist_name}'.")
+
+    # --- 2. Update the Combined 'all_wishlists.json' File ---
+    # Existing entries are streamed through and replaced by wishlist and ASIN; new books are appended.
+    combined_json_path = os.path.join(OUTPUT_DIR, "all_wishlists.json")
+    try:
+        combined_count = merge_json_array(combined_json_path, books, record_key)
+    except json.JSONDecodeError:
+        print("Warning: Could not read combined wishlist file. A new one will be created.")
+        os.remove(combined_json_path)
+        combined_count = merge_json_array(combined_json_path, books, record_key)
+    print(f"✅ Updated combined 'all_wishlists.json' file with {combined_count} total unique items.")
+
+    # --- 3. Columnar Export for Analytics ---
+    if parquet_dir:
+        from parquet_export import export_run
+        try:
+            export_run(books, parquet_dir, f"{wishlist_name}_{timestamp}")
+            print(f"Exported {len(books)} rows to Parquet dataset '{parquet_dir}'.")
+        except RuntimeError as e:
+            print(f"Warning: {e}")
+
+    # --- 4. Binary Price-History Index ---
+    if price_index_dir:
+        from price_index import PriceIndex
+        index = PriceIndex(price_index_dir)
+        index.append(books)
+        index.close()
+
+    # --- 5. Price Alerts ---
+    if raised:
+        sent = alert_engine.emit(raised)
+        for alert in sent:
+            print(f"🔔 {alert['message']}")
+        print(f"{len(sent)} new price alerts ({len(raised) - len(sent)} already sent) in the {alert_engine.outbox.name} outbox.")
+
+# --- Main Application & CLI ---
+
+def load_analytics(wishlist_name):
+    """Rankings and summaries of the wishlist's latest records, or None without data (cached per history version)."""
+    import analytics
+    return analytics.load(store or make_store(), wishlist_name, OUTPUT_DIR)
+
+def format_filter(book_format):
+    """Matches records whose format is `book_format`; older records still carry the price in theirs."""
+    import editions
+    wanted = book_format.strip().lower()
+    return lambda book: editions.clean_format(book.get("format")).lower() == wanted
+
+def print_books(books, tiers=None):
+    from analytics import tier_label
+    for book in books:
+        price = f"₹{book['price']}" if book.get('price') else 'N/A'
+        reviews = book.get('reviews', 'N/A')
+        vpp = f"₹{book['value_per_page']:.2f}" if book.get('value_per_page') else 'N/A'
+        tier = tier_label(book.get('value_per_page'), tiers)
+        # You can add seller to the printout here if you wish, e.g., | Seller: {book.get('seller', 'N/A')}
+        print(f"- {book['title'][:50]:<50} | Price: {price:<10} | Reviews: {reviews:<10} | Value/Page: {vpp}"
+              + (f" ({tier})" if tier else ""))
+
+def print_summary(stats):
+    """Percentiles per field and the dashboard's value tiers."""
+    print(f"{'':<16}{'count':>7}{'min':>10}{'p25':>10}{'median':>10}{'p75':>10}{'p90':>10}{'max':>10}")
+    for field, summary in stats.summaries.items():
+        if not summary["count"]: continue
+        cells = "".join(f"{summary[key]:>10.2f}" for key in ("min", "p25", "p50", "p75", "p90", "max"))
+        print(f"{field:<16}{summary['count']:>7}{cells}")
+    if stats.tiers:
+        print(f"Value tiers: Best Value <= ₹{stats.tiers['best']:.2f}/page, Low Value > ₹{stats.tiers['worst']:.2f}/page")
+
+def analyze_data(wishlist_name):
+    stats = load_analytics(wishlist_name)
+    if stats is None:
+        print("No data found. Please scrape first.")
+        return
+
+    while True:
+        print("\n--- Data Analysis ---")
+        print("Sort by: 1. Price (Low to High)  2. Reviews (Most)  3. Value/Page (Best)  4. Back  5. Percentiles")
+        choice = input("Choose an option: ")
+
+        sorters = {'1': 'price', '2': 'reviews', '3': 'value'}
+        if choice in sorters:
+            print("\n--- Sorted Results (Top 15) ---")
+            print_books(stats.top(sorters[choice]), stats.tiers)
+            input("\nPress Enter to continue...")
+        elif choice == '4': break
+        elif choice == '5':
+            print()
+            print_summary(stats)
+            input("\nPress Enter to continue...")
+        else: print("Invalid choice.")
+
+def scrape_options(config):
+    """Keyword arguments for scrape_wishlist_concurrent from the 'scraping' config section."""
+    scraping = {**config.get("scraping", {}), **script_scraping}
+    return {
+        "max_workers": scraping.get("max_workers", 4),
+        "backend": scraping.get("backend", "selenium"),
+        "parser_processes": scraping.get("parser_processes"),
+        "refresh": scraping.get("refresh"),
+    }
+
+# --- Distributed Mode ---
+
+def distributed_worker(queue_path, worker_id=None, idle_exit=True):
+    """Worker process entry point: leases book jobs from the shared queue and scrapes them."""
+    from distributed import open_queue, run_worker
+    config = load_config()
+    start_run(config)
+    queue = open_queue(config, queue_path)
+    options = scrape_options(config)
+    print(f"👷 Worker {worker_id or ''} polling {queue.path}")
+    # One job at a time per worker, so one warm driver (or session) is enough.
+    with make_pipeline(options["backend"], 1, options["parser_processes"]) as pipeline:
+        processed = run_worker(queue, pipeline.process_book, worker_id, idle_exit=idle_exit,
+                               stop_check=lambda: stop_requested)
+    print(f"👷 Worker {worker_id or ''} processed {processed} books.")
+    finish_run()
+
+def scrape_distributed(config, wishlists, single_host=True):
+    """Coordinator: enumerates wishlists, publishes per-book jobs and ingests results into save_results."""
+    from distributed import new_run_id, open_queue, run_coordinator, run_single_host
+    queue = open_queue(config)
+    run_id = new_run_id()
+    print(f"Run {run_id} using queue {queue.path}")
+    start_run(config)
+    if single_host:
+        workers = config.get("distributed", {}).get("local_workers", config["scraping"]["max_workers"])
+        counts = run_single_host(queue, run_id, wishlists, enumerate_wishlist, save_results,
+                                 distributed_worker, workers)
+    else:
+        print("Waiting for workers. Start them on any host with menu option 7 and the same queue path.")
+        counts = run_coordinator(queue, run_id, wishlists, enumerate_wishlist, save_results,
+                                 stop_check=lambda: stop_requested)
+    print(f"Run {run_id} finished: {counts['done']} done, {counts['failed']} failed.")
+
+# --- Daemon Mode ---
+
+def scheduled_scrape(wishlist_data, config):
+    """One scheduled run of the daemon; the driver pool and HTTP sessions stay warm between runs."""
+    start_run(config)
+    try:
+        return scrape_wishlist_concurrent(wishlist_data, **scrape_options(config))
+    finally:
+        finish_run()
+
+def run_daemon(run_on_start=False):
+    """Runs the per-wishlist schedules from the 'daemon' config section until Ctrl+C."""
+    global driver_pool
+    from driver_pool import DriverPool
+    from scheduler_daemon import SchedulerDaemon
+    config = load_config()
+    settings = config.get("daemon", {})
+    start_run(config)
+    driver_pool = DriverPool(setup_driver, size=config["scraping"].get("max_workers", 4) + 1,
+                             max_uses=settings.get("driver_max_uses", 200))
+    daemon = SchedulerDaemon(load_config, scheduled_scrape, OUTPUT_DIR, CONFIG_FILE, run_on_start)
+    print("🗓️ Daemon started. Press Ctrl+C to stop; status in " + daemon.status_path)
+    try:
+        daemon.run_forever(stop_check=lambda: stop_requested)
+    except RuntimeError as e:
+        print(e)
+    finally:
+        driver_pool.close()
+        driver_pool = None
+
+def configure(config):
+    """Sets the driver profile, store and export targets from the config."""
+    global lean_settings, prefilter_pages, store, parquet_dir, price_index_dir, snapshot_settings
+    global alert_settings, alert_engine, robot_check_settings, breaker, keep_badge, cover_dir
+    lean_settings = get_lean_settings(config)
+    export = config.get("export", {})
+    # The script's settings are merged into a copy, so save_config never writes them to the file
+    scraping = {**config.get("scraping", {}), **script_scraping}
+    store = make_store(scraping.get("store", "json"), output_dir=OUTPUT_DIR,
+                       history_backups=export.get("history_backups", 3))
+    snapshots = config.get("snapshots", {})
+    snapshot_settings = snapshots if snapshots.get("enabled", True) else None
+    parquet_dir = export.get("parquet_dir", os.path.join(OUTPUT_DIR, "parquet")) if export.get("parquet") else None
+    price_index_dir = (export.get("price_index_dir", os.path.join(OUTPUT_DIR, "price_index"))
+                       if export.get("price_index", True) else None)
+    keep_badge = scraping.get("keep_badge", False)
+    covers = scraping.get("cover_images") or {}
+    cover_dir = covers.get("dir", os.path.join(OUTPUT_DIR, "images")) if covers.get("enabled") else None
+    # The badge and the cover sit outside the regions the pre-filter keeps
+    prefilter_pages = scraping.get("prefilter_html", True) and not (keep_badge or cover_dir)
+    # The breaker and the alert engine are built when a run first needs them
+    robot_check_settings = scraping.get("robot_check", {})
+    alert_settings = config.get("alerts", {})
+    breaker = alert_engine = None
+
+def start_run(config):
+    """Applies the config and resets the per-run page stats."""
+    global page_stats
+    configure(config)
+    page_stats = PageStats(profile_name(lean_settings))
+
+def finish_run():
+    if page_stats: page_stats.report(OUTPUT_DIR)
+    if breaker and breaker.blocked_pages:
+        summary = breaker.summary()
+        print(f"🚧 Robot checks this run: {summary['blocked_pages']} blocked pages, {summary['trips']} pauses"
+              + (", then fetching stopped." if summary["gave_up"] else "."))
+    if snapshot_settings: record_snapshot()
+
+def record_snapshot():
+    """Versions all_wishlists.json once per run and keeps the dashboard's current/previous pair up to date."""
+    combined_json_path = os.path.join(OUTPUT_DIR, "all_wishlists.json")
+    if not os.path.exists(combined_json_path): return
+    directory = snapshot_settings.get("dir", os.path.join(OUTPUT_DIR, "snapshots"))
+    publish_dir = snapshot_settings.get("publish_dir")
+    if snapshot_settings.get("format", "full") == "delta":
+        from delta_snapshots import DeltaStore
+        deltas = DeltaStore(os.path.join(directory, "delta"), snapshot_settings.get("base_every", 20))
+        version, created = deltas.add(iter_json_array(combined_json_path), datetime.now(), source=combined_json_path)
+        if created:
+            print(f"📸 Snapshot recorded as a {version['kind']} ({version['bytes']} bytes).")
+        else:
+            print("📸 all_wishlists.json unchanged since the last snapshot.")
+        if publish_dir:
+            deltas.write_pair(publish_dir)
+            print(f"Dashboard pair written to '{publish_dir}'.")
+        return
+    from snapshot_store import SnapshotStore
+    snapshots = SnapshotStore(directory)
+    version, created = snapshots.add(combined_json_path, datetime.now())
+    dropped = snapshots.apply_retention(daily_days=snapshot_settings.get("daily_days", 30),
+                                        weekly_weeks=snapshot_settings.get("weekly_weeks"))
+    if created:
+        print(f"📸 Snapshot {version['sha256'][:12]} recorded ({version['items']} items, {len(dropped)} old versions pruned).")
+    else:
+        print("📸 all_wishlists.json unchanged since the last snapshot.")
+    if publish_dir:
+        snapshots.publish(publish_dir)
+        print(f"Dashboard pair published to '{publish_dir}'.")
+
+def main():
+    signal.signal(signal.SIGINT, handle_interrupt)
+    config = load_config()
+    configure(config)
+
+    while True:
+        print("\n" + "="*40 + "\n      Amazon Wishlist Scraper 2.0\n" + "="*40)
+        print("1. Scrape All Wishlists\n2. Scrape a Single Wishlist\n3. Analyze Scraped Data\n4. Manage Wishlists (Edit Config)\n5. Exit")
+        print("6. Distributed Scrape (Coordinator)\n7. Distributed Worker\n8. Run Scheduler Daemon\n9. Daemon Status")
+        print("10. Quick Price Refresh (prices only)")
+        choice = input("Enter your choice (1-10): ")
+
+        if choice == '1':
+            start_run(config)
+            for w_data in config["wishlists"]:
+                if stop_requested: break
+                scrape_wishlist_concurrent(w_data, **scrape_options(config))
+            finish_run()
+        elif choice == '2':
+            for i, w in enumerate(config["wishlists"], 1): print(f"{i}. {w['name']}")
+            try:
+                idx = int(input("Select wishlist to scrape: ")) - 1
+                if 0 <= idx < len(config["wishlists"]):
+                    start_run(config)
+                    scrape_wishlist_concurrent(config["wishlists"][idx], **scrape_options(config))
+                    finish_run()
+                else: print("Invalid selection.")
+            except (ValueError, IndexError): print("Invalid selection.")
+        elif choice == '3':
+            for i, w in enumerate(config["wishlists"], 1): print(f"{i}. {w['name']}")
+            try:
+                idx = int(input("Select wishlist to analyze: ")) - 1
+                if 0 <= idx < len(config["wishlists"]):
+                    analyze_data(config["wishlists"][idx]['name'])
+                else: print("Invalid selection.")
+            except (ValueError, IndexError): print("Invalid selection.")
+        elif choice == '4':
+            print("To manage wishlists, please edit the 'wishlist_config.json' file directly.")
+            input("Press Enter to continue...")
+        elif choice == '5':
+            print("Goodbye!"); break
+        elif choice == '6':
+            mode = input("Run workers on this machine too? (y/n): ").strip().lower()
+            scrape_distributed(config, config["wishlists"], single_host=(mode != 'n'))
+        elif choice == '7':
+            default_path = config.get("distributed", {}).get("queue_path", "scraped_data/job_queue.sqlite")
+            queue_path = input(f"Queue file (Enter for '{default_path}'): ").strip() or default_path
+            distributed_worker(queue_path, idle_exit=False)
+        elif choice == '8':
+            now = input("Run every wishlist once right away? (y/n): ").strip().lower() == 'y'
+            run_daemon(run_on_start=now)
+        elif choice == '9':
+            from scheduler_daemon import print_status
+            print_status(OUTPUT_DIR)
+        elif choice == '10':
+            options = scrape_options(config)
+            options["refresh"] = dict(options.get("refresh") or {}, mode="prices_only")
+            start_run(config)
+            for w_data in config["wishlists"]:
+                if stop_requested: break
+                scrape_wishlist_concurrent(w_data, **options)
+            finish_run()
+        else:
+            print("Invalid choice. Please try again.")
+
+# --- Command Line ---
+# `python 6.py` alone opens the menu above; with a subcommand it runs headless, e.g. from cron:
+#   python 6.py scrape --all --backend http --workers 8
+#   python 6.py analyze --wishlist "IT Books" --sort value --top 20
+
+def cli_scrape(args, config):
+    if args.all:
+        wishlists = config["wishlists"]
+    else:
+        by_name = {w["name"]: w for w in config["wishlists"]}
+        unknown = [name for name in args.wishlist if name not in by_name]
+        if unknown:
+            print(f"Unknown wishlist(s): {', '.join(unknown)}. Configured: {', '.join(by_name)}")
+            return 2
+        wishlists = [by_name[name] for name in args.wishlist]
+    options = scrape_options(config)
+    if args.backend: options["backend"] = args.backend
+    if args.workers: options["max_workers"] = args.workers
+    if args.refresh: options["refresh"] = dict(options.get("refresh") or {}, mode=args.refresh)
+    if args.store: config.setdefault("scraping", {})["store"] = args.store
+    start_run(config)
+    try:
+        for w_data in wishlists:
+            if stop_requested: break
+            scrape_wishlist_concurrent(w_data, **options)
+    finally:
+        finish_run()
+    return 130 if stop_requested else 0
+
+def cli_analyze(args, config):
+    names = [w["name"] for w in config["wishlists"]] if args.all else args.wishlist
+    where = format_filter(args.format) if args.format else None
+    results, stats = {}, {}
+    for name in names:
+        stats[name] = load_analytics(name)
+        if stats[name] is None:
+            print(f"No data found for '{name}'. Please scrape first.", file=sys.stderr)
+            continue
+        results[name] = stats[name].top(args.sort, args.top, where)
+    if args.json and args.summary:
+        print(json.dumps({name: {"top": list(as_dicts(books)), "summaries": stats[name].summaries,
+                                 "tiers": stats[name].tiers} for name, books in results.items()},
+                         indent=4, ensure_ascii=False))
+    elif args.json:
+        print(json.dumps({name: list(as_dicts(books)) for name, books in results.items()}, indent=4, ensure_ascii=False))
+    else:
+        for name, books in results.items():
+            print(f"\n--- {name}: top {len(books)} by {args.sort} ---")
+            print_books(books, stats[name].tiers)
+            if args.summary:
+                print()
+                print_summary(stats[name])
+    return 0 if results else 1
+
+def cli_compare(args, config):
+    from compare.compare import compare_prices, save_to_json as save_comparison
+    old_path, new_path = args.old, args.new
+    if not (old_path and new_path):
+        from snapshot_store import SnapshotStore
+        snapshots = SnapshotStore(config.get("snapshots", {}).get("dir", os.path.join(OUTPUT_DIR, "snapshots")))
+        if snapshots.previous() is None:
+            print("Give OLD and NEW files, or record at least two snapshots first.")
+            return 2
+        old_path = old_path or snapshots.object_path(snapshots.previous()["sha256"])
+        new_path = new_path or snapshots.object_path(snapshots.current()["sha256"])
+    decreased = sorted(compare_prices(old_path, new_path), key=lambda b: b["price_decrease_perc"], reverse=True)
+    shown = decreased
+    if args.by_work:
+        import editions
+        work_of = editions.cluster(iter_json_array(new_path))
+        biggest = {}        # The first, i.e. biggest, drop of each work
+        for book in decreased:
+            book["work_id"] = work_of.get(book["asin"], book["asin"])
+            biggest.setdefault(book["work_id"], book)
+        shown = list(biggest.values())
+    if args.output:
+        save_comparison(decreased, args.output)
+        print(f"Saved {len(decreased)} books with decreased prices to '{args.output}'.")
+    for book in shown[:args.top]:
+        work = f" | {book['work_id']}" if args.by_work else ""
+        print(f"- {book['title'][:50]:<50} | ₹{book['old_price']} -> ₹{book['new_price']} ({book['price_decrease_perc']}% off){work}")
+    return 0
+
+def cli_works(args, config):
+    import editions
+    import latest_state
+    names = [w["name"] for w in config["wishlists"]] if args.all else args.wishlist
+    records = []
+    for name in names:
+        if latest_state.history_key(store, name) is None:
+            print(f"No data found for '{name}'. Please scrape first.", file=sys.stderr)
+            continue
+        records.extend(load_latest_state(name).records())
+    grouped = editions.works(records, args.threshold)
+    shown = {work_id: books for work_id, books in grouped.items() if len(books) >= args.min_editions}
+    if args.json:
+        print(json.dumps({work_id: [{"asin": asin_of(book), "title": book.get("title"), "price": book.get("price"),
+                                     "format": editions.clean_format(book.get("format")),
+                                     "wishlist_name": book.get("wishlist_name")} for book in books]
+                          for work_id, books in shown.items()}, indent=4, ensure_ascii=False))
+        return 0
+    for work_id, books in shown.items():
+        books = sorted(books, key=lambda b: (not b.get("price"), b.get("price") or 0))
+        print(f"\n{work_id} ({len(books)} editions)")
+        for i, book in enumerate(books):
+            price = f"₹{book['price']}" if book.get("price") else "N/A"
+            cheapest = " <- cheapest" if i == 0 and book.get("price") and len(books) > 1 else ""
+            print(f"  {editions.clean_format(book.get('format')):<22} {price:<10} {asin_of(book)}  {(book.get('title') or '')[:50]}{cheapest}")
+    print(f"\n{len(shown)} works with {args.min_editions}+ editions, out of {len(grouped)} works.")
+    return 0
+
+def cli_alerts(args, config):
+    alert_engine = load_alert_engine()
+    if alert_engine is None:
+        print("Alerts are disabled in the config ('alerts.enabled').")
+        return 2
+    recent = alert_engine.outbox.recent(args.last)
+    if args.json:
+        print(json.dumps(recent, indent=4, ensure_ascii=False))
+    elif not recent:
+        print(f"No alerts yet in the {alert_engine.outbox.name} outbox.")
+    for alert in ([] if args.json else recent):
+        print(f"{alert['alerted_at']}  {alert['message']}")
+    return 0
+
+def cli_budget(args, config):
+    import budget
+    import latest_state
+    settings = config.get("budget", {})
+    ratings = budget.load_ratings(args.ratings or settings.get("ratings_file", "my_ratings.json"))
+    names = [w["name"] for w in config["wishlists"]] if args.all else args.wishlist
+    where = format_filter(args.format) if args.format else None
+    records, seen = [], set()
+    for name in names:
+        if latest_state.history_key(store, name) is None:
+            print(f"No data found for '{name}'. Please scrape first.", file=sys.stderr)
+            continue
+        for record in load_latest_state(name).records():
+            if asin_of(record) not in seen and (where is None or where(record)):
+                seen.add(asin_of(record))
+                records.append(record)
+    if not records:
+        return 1
+    result = budget.plan(records, args.budget, ratings, settings.get("weights"))
+    out = args.out or os.path.join(OUTPUT_DIR, PLAN_FILE)
+    budget.export_plan(result, out)
+    if args.json:
+        print(json.dumps(result, indent=4, ensure_ascii=False))
+        return 0
+    for book in result["books"]:
+        stars = "★" * int(round(min(5, max(0, book["importance_rating"])))) or "-"
+        print(f"- {(book['title'] or '')[:50]:<50} | ₹{book['price']:>8} | {stars:<5} | utility {book['utility']}")
+    print(f"\n{len(result['books'])} of {result['candidates']} books for ₹{result['total_price']:,} "
+          f"of ₹{result['budget']:,} (utility {result['total_utility']})"
+          + ("" if result["optimal"] else ", best found within the search limit") + f". Saved to '{out}'.")
+    if not ratings:
+        print("No importance ratings found; export my_ratings.json from the dashboard and pass --ratings.")
+    return 0
+
+def cli_export(args, config):
+    export = config.get("export", {})
+    if args.target == "parquet":
+        from parquet_export import backfill
+        backfill(".", args.out or export.get("parquet_dir", os.path.join(OUTPUT_DIR, "parquet")))
+    elif args.target == "price-index":
+        from price_index import build
+        build(OUTPUT_DIR, args.out or export.get("price_index_dir", os.path.join(OUTPUT_DIR, "price_index")))
+    else:
+        if snapshot_settings is None:
+            print("Snapshots are disabled in the config ('snapshots.enabled').")
+            return 2
+        if not args.out and not snapshot_settings.get("publish_dir"):
+            print("Give --out DIR or set snapshots.publish_dir.")
+            return 2
+        snapshot_settings["publish_dir"] = args.out or snapshot_settings["publish_dir"]
+        record_snapshot()
+    return 0
+
+def cli_migrate(args, config):
+    import migrate_keys
+    migrate_keys.run(OUTPUT_DIR, args.files, args.dry_run, config.get("export", {}).get("history_backups", 3),
+                     not args.no_dashboards)
+    return 0
+
+def cli_bench(args, config):
+    sys.argv = [f"benchmarks.bench_{args.name}"] + args.args
+    runpy.run_module(f"benchmarks.bench_{args.name}", run_name="__main__", alter_sys=True)
+    return 0
+
+def cli_daemon(args, config):
+    run_daemon(run_on_start=args.now)
+    return 0
+
+def cli_status(args, config):
+    from scheduler_daemon import print_status
+    print_status(OUTPUT_DIR)
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Amazon wishlist scraper. Without a command, opens the interactive menu.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scrape = sub.add_parser("scrape", help="scrape wishlists from the config")
+    which = scrape.add_mutually_exclusive_group(required=True)
+    which.add_argument("--all", action="store_true", help="every configured wishlist")
+    which.add_argument("--wishlist", action="append", metavar="NAME", help="a wishlist by name (repeatable)")
+    scrape.add_argument("--backend", choices=list(FETCHERS))
+    scrape.add_argument("--store", choices=list(STORES))
+    scrape.add_argument("--workers", type=int, metavar="N")
+    scrape.add_argument("--refresh", choices=["all", "volatility", "prices_only"])
+    scrape.set_defaults(handler=cli_scrape)
+
+    analyze = sub.add_parser("analyze", help="top books from the saved history")
+    which = analyze.add_mutually_exclusive_group(required=True)
+    which.add_argument("--all", action="store_true")
+    which.add_argument("--wishlist", action="append", metavar="NAME")
+    analyze.add_argument("--sort", choices=list(SORTS), default="price")
+    analyze.add_argument("--top", type=int, default=15)
+    analyze.add_argument("--format", help="only books in this format, e.g. Paperback")
+    analyze.add_argument("--summary", action="store_true", help="add percentiles and the value tiers")
+    analyze.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    analyze.set_defaults(handler=cli_analyze)
+
+    compare = sub.add_parser("compare", help="books whose price dropped between two combined files")
+    compare.add_argument("old", nargs="?", help="default: the previous snapshot")
+    compare.add_argument("new", nargs="?", help="default: the current snapshot")
+    compare.add_argument("-o", "--output", help="also save the result as JSON")
+    compare.add_argument("--top", type=int, default=20)
+    compare.add_argument("--by-work", action="store_true", help="group editions of the same work, biggest drop first")
+    compare.set_defaults(handler=cli_compare)
+
+    works = sub.add_parser("works", help="editions of the same work across formats")
+    which = works.add_mutually_exclusive_group(required=True)
+    which.add_argument("--all", action="store_true")
+    which.add_argument("--wishlist", action="append", metavar="NAME")
+    works.add_argument("--min-editions", type=int, default=2)
+    works.add_argument("--threshold", type=float, default=0.8, help="title similarity needed (Jaccard)")
+    works.add_argument("--json", action="store_true")
+    works.set_defaults(handler=cli_works)
+
+    plan = sub.add_parser("budget", help="the best books to buy within a budget")
+    which = plan.add_mutually_exclusive_group(required=True)
+    which.add_argument("--all", action="store_true")
+    which.add_argument("--wishlist", action="append", metavar="NAME")
+    plan.add_argument("--budget", type=float, required=True, metavar="RUPEES")
+    plan.add_argument("--ratings", help="the dashboard's my_ratings.json (default from the 'budget' config)")
+    plan.add_argument("--format", help="only books in this format, e.g. Paperback")
+    plan.add_argument("--out", help=f"where to write the plan (default {os.path.join(OUTPUT_DIR, PLAN_FILE)})")
+    plan.add_argument("--json", action="store_true")
+    plan.set_defaults(handler=cli_budget)
+
+    alerts_cmd = sub.add_parser("alerts", help="recent price alerts from the outbox")
+    alerts_cmd.add_argument("--last", type=int, default=20)
+    alerts_cmd.add_argument("--json", action="store_true")
+    alerts_cmd.set_defaults(handler=cli_alerts)
+
+    export = sub.add_parser("export", help="write derived data sets")
+    export.add_argument("target", choices=["parquet", "price-index", "snapshots"])
+    export.add_argument("--out", help="output directory (default from the 'export'/'snapshots' config)")
+    export.set_defaults(handler=cli_export)
+
+    migrate = sub.add_parser("migrate", help="re-key saved data by ASIN with canonical /dp/ links")
+    migrate.add_argument("files", nargs="*", help="extra combined files (web*/all_wishlists.json are included)")
+    migrate.add_argument("--no-dashboards", action="store_true", help="leave the web*/all_wishlists.json files alone")
+    migrate.add_argument("--dry-run", action="store_true", help="only report what would change")
+    migrate.set_defaults(handler=cli_migrate)
+
+    benches = sorted(os.path.basename(p)[len("bench_"):-len(".py")]
+                     for p in glob.glob(os.path.join(ROOT, "benchmarks", "bench_*.py")))
+    bench = sub.add_parser("bench", help="run a benchmark from benchmarks/")
+    bench.add_argument("name", choices=benches)
+    bench.add_argument("args", nargs=argparse.REMAINDER, help="passed on to the benchmark")
+    bench.set_defaults(handler=cli_bench)
+
+    daemon = sub.add_parser("daemon", help="run the scheduler daemon until Ctrl+C")
+    daemon.add_argument("--now", action="store_true", help="run every wishlist once right away")
+    daemon.set_defaults(handler=cli_daemon)
+    sub.add_parser("status", help="print the daemon status").set_defaults(handler=cli_status)
+    return parser
+
+def run_cli(argv):
+    args = build_parser().parse_args(argv)
+    signal.signal(signal.SIGINT, handle_interrupt)
+    config = load_config()
+    configure(config)
+    return args.handler(args, config)
+
+def run(argv=None, scraping=None):
+    """
+    Entry point of the script shims: the CLI when arguments are given, otherwise the menu.
+    `scraping` settings override the config's for this process, e.g. {"keep_badge": True}.
+    """
+    script_scraping.update(scraping or {})
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        sys.exit(run_cli(argv))
+    main()
@@ -0,0 +1,128 @@
+"""
+Pieces every entry point shares: the book record layout, price parsing,
+progress output and the config file.
+"""
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+from atomic_write import atomic_open
+from editions import clean_format
+
+CONFIG_FILE = "wishlist_config.json"
+OUTPUT_DIR = "scraped_data"
+
+DEFAULT_CONFIG = {
+    "wishlists": [
+        {"name": "Business Books", "url": "https://www.amazon.in/hz/wishlist/ls/1YZ6P9CMSTI9C?ref_=wl_share"},
+        {"name": "General Books", "url": "https://www.amazon.in/hz/wishlist/ls/1VY69P3F07HC8?ref_=wl_share"},
+        {"name": "IT Books", "url": "https://www.amazon.in/hz/wishlist/ls/OPIB1KQBJDHR?ref_=wl_share"},
+        {"name": "Hardcover Books", "url": "https://www.amazon.in/hz/wishlist/ls/31VZFN51IPTZX?ref_=wl_share"},
+        {"name": "Biography Books", "url": "https://www.amazon.in/hz/wishlist/ls/1YHK51DVJYR2A?ref_=wl_share"},
+        {"name": "Penguin Books", "url": "https://www.amazon.in/hz/wishlist/ls/SO8O8O4HHG4?ref_=wl_share"},
+    ],
+    "scraping": {
+        "max_workers": 4, "backend": "selenium", "store": "json", "parser_processes": None, "prefilter_html": True,
+        "lean_profile": {"enabled": True, "extra_blocked_urls": []},
+        "robot_check": {"enabled": True, "threshold": 2, "pause": 15, "max_pause": 300, "max_trips": 4},
+        "keep_badge": False, "cover_images": {"enabled": False, "dir": "scraped_data/images"},
+        "refresh": {"mode": "all", "pages_per_hour": 60, "max_price_jump": 0.5, "details_max_age_days": 30}
+    },
+    "distributed": {
+        "queue_path": "scraped_data/job_queue.sqlite", "visibility_timeout": 300,
+        "max_attempts": 3, "local_workers": 4
+    },
+    "export": {
+        "parquet": False, "parquet_dir": "scraped_data/parquet",
+        "price_index": True, "price_index_dir": "scraped_data/price_index",
+        "history_backups": 3
+    },
+    "snapshots": {
+        "enabled": True, "format": "full", "dir": "scraped_data/snapshots", "daily_days": 30,
+        "weekly_weeks": None, "base_every": 20, "publish_dir": None
+    },
+    "alerts": {
+        "enabled": True, "outbox": "jsonl", "dir": "scraped_data/alerts", "webhook_url": None,
+        "rules": [{"type": "percent_drop", "percent": 10}, {"type": "all_time_low"}],
+        "targets": {}, "dedupe_days": 90
+    },
+    "budget": {
+        "ratings_file": "my_ratings.json",
+        "weights": {"importance": 0.5, "rating": 0.3, "value": 0.2}
+    },
+    "daemon": {
+        "default": {"interval_minutes": 1440}, "jitter_seconds": 300,
+        "driver_max_uses": 200, "wishlists": {}
+    }
+}
+
+CSV_FIELDS = [
+    "title", "author", "price", "pages", "reviews", "avg_rating",
+    "seller", "value_per_page", "link", "asin", "wishlist_name", "format",
+    "scraped_timestamp"
+]
+# Only in records scraped with the matching option (scraping.keep_badge, scraping.cover_images)
+OPTIONAL_FIELDS = ["customers_keep_item", "image_url", "image_file_path"]
+
+# analyze's sort keys (used by analytics.py) and the budget plan's file name, here so
+# the CLI parser knows them without importing analytics.py or budget.py
+SORTS = {"price": ("price", False), "reviews": ("reviews", True), "value": ("value_per_page", False)}
+PLAN_FILE = "budget_plan.json"
+
+_PRICE_RE = re.compile(r'₹\s*([\d,]+\.\d+|[\d,]+)')
+_progress_lock = threading.Lock()
+
+
+def extract_price(text):
+    """Extracts a float price from a string."""
+    if not text:
+        return None
+    match = _PRICE_RE.search(text)
+    return float(match.group(1).replace(',', '')) if match else None
+
+
+def build_book_record(book_data, details):
+    """
+    Combines the wishlist-level data, a (link, title, price, format, wishlist_name)
+    tuple, with the product-page details.
+    """
+    link, title, price, initial_format, wishlist_name = book_data
+    value_per_page = None
+    if price and details.get("page_count") and details["page_count"] > 0:
+        value_per_page = price / details["page_count"]
+
+    record = {
+        "title": title, "author": details.get("author"), "price": price,
+        "pages": details.get("page_count"), "reviews": details.get("review_count"),
+        "avg_rating": details.get("avg_rating"), "link": link, "asin": details.get("asin"),
+        "seller": details.get("seller"), "value_per_page": value_per_page,
+        "wishlist_name": wishlist_name, "format": clean_format(details.get("book_format", initial_format)),
+        "scraped_timestamp": datetime.now().isoformat()
+    }
+    record.update((field, details[field]) for field in OPTIONAL_FIELDS if field in details)
+    return record
+
+
+def print_progress(iteration, total, prefix=''):
+    if not total: return
+    with _progress_lock:
+        percent = int(100 * (iteration / float(total)))
+        bar = '█' * (percent // 2) + '-' * (50 - percent // 2)
+        print(f'\r{prefix} |{bar}| {percent}% ({iteration}/{total})', end='\r')
+        if iteration == total: print()
+
+
+def load_config(path=CONFIG_FILE, default=DEFAULT_CONFIG):
+    """Reads the config file, writing `default` first if there is none yet."""
+    if not os.path.exists(path):
+        save_config(default, path)
+        return json.loads(json.dumps(default))
+    with open(path, "r", encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_config(config, path=CONFIG_FILE):
+    with atomic_open(path) as f:
+        json.dump(config, f, indent=4)
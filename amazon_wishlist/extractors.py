@@ -0,0 +1,120 @@
+"""
+Extractors turn one product page into the details dict (the keys of
+`product_parser.empty_details`), or None when the page has no product title.
+
+- SpecExtractor: the precompiled lxml spec in extraction_spec.py
+- SoupExtractor: the BeautifulSoup cascade, the fallback without lxml
+- AutoExtractor: the spec when lxml is installed, else BeautifulSoup
+
+`make_extractor(fields=...)` adds optional fields read straight from the
+page (PAGE_FIELDS), which 3.py and 4.py turn on:
+
+- customers_keep_item: the "Customers usually keep this item" badge
+- image_url: the largest cover image, downloaded by cover_images.py
+
+They sit outside the regions html_prefilter keeps, so they need the full page.
+
+Extractors are plain picklable objects, so the Pipeline can ship them to a
+process pool along with the page.
+"""
+import html
+import json
+import re
+
+KEEP_BADGE_TEXTS = [b"customers usually keep this item", b"fewer returns than average"]
+_COVER_TAG_RE = re.compile(rb'<img\b[^>]*?\bid=["\'](?:landingImage|imgBlkFront|ebooksImgBlkFront)["\'][^>]*>')
+_ATTR_RES = {name: re.compile(rb'\b' + name.encode() + rb'=(["\'])(.*?)\1', re.DOTALL)
+             for name in ("data-a-dynamic-image", "data-old-hires", "src")}
+
+
+def _as_bytes(page):
+    return page.encode("utf-8", "ignore") if isinstance(page, str) else page
+
+
+def keep_badge(page):
+    """Whether the page shows the "Customers usually keep this item" badge."""
+    text = _as_bytes(page).lower()
+    return any(marker in text for marker in KEEP_BADGE_TEXTS)
+
+
+def cover_image_url(page):
+    """URL of the largest version of the main product image, or None."""
+    tag = _COVER_TAG_RE.search(_as_bytes(page))
+    if not tag:
+        return None
+    attrs = {name: match.group(2).decode("utf-8", "ignore")
+             for name, pattern in _ATTR_RES.items() if (match := pattern.search(tag.group(0)))}
+    try:
+        # {"url": [width, height], ...}, one entry per size
+        sizes = json.loads(html.unescape(attrs.get("data-a-dynamic-image", "")))
+        return max(sizes, key=lambda url: sizes[url][0] * sizes[url][1])
+    except (ValueError, TypeError, IndexError):
+        pass
+    for name in ("data-old-hires", "src"):
+        if attrs.get(name, "").startswith("http"):
+            return html.unescape(attrs[name])
+    return None
+
+
+PAGE_FIELDS = {"customers_keep_item": keep_badge, "image_url": cover_image_url}
+
+
+class Extractor:
+    name = None
+
+    def extract(self, page, link):
+        raise NotImplementedError
+
+
+class SpecExtractor(Extractor):
+    name = "spec"
+
+    def extract(self, page, link):
+        from extraction_spec import extract_details
+        return extract_details(page, link)
+
+
+class SoupExtractor(Extractor):
+    name = "soup"
+
+    def extract(self, page, link):
+        from product_parser import parse_product_page_bs4
+        return parse_product_page_bs4(page, link)
+
+
+class AutoExtractor(Extractor):
+    name = "auto"
+
+    def extract(self, page, link):
+        from product_parser import parse_product_page
+        return parse_product_page(page, link)
+
+
+class FieldsExtractor(Extractor):
+    """Another extractor plus some of the PAGE_FIELDS."""
+
+    def __init__(self, inner, fields):
+        unknown = [field for field in fields if field not in PAGE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown page field(s) {', '.join(unknown)}. Choose from: {', '.join(PAGE_FIELDS)}")
+        self.inner = inner
+        self.fields = list(fields)
+        self.name = inner.name
+
+    def extract(self, page, link):
+        details = self.inner.extract(page, link)
+        if details:
+            for field in self.fields:
+                details[field] = PAGE_FIELDS[field](page)
+        return details
+
+
+EXTRACTORS = {"auto": AutoExtractor, "spec": SpecExtractor, "soup": SoupExtractor}
+
+
+def make_extractor(name="auto", fields=()):
+    """An extractor by name; `fields` adds PAGE_FIELDS such as "customers_keep_item"."""
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{name}'. Choose from: {', '.join(EXTRACTORS)}")
+    extractor = EXTRACTORS[name]()
+    return FieldsExtractor(extractor, fields) if fields else extractor
@@ -0,0 +1,313 @@
+"""
+Fetchers turn product URLs into page HTML.
+
+- SeleniumFetcher: headless Chrome with the lean profile, drivers kept warm
+  in a DriverPool for the whole run (or across runs in daemon mode)
+- HttpFetcher: plain keep-alive HTTP via http_fetcher.py
+- AsyncHttpFetcher: one asyncio event loop multiplexing many connections
+  (needs the optional aiohttp package)
+
+`fetch` returns the page (str or bytes, pre-filtered to the extracted regions
+unless prefilter=False) or None on failure, and raises PageBlocked for a robot
+check or throttle page. `fetch_guarded` does the same behind the run's
+circuit breaker (robot_check.py). `fetch_many` yields (url, page) pairs in
+completion order, the page being the PageBlocked error for blocked URLs.
+Fetchers whose pages can be handed to another process set
+`parse_in_processes`, and the Pipeline then parses them in a process pool.
+Selenium, requests and aiohttp are imported on first use.
+"""
+import threading
+import time
+
+import robot_check
+from driver_pool import DriverPool
+from driver_profile import apply_lean_options, enable_url_blocking
+from html_prefilter import RegionFilter, prefilter_html
+from robot_check import PageBlocked
+
+# Either a product page or an interstitial ends the wait for the page
+PAGE_SELECTOR = f"#productTitle, {robot_check.BLOCK_SELECTOR}"
+
+
+def setup_driver(lean_settings=None):
+    """Initializes and configures the Selenium WebDriver."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument(f"user-agent={robot_check.user_agent()}")
+    apply_lean_options(options, lean_settings)
+
+    driver = webdriver.Chrome(options=options)
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    enable_url_blocking(driver, lean_settings)
+    return driver
+
+
+class Fetcher:
+    name = None
+    parse_in_processes = False
+    breaker = None
+
+    def fetch(self, url):
+        raise NotImplementedError
+
+    def fetch_guarded(self, url, stop_check=None):
+        """fetch() once the circuit breaker lets it through; the outcome is reported back to the breaker."""
+        if self.breaker is None:
+            return self.fetch(url)
+        self.breaker.wait(stop_check)
+        try:
+            page = self.fetch(url)
+        except PageBlocked as e:
+            self.breaker.blocked(e.signature)
+            raise
+        if page is None: self.breaker.failed()
+        else: self.breaker.success()
+        return page
+
+    def fetch_many(self, urls, workers=4, stop_check=None):
+        """Fetches on `workers` threads; stops handing out URLs once stop_check() is true."""
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {executor.submit(self.fetch_guarded, url, stop_check): url for url in urls}
+            for future in as_completed(futures):
+                if stop_check and stop_check(): break
+                try:
+                    page = future.result()
+                except PageBlocked as e:
+                    page = e
+                yield futures[future], page
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SeleniumFetcher(Fetcher):
+    """
+    Loads pages in headless Chrome. Drivers come from `pool` (the daemon's warm
+    pool) or from a pool owned by the fetcher, so a run starts at most
+    `workers` browsers instead of one per book. After a robot check the
+    drivers are replaced, so the next pages load with a new user agent and
+    without the old cookies.
+    """
+    name = "selenium"
+
+    def __init__(self, lean_settings=None, pool=None, workers=4, max_uses=200, page_stats=None,
+                 prefilter=True, timeout=10, breaker=None):
+        self.lean_settings = lean_settings
+        self.own_pool = pool is None
+        self.pool = pool or DriverPool(self.new_driver, size=workers, max_uses=max_uses)
+        self.page_stats = page_stats
+        self.prefilter = prefilter
+        self.timeout = timeout
+        self.breaker = breaker
+        self.identity = robot_check.identity()
+
+    def new_driver(self):
+        return setup_driver(self.lean_settings)
+
+    def fetch(self, url):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        if self.identity != robot_check.identity():
+            self.identity = robot_check.identity()
+            self.pool.recycle()
+        driver = self.pool.acquire()
+        try:
+            started = time.perf_counter()
+            driver.get(url)
+            found = WebDriverWait(driver, self.timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, PAGE_SELECTOR)))
+            if found.get_attribute("id") != "productTitle":
+                raise PageBlocked(url, robot_check.detect(driver.page_source) or "captcha")
+            if self.page_stats: self.page_stats.record(driver, started)
+            page_source = driver.page_source
+            return prefilter_html(page_source) if self.prefilter else page_source
+        except PageBlocked:
+            raise
+        except Exception as e:
+            # Interstitials without a captcha form (the 503 page) only show up here
+            signature = _signature_of(driver)
+            if signature: raise PageBlocked(url, signature) from None
+            print(f"Error loading {url}: {e}")
+            return None
+        finally:
+            self.pool.release(driver)     # A dead driver fails the pool's health check on its next acquire
+
+    def close(self):
+        if self.own_pool: self.pool.close()
+
+
+def _signature_of(driver):
+    try:
+        return robot_check.detect(driver.page_source)
+    except Exception:
+        return None
+
+
+class HttpFetcher(Fetcher):
+    """Plain HTTP with keep-alive sessions that stay warm between runs (see http_fetcher.py)."""
+    name = "http"
+    parse_in_processes = True
+
+    def __init__(self, prefilter=True, timeout=15, breaker=None):
+        self.prefilter = prefilter
+        self.timeout = timeout
+        self.breaker = breaker
+
+    def fetch(self, url):
+        from http_fetcher import fetch_page
+        return fetch_page(url, self.timeout, self.prefilter)
+
+
+class AsyncHttpFetcher(Fetcher):
+    """
+    Fetches with aiohttp on one event loop thread; `workers` bounds the number
+    of requests in flight rather than the number of threads. Requests wait
+    for the circuit breaker on the event loop, and the cookies are dropped
+    when it switches identities.
+    """
+    name = "async"
+    parse_in_processes = True
+
+    def __init__(self, prefilter=True, timeout=15, breaker=None):
+        self.prefilter = prefilter
+        self.timeout = timeout
+        self.breaker = breaker
+
+    def fetch(self, url):
+        page = next(self.fetch_many([url], workers=1))[1]
+        if isinstance(page, PageBlocked):
+            raise page
+        return page
+
+    def fetch_guarded(self, url, stop_check=None):
+        return self.fetch(url)      # fetch_many consults the breaker itself
+
+    def fetch_many(self, urls, workers=16, stop_check=None):
+        import asyncio
+        import queue
+        aiohttp = _require_aiohttp()
+        results = queue.Queue()
+        stop = threading.Event()
+        urls = list(urls)
+
+        identity = [robot_check.identity()]
+
+        async def fetch_one(session, semaphore, url):
+            async with semaphore:
+                page = None
+                try:
+                    while self.breaker and not stop.is_set() and (delay := self.breaker.delay()):
+                        await asyncio.sleep(min(delay, 0.5))
+                except PageBlocked as e:
+                    results.put((url, e))
+                    return
+                if stop.is_set():
+                    return
+                if identity[0] != robot_check.identity():
+                    identity[0] = robot_check.identity()
+                    session.cookie_jar.clear()
+                try:
+                    async with session.get(url, headers={"User-Agent": robot_check.user_agent()}) as response:
+                        if response.status in robot_check.BLOCK_STATUSES:
+                            raise PageBlocked(url, f"HTTP {response.status}")
+                        if response.status != 200:
+                            print(f"HTTP {response.status} for {url}")
+                        else:
+                            head = await _read_head(response.content)
+                            signature = robot_check.detect(head)
+                            if signature:
+                                raise PageBlocked(url, signature)
+                            if self.prefilter:
+                                region_filter = RegionFilter()
+                                region_filter.feed(head)
+                                async for chunk in response.content.iter_chunked(65536):
+                                    region_filter.feed(chunk)
+                                page = region_filter.close()
+                            else:
+                                page = head + await response.content.read()
+                except PageBlocked as e:
+                    page = e
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"Error fetching {url}: {e}")
+                if self.breaker:
+                    if isinstance(page, PageBlocked): self.breaker.blocked(page.signature)
+                    elif page is None: self.breaker.failed()
+                    else: self.breaker.success()
+                results.put((url, page))
+
+        async def fetch_all():
+            from http_fetcher import DEFAULT_HEADERS
+            semaphore = asyncio.Semaphore(workers)
+            connector = aiohttp.TCPConnector(limit=workers)
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with aiohttp.ClientSession(headers=DEFAULT_HEADERS, connector=connector, timeout=timeout) as session:
+                await asyncio.gather(*(fetch_one(session, semaphore, url) for url in urls))
+
+        def run_loop():
+            try:
+                asyncio.run(fetch_all())
+            finally:
+                results.put(None)
+
+        loop_thread = threading.Thread(target=run_loop, daemon=True)
+        loop_thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is None: break
+                if stop_check and stop_check():
+                    stop.set()
+                    break
+                yield item
+        finally:
+            stop.set()
+            loop_thread.join()
+
+
+async def _read_head(stream, size=robot_check.SCAN_BYTES):
+    """The first `size` bytes of a response body (fewer if it is shorter), for robot_check.detect."""
+    head = b""
+    while len(head) < size:
+        chunk = await stream.read(size - len(head))
+        if not chunk:
+            break
+        head += chunk
+    return head
+
+
+def _require_aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        raise RuntimeError("The 'async' backend needs aiohttp: pip install aiohttp") from None
+    return aiohttp
+
+
+FETCHERS = {"selenium": SeleniumFetcher, "http": HttpFetcher, "async": AsyncHttpFetcher}
+
+
+def make_fetcher(backend, **options):
+    """A fetcher by backend name; options a backend does not take are ignored."""
+    if backend not in FETCHERS:
+        raise ValueError(f"Unknown backend '{backend}'. Choose from: {', '.join(FETCHERS)}")
+    fetcher_class = FETCHERS[backend]
+    accepted = fetcher_class.__init__.__code__.co_varnames
+    return fetcher_class(**{key: value for key, value in options.items() if key in accepted})
@@ -0,0 +1,136 @@
+"""
+Runs book_data tuples through a Fetcher, an Extractor and a Store.
+
+For fetchers whose pages are plain bytes (http, async) the pipeline is
+staged: the fetcher's I/O feeds a process pool of extractors, so parsing
+never serializes on the GIL. Browser pages are fetched and extracted on the
+same worker thread, with at most `workers` drivers alive at once.
+concurrent.futures is imported per run, which keeps it (and logging) out of
+the startup of commands that never scrape.
+
+Books whose fetch hit a robot check (PageBlocked) are not dropped: once the
+pass is over they are fetched again, after the fetcher's circuit breaker has
+paused, up to RETRY_ROUNDS times. Those still blocked are left in
+`pipeline.blocked` for the caller to carry over.
+"""
+import os
+
+from robot_check import PageBlocked
+
+from .common import build_book_record, print_progress
+
+RETRY_ROUNDS = 3
+
+
+def default_parser_processes():
+    """Leaves one core for the fetch threads and the main loop."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class Pipeline:
+    def __init__(self, fetcher, extractor, store=None, workers=4, parser_processes=None, stop_check=None):
+        self.fetcher = fetcher
+        self.extractor = extractor
+        self.store = store
+        self.workers = workers
+        self.parser_processes = parser_processes
+        self.stop_check = stop_check or (lambda: False)
+        self.blocked = []     # book_data still blocked by robot checks after the last scrape()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.fetcher.close()
+
+    def process_book(self, book_data):
+        """Fetches and extracts one book; the combined record, or None on failure. Raises PageBlocked."""
+        if self.stop_check(): return None
+        link = book_data[0]
+        page = self.fetcher.fetch_guarded(link, self.stop_check)
+        if page is None: return None
+        try:
+            details = self.extractor.extract(page, link)
+        except Exception as e:
+            print(f"Error extracting details for {link}: {e}")
+            return None
+        return build_book_record(book_data, details) if details else None
+
+    def scrape(self, book_data_list, label=""):
+        """
+        Records for every book that could be fetched and extracted, in completion order.
+        Blocked books are retried after the pass; the ones left are in self.blocked.
+        """
+        scrape_pass = self._scrape_staged if self.fetcher.parse_in_processes else self._scrape_threaded
+        books, blocked = scrape_pass(book_data_list, label)
+        for round_number in range(1, RETRY_ROUNDS + 1):
+            breaker = self.fetcher.breaker
+            if not blocked or self.stop_check() or (breaker and breaker.gave_up):
+                break
+            print(f"\n🔁 Retrying {len(blocked)} books that got a robot check (round {round_number} of {RETRY_ROUNDS})...")
+            retried, blocked = scrape_pass(blocked, f"{label} (retry {round_number})")
+            books.extend(retried)
+        self.blocked = blocked
+        if blocked:
+            print(f"\n🚧 {len(blocked)} books stayed behind a robot check; their last known details are kept.")
+        return books
+
+    def _scrape_threaded(self, book_data_list, label):
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        books, blocked = [], []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.process_book, book_data): book_data for book_data in book_data_list}
+            for i, future in enumerate(as_completed(futures)):
+                if self.stop_check():
+                    for pending in futures: pending.cancel()
+                    break
+                print_progress(i + 1, len(book_data_list), label)
+                try:
+                    result = future.result()
+                except PageBlocked:
+                    blocked.append(futures[future])
+                    continue
+                if result: books.append(result)
+        return books, blocked
+
+    def _scrape_staged(self, book_data_list, label):
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        parser_processes = self.parser_processes or default_parser_processes()
+        print(f"Fetching with {self.workers} {self.fetcher.name} workers, parsing with {parser_processes} processes...")
+        by_link = {book_data[0]: book_data for book_data in book_data_list}
+        books, blocked, total, done = [], [], len(by_link), 0
+
+        with ProcessPoolExecutor(max_workers=parser_processes) as parsers:
+            parse_futures = {}
+            for link, page in self.fetcher.fetch_many(list(by_link), self.workers, self.stop_check):
+                if isinstance(page, PageBlocked):
+                    blocked.append(by_link[link])
+                    done += 1
+                    print_progress(done, total, label)
+                elif page:
+                    parse_futures[parsers.submit(self.extractor.extract, page, link)] = by_link[link]
+                else:
+                    done += 1
+                    print_progress(done, total, label)
+
+            for future in as_completed(parse_futures):
+                if self.stop_check(): break
+                done += 1
+                print_progress(done, total, label)
+                try:
+                    details = future.result()
+                except Exception as e:
+                    print(f"Error parsing {parse_futures[future][0]}: {e}")
+                    continue
+                if details: books.append(build_book_record(parse_futures[future], details))
+        return books, blocked
+
+    def run(self, book_data_list, wishlist_name, carried=None):
+        """Scrapes the books and saves them with the store as one run of `wishlist_name`."""
+        books = self.scrape(book_data_list, f"Scraping '{wishlist_name}'")
+        if books and self.store:
+            self.store.save(books, wishlist_name, carried)
+        return books
@@ -0,0 +1,245 @@
+"""
+Stores persist scraped records. Each `save` call is one wishlist run: the run
+snapshot holds every book of the wishlist (`books` plus the `carried` records
+the refresh planner skipped), while only `books` are added to the history.
+`history` streams the wishlist's history back, oldest first.
+
+- JsonStore: <wishlist>/<wishlist>_<timestamp>.json/.csv snapshots and an
+  indent=4 historical_data.json, the layout the dashboard and every other
+  tool in this repo reads
+- JsonlStore: <wishlist>/<wishlist>_<timestamp>.jsonl snapshots and an
+  append-only history.jsonl, one record per line (appends never rewrite)
+- SqliteStore: one wishlist.sqlite with a runs and a records table
+"""
+import csv
+import json
+import os
+import shutil
+from datetime import datetime
+
+from atomic_write import atomic_open
+from book_record import as_dicts
+from json_stream import append_json_array, iter_json_array
+
+from .common import CSV_FIELDS, OPTIONAL_FIELDS, OUTPUT_DIR
+
+
+def save_to_csv(books, filename, fields=CSV_FIELDS):
+    if not books: return
+    books = list(as_dicts(books))
+    fields = fields + [field for field in OPTIONAL_FIELDS if field not in fields and any(field in b for b in books)]
+    with atomic_open(filename, newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(books)
+
+
+def save_to_json(books, filename):
+    """Accepts a list of dicts or BookRecords, or a BookTable."""
+    with atomic_open(filename) as f:
+        json.dump(list(as_dicts(books)), f, indent=4, ensure_ascii=False)
+
+
+class Store:
+    name = None
+
+    def __init__(self, output_dir=OUTPUT_DIR):
+        self.output_dir = output_dir
+
+    def save(self, books, wishlist_name, carried=None):
+        raise NotImplementedError
+
+    def history(self, wishlist_name):
+        raise NotImplementedError
+
+    def history_version(self, wishlist_name):
+        """A token that changes whenever the wishlist's history does; None without history."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def _file_version(self, path):
+        if not os.path.exists(path): return None
+        stat = os.stat(path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _run_base(self, wishlist_name, timestamp):
+        """<output_dir>/<wishlist>/<wishlist>_<timestamp>, creating the folder."""
+        wishlist_dir = os.path.join(self.output_dir, wishlist_name)
+        os.makedirs(wishlist_dir, exist_ok=True)
+        return os.path.join(wishlist_dir, f"{wishlist_name}_{timestamp}")
+
+
+class JsonStore(Store):
+    name = "json"
+
+    def __init__(self, output_dir=OUTPUT_DIR, history_backups=3):
+        super().__init__(output_dir)
+        self.history_backups = history_backups
+
+    def history_path(self, wishlist_name):
+        return os.path.join(self.output_dir, wishlist_name, "historical_data.json")
+
+    def save(self, books, wishlist_name, carried=None):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_filename = self._run_base(wishlist_name, timestamp)
+        snapshot = list(books) + list(carried or [])
+        save_to_json(snapshot, f"{base_filename}.json")
+        save_to_csv(snapshot, f"{base_filename}.csv")
+
+        # Appended without parsing the existing file, so history size never limits memory.
+        # Written atomically, keeping the last few versions as .bakN in case one turns out damaged.
+        historical_path = self.history_path(wishlist_name)
+        try:
+            append_json_array(historical_path, books, self.history_backups)
+        except json.JSONDecodeError:
+            damaged_path = f"{historical_path}.damaged_{timestamp}"
+            os.replace(historical_path, damaged_path)
+            if self.restore_backup(historical_path):
+                print(f"Warning: Historical data for {wishlist_name} was damaged (kept as '{damaged_path}'). Restored the last backup.")
+            else:
+                print(f"Warning: Could not read historical data for {wishlist_name}. Kept it as '{damaged_path}' and started fresh.")
+            append_json_array(historical_path, books, self.history_backups)
+
+    def history(self, wishlist_name):
+        """Streams the history one record at a time; stops quietly at a damaged tail."""
+        historical_path = self.history_path(wishlist_name)
+        if not os.path.exists(historical_path): return
+        try:
+            yield from iter_json_array(historical_path)
+        except json.JSONDecodeError:
+            print(f"Warning: historical data for {wishlist_name} is damaged; using the readable part.")
+
+    def history_version(self, wishlist_name):
+        return self._file_version(self.history_path(wishlist_name))
+
+    def restore_backup(self, path):
+        """Copies the newest readable path.bakN back to path; returns True if one was restored."""
+        for n in range(1, self.history_backups + 1):
+            backup = f"{path}.bak{n}"
+            if not os.path.exists(backup):
+                continue
+            try:
+                for _ in iter_json_array(backup): pass
+            except json.JSONDecodeError:
+                continue
+            shutil.copy2(backup, path)
+            return True
+        return False
+
+
+class JsonlStore(Store):
+    name = "jsonl"
+
+    def history_path(self, wishlist_name):
+        return os.path.join(self.output_dir, wishlist_name, "history.jsonl")
+
+    def save(self, books, wishlist_name, carried=None):
+        base_filename = self._run_base(wishlist_name, datetime.now().strftime("%Y%m%d_%H%M%S"))
+        with atomic_open(f"{base_filename}.jsonl") as f:
+            f.writelines(json.dumps(book, ensure_ascii=False) + "\n" for book in as_dicts(list(books) + list(carried or [])))
+        with open(self.history_path(wishlist_name), "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(book, ensure_ascii=False) + "\n" for book in as_dicts(books))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def history(self, wishlist_name):
+        """Streams the history; a torn last line (crash during an append) is skipped."""
+        path = self.history_path(wishlist_name)
+        if not os.path.exists(path): return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip(): continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Warning: skipped a damaged line in {path}.")
+
+    def history_version(self, wishlist_name):
+        return self._file_version(self.history_path(wishlist_name))
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id            INTEGER PRIMARY KEY,
+    wishlist_name TEXT NOT NULL,
+    taken_at      TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    run_id            INTEGER NOT NULL REFERENCES runs (id),
+    wishlist_name     TEXT NOT NULL,
+    asin              TEXT,
+    link              TEXT,
+    scraped_timestamp TEXT,
+    in_history        INTEGER NOT NULL,
+    data              TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_history ON records (wishlist_name, in_history);
+CREATE INDEX IF NOT EXISTS records_asin ON records (asin, scraped_timestamp);
+"""
+
+
+class SqliteStore(Store):
+    name = "sqlite"
+
+    def __init__(self, output_dir=OUTPUT_DIR, path=None):
+        super().__init__(output_dir)
+        self.path = path or os.path.join(output_dir, "wishlist.sqlite")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        import sqlite3
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def save(self, books, wishlist_name, carried=None):
+        rows = [(book, 1) for book in as_dicts(books)] + [(book, 0) for book in as_dicts(carried or [])]
+        conn = self._connect()
+        try:
+            with conn:     # One transaction per run
+                run_id = conn.execute("INSERT INTO runs (wishlist_name, taken_at) VALUES (?, ?)",
+                                      (wishlist_name, datetime.now().isoformat())).lastrowid
+                conn.executemany(
+                    "INSERT INTO records (run_id, wishlist_name, asin, link, scraped_timestamp, in_history, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, wishlist_name, book.get("asin"), book.get("link"), book.get("scraped_timestamp"),
+                      in_history, json.dumps(book, ensure_ascii=False)) for book, in_history in rows])
+        finally:
+            conn.close()
+
+    def history(self, wishlist_name):
+        conn = self._connect()
+        try:
+            for (data,) in conn.execute("SELECT data FROM records WHERE wishlist_name = ? AND in_history = 1 "
+                                        "ORDER BY rowid", (wishlist_name,)):
+                yield json.loads(data)
+        finally:
+            conn.close()
+
+    def history_version(self, wishlist_name):
+        conn = self._connect()
+        try:
+            count, last = conn.execute("SELECT COUNT(*), MAX(rowid) FROM records WHERE wishlist_name = ? "
+                                       "AND in_history = 1", (wishlist_name,)).fetchone()
+        finally:
+            conn.close()
+        return f"{count}:{last}" if count else None
+
+
+STORES = {"json": JsonStore, "jsonl": JsonlStore, "sqlite": SqliteStore}
+
+
+def make_store(kind="json", **options):
+    """A store by name; options a store does not take are ignored."""
+    if kind not in STORES:
+        raise ValueError(f"Unknown store '{kind}'. Choose from: {', '.join(STORES)}")
+    store_class = STORES[kind]
+    accepted = store_class.__init__.__code__.co_varnames
+    return store_class(**{key: value for key, value in options.items() if key in accepted})
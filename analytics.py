@@ -0,0 +1,158 @@
+"""
+Per-wishlist rankings and distribution summaries for analyze.
+
+They are built from the wishlist's latest state (latest_state.py, the
+latest record per ASIN that save_results maintains), never from a history
+scan, and computed once per history version and cached twice: in memory for the
+interactive menu, and as <output_dir>/<wishlist>/analytics.json for the next
+process. The cache holds the latest record per ASIN and, per sort key, the
+rank order of those records (missing values left out), so "top 15 by value"
+is a slice instead of a filter and sort over every record.
+
+`top_k` is the heap-based path for ad-hoc queries that no precomputed order
+covers (a filtered subset); for unfiltered queries it is equivalent to
+sorting and slicing, ties included.
+
+Value tiers use the quartile rule of `calculateValueTiers` in the dashboard:
+over the sorted value_per_page values, "best" is the value at index
+floor(n/4) and "worst" the one at floor(3n/4). A book is Best Value at or
+below "best" and Low Value above "worst". Percentiles use the same
+nearest-rank rule, so the summary and the tiers agree.
+"""
+import heapq
+import json
+import math
+import os
+
+from amazon_wishlist.common import SORTS
+from atomic_write import atomic_write
+from book_record import BookTable
+import latest_state
+
+CACHE_FILE = "analytics.json"
+CACHE_FORMAT = 1
+SUMMARY_FIELDS = ["price", "reviews", "pages", "value_per_page", "avg_rating"]
+PERCENTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+_memory = {}    # (output_dir, wishlist, history version) -> Analytics
+
+
+def _number(value):
+    """The value as a sortable number, or None when missing or NaN."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        return None
+    return value
+
+
+def top_k(records, field, k, reverse=False, where=None):
+    """The k records with the lowest (highest, with reverse) `field`, via a heap; records without one are skipped."""
+    rows = ((value, i) for i, record in enumerate(records)
+            if (where is None or where(record)) and (value := _number(record.get(field))) is not None)
+    pick = heapq.nlargest if reverse else heapq.nsmallest
+    return [records[i] for _, i in pick(k, rows, key=lambda row: row[0])]
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list: the value at index floor(n * q)."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, math.floor(len(sorted_values) * q))]
+
+
+def summarize(values):
+    """count, min, max, mean and the PERCENTILES of the non-missing values."""
+    values = sorted(v for v in map(_number, values) if v is not None)
+    if not values:
+        return {"count": 0}
+    summary = {"count": len(values), "min": values[0], "max": values[-1], "mean": sum(values) / len(values)}
+    summary.update((f"p{round(q * 100)}", percentile(values, q)) for q in PERCENTILES)
+    return summary
+
+
+def value_tiers(values):
+    """{"best", "worst"} value_per_page thresholds, as calculateValueTiers sets them; None without values."""
+    values = sorted(v for v in map(_number, values) if v is not None)
+    if not values:
+        return None
+    return {"best": percentile(values, 0.25), "worst": percentile(values, 0.75)}
+
+
+def tier_label(value_per_page, tiers):
+    if tiers is None or _number(value_per_page) is None:
+        return None
+    if value_per_page <= tiers["best"]:
+        return "Best Value"
+    if value_per_page > tiers["worst"]:
+        return "Low Value"
+    return "Avg. Value"
+
+
+class Analytics:
+    def __init__(self, records, version=None):
+        """`records`: the latest record per ASIN, as plain dicts."""
+        self.records = records
+        self.version = version
+        self.orders = {}
+        for sort, (field, reverse) in SORTS.items():
+            valid = [i for i, record in enumerate(records) if _number(record.get(field)) is not None]
+            self.orders[sort] = sorted(valid, key=lambda i: records[i][field], reverse=reverse)
+        self.summaries = {field: summarize(record.get(field) for record in records) for field in SUMMARY_FIELDS}
+        self.tiers = value_tiers(record.get("value_per_page") for record in records)
+
+    @classmethod
+    def from_history(cls, records, version=None):
+        table = BookTable.from_dicts(records)
+        return cls([table[i].to_dict() for i in table.latest_by("asin")], version)
+
+    def top(self, sort="price", k=15, where=None):
+        """Top k records for a SORTS key; a filtered query falls back to a heap over the matching records."""
+        if where is None:
+            return [self.records[i] for i in self.orders[sort][:k]]
+        field, reverse = SORTS[sort]
+        return top_k(self.records, field, k, reverse, where)
+
+    def to_dict(self):
+        return {"format": CACHE_FORMAT, "version": self.version, "records": self.records,
+                "orders": self.orders, "summaries": self.summaries, "tiers": self.tiers}
+
+    @classmethod
+    def from_dict(cls, data):
+        analytics = cls.__new__(cls)
+        analytics.records = data["records"]
+        analytics.version = data["version"]
+        analytics.orders = data["orders"]
+        analytics.summaries = data["summaries"]
+        analytics.tiers = data["tiers"]
+        return analytics
+
+
+def load(store, wishlist_name, output_dir):
+    """
+    Analytics of one wishlist's latest state in `store`, or None without history.
+    Rebuilt only when the store reports a new history version.
+    """
+    version = latest_state.history_key(store, wishlist_name)
+    if version is None:
+        return None
+    key = (output_dir, wishlist_name, version)
+    if key in _memory:
+        return _memory[key]
+
+    cache_path = os.path.join(output_dir, wishlist_name, CACHE_FILE)
+    analytics = None
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == CACHE_FORMAT and data.get("version") == version:
+                analytics = Analytics.from_dict(data)
+        except (json.JSONDecodeError, KeyError):
+            pass    # Rebuilt and overwritten below
+    if analytics is None:
+        analytics = Analytics(latest_state.load(store, wishlist_name, output_dir).records(), version)
+        if not analytics.records:
+            return None
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        atomic_write(cache_path, json.dumps(analytics.to_dict(), ensure_ascii=False))
+    _memory[key] = analytics
+    return analytics
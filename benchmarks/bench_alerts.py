@@ -0,0 +1,81 @@
+"""
+Evaluating the alert rules for one run against the latest state.
+
+- vectorized: every rule as NumPy array operations over the run's columns
+- per book: the same compiled checks on floats, what runs without NumPy
+- evaluate: the whole step save_results runs, i.e. building the columns
+  from the state, the checks and the alert records
+
+Both check paths must match the same (rule, book) pairs.
+
+    python -m benchmarks.bench_alerts [--books 5000] [--repeat 20]
+"""
+import argparse
+import random
+import tempfile
+import time
+
+import alerts
+from latest_state import LatestState
+
+RULES = [{"type": "drop", "amount": 50}, {"type": "percent_drop", "percent": 10}, {"type": "all_time_low"},
+         {"type": "below_target"}, {"type": "value_per_page_below", "threshold": 0.2}]
+
+
+def make_run(books, seed=7):
+    """(state before the run, the run's books, targets) with about a tenth of the prices falling."""
+    rng = random.Random(seed)
+    state = LatestState(tempfile.mktemp(suffix=".json"))
+    previous, run, targets = [], [], {}
+    for i in range(books):
+        asin = f"B{i:09d}"
+        price = round(rng.uniform(100, 3000), 2)
+        pages = rng.randint(80, 1200)
+        previous.append({"asin": asin, "title": f"Book {i}", "price": price, "pages": pages,
+                         "value_per_page": price / pages, "scraped_timestamp": "2026-01-01T00:00:00"})
+        new_price = round(price * rng.uniform(0.6, 0.95), 2) if rng.random() < 0.1 else price
+        run.append(dict(previous[-1], price=new_price, value_per_page=new_price / pages,
+                        scraped_timestamp="2026-01-02T00:00:00"))
+        if rng.random() < 0.05:
+            targets[asin] = round(price * 0.8, 2)
+    state.update(previous)
+    return state, run, targets
+
+
+def _timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def run(books=5000, repeat=20):
+    state, batch, targets = make_run(books)
+    engine = alerts.AlertEngine(RULES, None, tempfile.gettempdir(), targets)
+    if alerts._require_numpy() is None:
+        raise SystemExit("This benchmark compares against the NumPy path: pip install numpy")
+
+    columns = engine.columns(batch, state)
+    vector_ms, vector = _timed(lambda: alerts.matches(engine.rules, columns), repeat)
+    require_numpy, alerts._require_numpy = alerts._require_numpy, lambda: None
+    try:
+        row_ms, per_row = _timed(lambda: alerts.matches(engine.rules, columns), repeat)
+    finally:
+        alerts._require_numpy = require_numpy
+    if sorted((rule.id, i) for rule, i in vector) != sorted((rule.id, i) for rule, i in per_row):
+        raise AssertionError("The vectorized and per-book checks matched different books")
+    evaluate_ms, raised = _timed(lambda: engine.evaluate(batch, state, "Bench"), repeat)
+
+    print(f"{books} books, {len(RULES)} rules, {len(raised)} alerts:")
+    print(f"  checks, vectorized (NumPy)  {vector_ms:10.2f} ms")
+    print(f"  checks, per book            {row_ms:10.2f} ms")
+    print(f"  evaluate (columns + alerts) {evaluate_ms:10.2f} ms")
+    return vector_ms, row_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.books, args.repeat)
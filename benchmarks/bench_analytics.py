@@ -0,0 +1,92 @@
+"""
+Answering "top 15 by price/reviews/value" from a long history.
+
+- rebuild: what analyze did before, per query: load the history into a
+  BookTable, take the latest row per ASIN, filter and sort
+- heap: top_k over the latest records (no full sort)
+- cached: analytics.load with a warm analytics.json, i.e. a new process
+  asking again while the history is unchanged
+- in-memory: the same call again in the same process (the menu loop)
+
+    python -m benchmarks.bench_analytics [--records 100000] [--queries 30]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import analytics
+from amazon_wishlist.stores import JsonStore
+from benchmarks.bench_records import make_records
+from book_record import BookTable
+from json_stream import write_json_array
+
+
+def _timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def run(records=100000, queries=30):
+    directory = tempfile.mkdtemp(prefix="bench_analytics_")
+    try:
+        history = json.loads(make_records(records))
+        name = history[0]["wishlist_name"]
+        for record in history:
+            record["wishlist_name"] = name
+        os.makedirs(os.path.join(directory, name))
+        write_json_array(os.path.join(directory, name, "historical_data.json"), history)
+        store = JsonStore(directory)
+        sorts = list(analytics.SORTS) * (queries // len(analytics.SORTS))
+
+        def rebuild():
+            for sort in sorts:
+                table = BookTable.from_dicts(store.history(name))
+                field, reverse = analytics.SORTS[sort]
+                top = [table[i] for i in table.argsort(field, reverse, table.latest_by("asin"))[:15]]
+            return top
+
+        def heap():
+            latest = analytics.Analytics.from_history(store.history(name)).records
+            for sort in sorts:
+                field, reverse = analytics.SORTS[sort]
+                top = analytics.top_k(latest, field, 15, reverse)
+            return top
+
+        def cold_cache():
+            analytics._memory.clear()
+            return [analytics.load(store, name, directory).top(sort) for sort in sorts][-1]
+
+        def warm():
+            return [analytics.load(store, name, directory).top(sort) for sort in sorts][-1]
+
+        rebuild_ms, expected = _timed(rebuild, 1)
+        heap_ms, heap_top = _timed(heap, 1)
+        analytics._memory.clear()
+        build_ms, _ = _timed(lambda: analytics.load(store, name, directory), 1)
+        cached_ms, cached_top = _timed(cold_cache, 5)
+        warm_ms, _ = _timed(warm, 20)
+        expected = [book["asin"] for book in expected]
+        if [book["asin"] for book in heap_top] != expected or [book["asin"] for book in cached_top] != expected:
+            raise AssertionError("Rankings differ between the methods")
+
+        print(f"{records} history records, {len(sorts)} top-15 queries:")
+        for label, ms in (("rebuild + sort per query", rebuild_ms), ("one load, heap top-k per query", heap_ms),
+                          ("build analytics.json once", build_ms), ("new process, cache unchanged", cached_ms),
+                          ("same process (menu loop)", warm_ms)):
+            print(f"  {label:32s}{ms:10.2f} ms")
+        return rebuild_ms, cached_ms, warm_ms
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=30)
+    args = parser.parse_args()
+    run(args.records, args.queries)
@@ -0,0 +1,61 @@
+"""
+Budget optimizer: branch-and-bound knapsack on synthetic wishlists.
+
+Checks the result against brute force on small instances first, then times
+budget.plan (utilities + solve) for a few wishlist sizes and budgets.
+
+    python -m benchmarks.bench_budget [--books 3000] [--checks 200]
+"""
+import argparse
+import random
+import time
+
+import budget
+
+
+def make_records(books, seed=11):
+    rng = random.Random(seed)
+    records = [{"asin": f"B{i:09d}", "price": float(rng.choice([149, 199, 299, 399, 499, 699, 999, 1499, 2999])),
+                "reviews": rng.choice([0, 3, 40, 500, 5000]), "avg_rating": round(rng.uniform(3, 5), 1),
+                "value_per_page": rng.uniform(0.2, 6)} for i in range(books)]
+    ratings = {r["asin"]: rng.randint(1, 5) for r in records if rng.random() < 0.3}
+    return records, ratings
+
+
+def check(instances, seed=3):
+    """Compares solve with an exhaustive search on instances of up to 12 items, half with repeated prices."""
+    rng = random.Random(seed)
+    for instance in range(instances):
+        n = rng.randint(1, 12)
+        if instance % 2:
+            prices = [float(rng.choice([199, 299, 499, 799])) for _ in range(n)]
+        else:
+            prices = [round(rng.uniform(50, 2000), 2) for _ in range(n)]
+        values = [rng.uniform(0, 100) for _ in range(n)]
+        limit = rng.uniform(100, 5000)
+        best = max(sum(values[i] for i in range(n) if mask >> i & 1) for mask in range(1 << n)
+                   if sum(prices[i] for i in range(n) if mask >> i & 1) <= limit)
+        _, value, optimal = budget.solve(prices, values, limit)
+        if abs(value - best) > 1e-6 or not optimal:
+            raise AssertionError(f"solve found {value}, the optimum is {best}")
+
+
+def run(books=3000, checks=200):
+    check(checks)
+    print(f"Matches brute force on {checks} small instances.")
+    for size in sorted({books // 3, books, books * 2}):
+        records, ratings = make_records(size)
+        for limit in (2000, 20000, 200000):
+            started = time.perf_counter()
+            result = budget.plan(records, limit, ratings)
+            ms = (time.perf_counter() - started) * 1000
+            print(f"  {size:6d} books, budget ₹{limit:<7} {len(result['books']):5d} picked  {ms:8.1f} ms"
+                  + ("" if result["optimal"] else "  (node limit)"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=3000)
+    parser.add_argument("--checks", type=int, default=200)
+    args = parser.parse_args()
+    run(args.books, args.checks)
@@ -0,0 +1,67 @@
+"""
+Edition clustering: blocking keys versus comparing every pair of ASINs.
+
+Synthetic wishlists of works in several editions each (format notes,
+subtitles, volume numbers, a missing author now and then). Reports the
+pairs the blocking actually compares, the all-pairs count it avoids, the
+time editions.cluster takes and how many works it recovers.
+
+    python -m benchmarks.bench_editions [--asins 20000]
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+
+import editions
+
+WORDS = ("atomic habits power mind deep work zero one lean startup thinking fast slow art war psychology money "
+         "sapiens brief history time intelligent investor rich dad poor good great black swan grit drive focus "
+         "courage outliers influence hooked originals range tribe ego enemy daily stoic obstacle way").split()
+SURNAMES = "clear newport thiel ries kahneman tzu housel harari hawking graham kiyosaki collins taleb duckworth".split()
+NOTES = ["", " (Deluxe Hardbound Edition)", ": A Practical Guide", " | Bestseller Paperback Book", " (English)",
+         ": Expanded and Updated"]
+
+
+def make_records(asins, editions_per_work=3, seed=5):
+    """(records, true work of each ASIN)."""
+    rng = random.Random(seed)
+    records, truth = [], {}
+    work = 0
+    while len(records) < asins:
+        title = " ".join(rng.sample(WORDS, rng.randint(1, 3)) + [f"{rng.choice(WORDS)}{work}"]).title()
+        author = f"{rng.choice('ABCDEFGHJKLMN')}. {rng.choice(SURNAMES).title()}{work % 97}"
+        volume = f", Vol. {rng.randint(1, 3)}" if rng.random() < 0.05 else ""
+        for _ in range(rng.randint(1, editions_per_work * 2 - 1)):
+            asin = f"B{len(records):09d}"
+            records.append({"asin": asin, "title": title + volume + rng.choice(NOTES),
+                            "author": author if rng.random() > 0.1 else None,
+                            "format": rng.choice(["Paperback\n\n₹399.00", "Hardcover", "Kindle Edition"])})
+            truth[asin] = work
+        work += 1
+    return records[:asins], truth
+
+
+def run(asins=20000):
+    for size in (asins // 4, asins, asins * 4):
+        records, truth = make_records(size)
+        blocks = defaultdict(int)
+        for record in records:
+            words = editions.title_words(record["title"], record["author"])
+            for key in editions.blocking_keys(words, editions.author_surname(record["author"])):
+                blocks[key] += 1
+        compared = sum(n * (n - 1) // 2 for n in blocks.values() if n <= editions.MAX_BLOCK)
+
+        started = time.perf_counter()
+        work_of = editions.cluster(records)
+        ms = (time.perf_counter() - started) * 1000
+        found = len(set(work_of.values()))
+        print(f"{size:7d} ASINs: {compared:9d} pairs compared of {size * (size - 1) // 2:13d}, "
+              f"{ms:8.1f} ms, {found} works found ({len(set(truth.values()))} generated)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--asins", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.asins)
@@ -0,0 +1,67 @@
+"""
+Micro-benchmark: precompiled lxml extraction spec vs the cascaded lookups.
+
+The baseline is `parse_product_page_bs4`, a one-to-one port of the Selenium
+find_element cascade (detail bullets -> tech tables -> description -> every
+<table>) onto BeautifulSoup, since a live driver cannot be benchmarked
+offline. Both parsers must return identical fields on every page.
+
+    python -m benchmarks.bench_extraction [--pages 30] [--no-bullets]
+
+--no-bullets strips the detail-bullets block so page_count has to fall all
+the way through to the "scan every table" fallback.
+"""
+import argparse
+import time
+
+from benchmarks.fixtures import make_product_page
+from extraction_spec import extract_details
+from product_parser import parse_product_page_bs4
+
+FIELDS = ["page_count", "review_count", "avg_rating", "book_format", "author", "seller", "asin"]
+
+
+def _batch(pages, no_bullets):
+    batch = []
+    for i in range(pages):
+        raw = make_product_page(i)
+        if no_bullets:
+            raw = raw.replace(b'id="detailBullets_feature_div"', b'id="detailBullets_removed"')
+            raw = raw.replace(b"</table>", b"<tr><td>Print length</td><td>%d pages</td></tr></table>" % (100 + i), 1)
+        batch.append((raw, f"https://www.amazon.in/dp/B0{i:08d}/"))
+    return batch
+
+
+def _time(parse, batch, repeat=3):
+    best, results = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [parse(raw, link) for raw, link in batch]
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def run(pages=30, no_bullets=False):
+    batch = _batch(pages, no_bullets)
+    cascade, expected = _time(parse_product_page_bs4, batch)
+    spec, actual = _time(extract_details, batch)
+
+    mismatches = sum(
+        1 for a, b in zip(expected, actual)
+        if a is None or b is None or any(a[f] != b[f] for f in FIELDS if f != "book_format")
+    )
+    print(f"Extraction ({pages} pages{', no detail bullets' if no_bullets else ''}):")
+    print(f"  cascaded lookups (bs4) : {1000 * cascade / pages:7.2f} ms/page")
+    print(f"  compiled lxml spec     : {1000 * spec / pages:7.2f} ms/page  ({cascade / spec:.1f}x faster)")
+    if mismatches:
+        print(f"  WARNING: {mismatches} page(s) extracted differently")
+    return {"cascade_ms": 1000 * cascade / pages, "spec_ms": 1000 * spec / pages, "mismatches": mismatches}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--no-bullets", action="store_true")
+    args = parser.parse_args()
+    run(args.pages, args.no_bullets)
@@ -0,0 +1,58 @@
+"""
+Parse-stage scaling across cores.
+
+Parses the same batch of synthetic ~700 KB product pages with the process-pool
+parse stage at 1, 2, 4, ... worker processes and reports pages/second and
+speedup over a single in-process (GIL-bound) parser.
+
+    python -m benchmarks.bench_parse_scaling [--pages 48] [--max-processes N]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.fixtures import make_product_page
+from product_parser import parse_product_page
+
+
+def _process_counts(max_processes):
+    counts, n = [], 1
+    while n < max_processes:
+        counts.append(n)
+        n *= 2
+    counts.append(max_processes)
+    return counts
+
+
+def run(pages=48, max_processes=None):
+    max_processes = max_processes or os.cpu_count() or 1
+    batch = [(make_product_page(i), f"https://www.amazon.in/dp/B0{i:08d}/") for i in range(pages)]
+    print(f"Parse scaling: {pages} pages, {sum(len(b) for b, _ in batch) / pages / 1024:.0f} KB/page, "
+          f"{os.cpu_count()} CPUs")
+
+    started = time.perf_counter()
+    for raw, link in batch:
+        parse_product_page(raw, link)
+    serial = time.perf_counter() - started
+    print(f"  in-process     : {pages / serial:7.1f} pages/s")
+
+    results = {"serial": pages / serial}
+    for processes in _process_counts(max_processes):
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            # Warm the workers so import time is not counted.
+            list(pool.map(parse_product_page, [batch[0][0]] * processes, [batch[0][1]] * processes))
+            started = time.perf_counter()
+            list(pool.map(parse_product_page, [b for b, _ in batch], [l for _, l in batch]))
+            elapsed = time.perf_counter() - started
+        results[processes] = pages / elapsed
+        print(f"  {processes:2d} process(es): {pages / elapsed:7.1f} pages/s  ({serial / elapsed:.2f}x)")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=48)
+    parser.add_argument("--max-processes", type=int, default=None)
+    args = parser.parse_args()
+    run(args.pages, args.max_processes)
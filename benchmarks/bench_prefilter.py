@@ -0,0 +1,125 @@
+"""
+Full-document parsing vs pre-filtered parsing of product pages.
+
+For each page this measures the pre-filter itself, then the parse time of the
+full page vs the filtered regions, with both the lxml extraction spec and the
+BeautifulSoup parser.
+
+Memory is the peak RSS growth of a fresh process per parser and mode
+(VmHWM on Linux, ru_maxrss elsewhere), so libxml2's C allocations count too;
+tracemalloc only sees Python objects and reported the full lxml document as
+the smaller one. Each process reads the pages from disk, parses a tiny page to
+load the parser, and then records its baseline. In the pre-filtered mode it
+filters every page and then parses it, as the fetchers do. There is no memory
+column on Windows, which has neither.
+
+    python -m benchmarks.bench_prefilter [--pages 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import make_product_page
+from extraction_spec import extract_details
+from html_prefilter import prefilter_html
+from product_parser import parse_product_page_bs4
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARSERS = {"lxml spec": extract_details, "bs4": parse_product_page_bs4}
+EMPTY_PAGE = b'<html><body><span id="productTitle">x</span></body></html>'
+
+
+def _timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def _max_rss_kb():
+    """
+    Peak RSS of this process in KB. Linux carries ru_maxrss over from the parent
+    across exec, so there VmHWM is used, which starts again with the new program.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak     # bytes on macOS, KB elsewhere
+
+
+def measure_memory(label, mode, directory):
+    """Child process: peak RSS growth in KB while parsing the pages in `directory`."""
+    parse = PARSERS[label]
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), "rb") as f:
+            pages.append(f.read())
+    parse(prefilter_html(EMPTY_PAGE), "https://www.amazon.in/dp/B000000000/")    # Loads the parser's modules
+    baseline = _max_rss_kb()
+    for i, raw in enumerate(pages):
+        parse(prefilter_html(raw) if mode == "filtered" else raw, f"https://www.amazon.in/dp/B0{i:08d}/")
+    return _max_rss_kb() - baseline
+
+
+def _peak_rss(label, mode, directory):
+    """Runs measure_memory in a fresh interpreter; None on Windows."""
+    if sys.platform == "win32":
+        return None
+    result = subprocess.run([sys.executable, "-m", "benchmarks.bench_prefilter", "--memory-child", label, mode,
+                             directory], cwd=ROOT, capture_output=True, text=True, check=True)
+    return int(result.stdout.strip().splitlines()[-1])
+
+
+def run(pages=10):
+    totals = {label: [0.0, 0.0] for label in PARSERS}
+    sizes_in = sizes_out = 0
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(pages):
+            raw = make_product_page(i)
+            with open(os.path.join(directory, f"{i:04d}.html"), "wb") as f:
+                f.write(raw)
+            link = f"https://www.amazon.in/dp/B0{i:08d}/"
+            filtered, filter_time = _timed(prefilter_html, raw)
+            sizes_in += len(raw)
+            sizes_out += len(filtered)
+            for label, parse in PARSERS.items():
+                full, full_time = _timed(parse, raw, link)
+                small, small_time = _timed(parse, filtered, link)
+                if full != small:
+                    print(f"  WARNING: page {i} differs after pre-filtering with {label}")
+                totals[label][0] += full_time
+                totals[label][1] += small_time + filter_time
+        peaks = {(label, mode): _peak_rss(label, mode, directory) for label in PARSERS for mode in ("full", "filtered")}
+
+    def rss(peak):
+        return f"peak RSS +{peak:6d} KB" if peak is not None else "peak RSS n/a"
+
+    print(f"Pre-filter ({pages} pages): {sizes_in / pages / 1024:.0f} KB -> {sizes_out / pages / 1024:.1f} KB per page")
+    results = {}
+    for label, (full_time, small_time) in totals.items():
+        full_peak, small_peak = peaks[label, "full"], peaks[label, "filtered"]
+        print(f"  {label:9s} full document : {1000 * full_time / pages:7.2f} ms/page, {rss(full_peak)}")
+        print(f"  {label:9s} pre-filtered  : {1000 * small_time / pages:7.2f} ms/page, {rss(small_peak)}"
+              f"  ({full_time / small_time:.1f}x faster)")
+        results[label] = {"full_ms": 1000 * full_time / pages, "filtered_ms": 1000 * small_time / pages,
+                          "full_peak_rss_kb": full_peak, "filtered_peak_rss_kb": small_peak}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--memory-child", nargs=3, metavar=("PARSER", "MODE", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.memory_child:
+        print(measure_memory(*args.memory_child))
+    else:
+        run(args.pages)
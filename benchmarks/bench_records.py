@@ -0,0 +1,86 @@
+"""
+Memory per 100k records: plain dicts vs BookRecord vs BookTable.
+
+Records are generated with a realistic spread of titles, authors, sellers and
+formats, serialized and loaded back with json.loads (exactly how
+historical_data.json reaches memory), then converted. Sizes are the retained
+Python heap measured with tracemalloc after the source dicts are dropped.
+
+    python -m benchmarks.bench_records [--records 100000]
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from book_record import BookRecord, BookTable
+
+WISHLISTS = ["Business Books", "General Books", "IT Books", "Hardcover Books", "Biography Books"]
+SELLERS = ["Cocoblu Retail", "Bookland International", "Repro Books", "Amazon", "Sapna Book House",
+           "Atlantic Publishers", None]
+
+
+def make_records(count, seed=7):
+    rng = random.Random(seed)
+    authors = [f"Author {i}" for i in range(400)]
+    books = []
+    for i in range(2000):
+        asin = f"B0{i:08d}"
+        books.append((f"Book title number {i}: a subtitle", rng.choice(authors), asin,
+                      rng.choice(["Paperback", "Hardcover", "Kindle Edition"]), rng.randint(100, 1200)))
+    start = datetime(2025, 7, 1)
+    records = []
+    for i in range(count):
+        title, author, asin, book_format, pages = books[i % len(books)]
+        price = float(rng.randint(150, 5000))
+        records.append({
+            "title": title, "author": author, "price": price, "pages": pages,
+            "reviews": rng.randint(0, 20000), "avg_rating": round(rng.uniform(3, 5), 1),
+            "link": f"https://www.amazon.in/dp/{asin}/?coliid=I{i % len(books):012d}&ref_=list_c_wl_lv_vv_lig_dp_it",
+            "asin": asin, "seller": rng.choice(SELLERS), "value_per_page": price / pages,
+            "wishlist_name": WISHLISTS[i % len(WISHLISTS)], "format": f"{book_format}\n\n₹{price:,.2f}",
+            "scraped_timestamp": (start + timedelta(minutes=i, microseconds=rng.randint(0, 999999))).isoformat(),
+        })
+    return json.dumps(records)
+
+
+def _retained(build, payload):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build(payload)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def run(records=100000):
+    payload = make_records(records)
+    builders = {
+        "dicts": json.loads,
+        "BookRecord": lambda raw: [BookRecord.from_dict(r) for r in json.loads(raw)],
+        "BookTable": lambda raw: BookTable.from_dicts(json.loads(raw)),
+    }
+    results = {}
+    baseline = None
+    for label, build in builders.items():
+        result, size, elapsed = _retained(build, payload)
+        del result
+        per_100k = size * 100000 / records
+        baseline = baseline or per_100k
+        results[label] = per_100k
+        ratio = "baseline" if label == "dicts" else f"{baseline / per_100k:.1f}x smaller"
+        print(f"{label:10s}: {per_100k / 1024 / 1024:7.1f} MB per 100k records ({ratio}), load {elapsed:.2f}s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+    run(args.records)
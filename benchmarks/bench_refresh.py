@@ -0,0 +1,74 @@
+"""
+Catch rate of price drops: volatility-aware refresh vs naive round-robin.
+
+Replays the dated all_wishlists.json snapshots kept in the web*/ dashboard
+folders as ground truth and gives both strategies the same daily page budget,
+expressed as a fraction of what a full refresh at every snapshot would cost.
+"cold" starts with no history; "warm" treats the first half of the snapshots
+as known history (the situation of a wishlist switching to planned refreshes)
+and evaluates on the second half.
+
+    python -m benchmarks.bench_refresh [--fractions 0.1 0.25 0.5] [--root .]
+"""
+import argparse
+import glob
+import json
+import os
+from datetime import datetime
+
+from refresh_planner import DAY, asin_of, backtest
+
+
+def load_snapshots(root="."):
+    """[(timestamp, {asin: price})] from every web*/all_wishlists.json that carries timestamps."""
+    snapshots = {}
+    for path in glob.glob(os.path.join(root, "web*", "all_wishlists.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                records = json.load(f)
+            except json.JSONDecodeError:
+                continue
+        stamps = [r["scraped_timestamp"] for r in records if r.get("scraped_timestamp")]
+        if not stamps:
+            continue
+        ts = datetime.fromisoformat(min(stamps)).timestamp()
+        prices = snapshots.setdefault(ts, {})
+        for record in records:
+            asin = asin_of(record)
+            if asin:
+                prices[asin] = record.get("price")
+    return sorted(snapshots.items())
+
+
+def run(fractions=(0.1, 0.25, 0.5), root="."):
+    snapshots = load_snapshots(root)
+    if len(snapshots) < 2:
+        print("Need at least two dated snapshots.")
+        return {}
+    days = (snapshots[-1][0] - snapshots[0][0]) / DAY + 1
+    full_pages = sum(len(prices) for _, prices in snapshots)
+    print(f"{len(snapshots)} snapshots over {days:.0f} days; full refresh at every snapshot = {full_pages} pages "
+          f"(catches every drop)")
+    split = len(snapshots) // 2
+    scenarios = {"cold": (snapshots, None), "warm": (snapshots[split - 1:], snapshots[:split])}
+    results = {}
+    for fraction in fractions:
+        pages_per_day = max(1, int(full_pages * fraction / days))
+        for scenario, (replay, history) in scenarios.items():
+            row = {strategy: backtest(replay, pages_per_day, strategy, history=history)
+                   for strategy in ("naive", "volatility")}
+            results[(fraction, scenario)] = row
+            naive, smart = row["naive"], row["volatility"]
+            print(f"  budget {fraction:4.0%} ({pages_per_day:3d} pages/day), {scenario}: "
+                  f"naive {naive['caught']}/{naive['drops']} ({naive['catch_rate']:.0%}), "
+                  f"volatility {smart['caught']}/{smart['drops']} ({smart['catch_rate']:.0%}), "
+                  f"{smart['caught'] / max(1, naive['caught']):.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fractions", type=float, nargs="+", default=[0.1, 0.25, 0.5])
+    parser.add_argument("--root", default=".")
+    args = parser.parse_args()
+    run(args.fractions, args.root)
@@ -0,0 +1,86 @@
+"""
+What a robot-check storm costs a run, with and without the circuit breaker.
+
+A simulated fetcher answers product pages in a few milliseconds, except
+during a storm of `--storm` seconds in which it returns captcha pages.
+
+- without detection: each captcha used to be a wait for #productTitle until
+  the timeout, then a dropped book; the cost is estimated from the books
+  that get a captcha (books x timeout / workers)
+- with the breaker: captchas are detected at once, all workers pause and
+  back off, and the blocked books are retried; measured wall time, with the
+  pauses scaled down like the storm
+
+    python -m benchmarks.bench_robot_check [--books 2000] [--workers 8] [--storm 2]
+"""
+import argparse
+import time
+
+from amazon_wishlist.fetchers import Fetcher
+from amazon_wishlist.pipeline import Pipeline
+from robot_check import CircuitBreaker, PageBlocked
+
+TIMEOUT = 10     # SeleniumFetcher's wait for #productTitle
+
+
+class StormFetcher(Fetcher):
+    """Product pages in `latency` seconds, captcha pages from `start` to `start + storm` seconds into the run."""
+    name = "storm"
+
+    def __init__(self, storm, start=0.1, latency=0.005, breaker=None):
+        self.storm = storm
+        self.start = start
+        self.latency = latency
+        self.breaker = breaker
+        self.began = None
+        self.captchas = 0
+        self.blocked_urls = set()
+
+    def fetch(self, url):
+        self.began = self.began or time.monotonic()
+        time.sleep(self.latency)
+        if self.start <= time.monotonic() - self.began < self.start + self.storm:
+            self.captchas += 1
+            self.blocked_urls.add(url)
+            raise PageBlocked(url, "captcha")
+        return url
+
+
+class _Extractor:
+    def extract(self, page, link):
+        return {"title": link}
+
+
+def _scrape(fetcher, books, workers):
+    book_data = [(f"https://www.amazon.in/dp/B{i:09d}", f"Book {i}", 100.0, "Paperback", "Bench") for i in range(books)]
+    started = time.perf_counter()
+    with Pipeline(fetcher, _Extractor(), workers=workers) as pipeline:
+        scraped = pipeline.scrape(book_data)
+    return time.perf_counter() - started, len(scraped), len(pipeline.blocked)
+
+
+def run(books=2000, workers=8, storm=2.0):
+    plain = StormFetcher(storm)
+    _scrape(plain, books, workers)
+    dropped = len(plain.blocked_urls)
+    lost_seconds = dropped * TIMEOUT / workers
+
+    breaker = CircuitBreaker(threshold=2, pause=storm / 4, max_pause=storm, max_trips=4)
+    guarded = StormFetcher(storm, breaker=breaker)
+    seconds, scraped_guarded, blocked = _scrape(guarded, books, workers)
+
+    print(f"\n{books} books, {workers} workers, a {storm:g}s captcha storm:")
+    print(f"  without detection   {dropped:6d} books hit a captcha, ~{lost_seconds:7.0f} s spent on timeouts, "
+          f"{dropped} books dropped")
+    print(f"  with the breaker    {guarded.captchas:6d} captchas,  {seconds:10.1f} s for the whole run, "
+          f"{breaker.trips} pauses, {books - scraped_guarded} books left ({blocked} blocked)")
+    return lost_seconds, seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--storm", type=float, default=2.0, help="storm length in seconds")
+    args = parser.parse_args()
+    run(args.books, args.workers, args.storm)
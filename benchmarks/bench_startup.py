@@ -0,0 +1,75 @@
+"""
+Startup import cost of the non-scraping entry points, against a budget.
+
+Each command runs in a fresh interpreter under `python -X importtime`. Its cost
+is the self time of every module it imports beyond what a bare interpreter
+already loads (`python -c pass`), so site-packages hooks do not count. A
+command fails the check when it exceeds the budget or loads any of the
+scraping-only packages (selenium, requests, aiohttp, bs4, lxml, pyarrow, numpy,
+keyboard, schedule). The exit status is non-zero on failure, so CI can run it.
+
+    python -m benchmarks.bench_startup [--budget-ms 60] [--repeat 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("selenium", "requests", "aiohttp", "bs4", "lxml", "pyarrow", "numpy", "keyboard", "schedule")
+COMMANDS = {
+    "6.py status": ["6.py", "status"],
+    "6.py analyze": ["6.py", "analyze", "--all", "--top", "1"],
+    "6.py compare": ["6.py", "compare", os.path.join("compare", "old.json"), os.path.join("compare", "new.json"),
+                     "--top", "0"],
+    "import amazon_wishlist": ["-c", "import amazon_wishlist"],
+    "import wishlist_scraper": ["-c", "import wishlist_scraper"],
+    "import price_index": ["-c", "import price_index"],
+    "import parquet_export": ["-c", "import parquet_export"],
+    "import snapshot_store": ["-c", "import snapshot_store"],
+}
+
+
+def import_times(args):
+    """{module: self time in µs} for one interpreter run of `args`."""
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=ROOT, capture_output=True,
+                            text=True, encoding="utf-8", errors="replace", stdin=subprocess.DEVNULL)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def run(budget_ms=60.0, repeat=3):
+    baseline = set(import_times(["-c", "pass"]))
+    failures = []
+    for label, args in COMMANDS.items():
+        best, modules = None, {}
+        for _ in range(repeat):
+            times = import_times(args)
+            own = {name: us for name, us in times.items() if name not in baseline}
+            total = sum(own.values()) / 1000
+            if best is None or total < best:
+                best, modules = total, own
+        heavy = sorted({name.split(".")[0] for name in modules if name.split(".")[0] in HEAVY})
+        slowest = ", ".join(f"{name} {us / 1000:.1f}" for name, us in
+                            sorted(modules.items(), key=lambda item: item[1], reverse=True)[:3])
+        ok = best <= budget_ms and not heavy
+        print(f"{'ok  ' if ok else 'FAIL'} {label:26s} {best:6.1f} ms  {len(modules):3d} modules  (slowest: {slowest})"
+              + (f"  loads {', '.join(heavy)}" if heavy else ""))
+        if not ok:
+            failures.append(label)
+    print(f"\nBudget {budget_ms:.0f} ms per command: " + ("all within budget" if not failures
+                                                         else f"{len(failures)} over: {', '.join(failures)}"))
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=60.0)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs per command")
+    args = parser.parse_args()
+    sys.exit(1 if run(args.budget_ms, args.repeat) else 0)
@@ -0,0 +1,94 @@
+"""
+Synthetic Amazon product pages for the benchmarks.
+
+The pages mimic the shape of a real ~700 KB product page: a large head full of
+inline scripts and JSON, recommendation carousels, and the handful of
+containers the extractor actually reads (title, byline, swatches, detail
+bullets, tech-spec table, reviews summary, seller).
+"""
+import json
+import random
+
+FIXTURE_ASINS = [f"B0{n:08d}" for n in range(1000)]
+
+
+def _inline_script(rng, size):
+    payload = {"widgets": [{"id": rng.randrange(10**9), "slot": f"slot-{i}", "weight": rng.random()}
+                           for i in range(size // 60)]}
+    return f'<script type="text/javascript">P.when("A").register("w", {json.dumps(payload)});</script>\n'
+
+
+def _carousel(rng, items):
+    cards = "".join(
+        f'<li class="a-carousel-card"><div class="p13n-sc-uncoverable-faceout">'
+        f'<a class="a-link-normal" href="/dp/{rng.choice(FIXTURE_ASINS)}/"><img alt="" src="https://m.media-amazon.com/images/I/x{i}.jpg">'
+        f'<div class="p13n-sc-truncate">Recommended book number {i} with a long-ish title</div></a>'
+        f'<span class="a-size-base a-color-price">₹{rng.randrange(100, 900)}.00</span></div></li>'
+        for i in range(items))
+    return f'<div class="a-carousel-container"><ol class="a-carousel">{cards}</ol></div>\n'
+
+
+def make_product_page(index=0, target_kb=700):
+    """Returns the bytes of one synthetic product page, deterministic per index."""
+    rng = random.Random(index)
+    pages = rng.randrange(120, 900)
+    reviews = rng.randrange(0, 25000)
+    rating = round(rng.uniform(3.0, 5.0), 1)
+    price = rng.randrange(99, 1500)
+
+    head = "".join(_inline_script(rng, 6000) for _ in range(20))
+    relevant = f"""
+<div id="centerCol">
+  <h1 id="title"><span id="productTitle" class="a-size-extra-large">Synthetic Book {index}</span></h1>
+  <div id="bylineInfo" class="a-section">
+    <span class="author notFaded"><a class="a-link-normal" href="/e/B0AUTHOR">Author {index % 97}</a>
+    <span class="contribution"><span class="a-color-secondary">(Author)</span></span></span>
+    <span class="author notFaded"><a class="a-link-normal" href="/e/B0EDITOR">Editor {index % 13}</a></span>
+  </div>
+  <div id="averageCustomerReviews">
+    <span id="acrPopover" title="{rating} out of 5 stars"></span>
+    <span id="acrCustomerReviewText" class="a-size-base">{reviews:,} ratings</span>
+  </div>
+  <div id="tmmSwatches"><ul>
+    <li class="swatchElement selected"><span class="a-button a-button-selected"><span class="a-button-inner">
+      <a class="a-button-text"><span>Paperback</span><br><span class="a-color-price">₹{price}.00</span></a></span></span></li>
+    <li class="swatchElement"><span class="a-button"><span class="a-button-inner">
+      <a class="a-button-text"><span>Kindle Edition</span></a></span></span></li>
+  </ul></div>
+  <div id="merchant-info">Ships from and sold by <a id="sellerProfileTriggerId" href="/gp/seller">Seller {index % 7}</a>.</div>
+</div>
+"""
+    details = f"""
+<div id="detailBullets_feature_div"><ul class="a-unordered-list a-nostyle a-vertical a-spacing-none detail-bullet-list">
+  <li><span class="a-list-item"><span class="a-text-bold">Publisher &rlm; : &lrm;</span><span>Penguin ({rng.randrange(1, 28)} January 2020)</span></span></li>
+  <li><span class="a-list-item"><span class="a-text-bold">Language &rlm; : &lrm;</span><span>English</span></span></li>
+  <li><span class="a-list-item"><span class="a-text-bold">Paperback &rlm; : &lrm;</span><span>{pages} pages</span></span></li>
+  <li><span class="a-list-item"><span class="a-text-bold">ISBN-10 &rlm; : &lrm;</span><span>{rng.randrange(10**9, 10**10)}</span></span></li>
+</ul></div>
+<table id="productDetails_techSpec_section_1" class="a-keyvalue prodDetTable">
+  <tr><th>Item Weight</th><td>{rng.randrange(100, 900)} g</td></tr>
+  <tr><th>Dimensions</th><td>12.9 x 2 x 19.8 cm</td></tr>
+</table>
+<div id="reviewsMedley"><span data-hook="rating-out-of-text">{rating} out of 5</span>
+  <span data-hook="total-review-count">{reviews:,} global ratings</span></div>
+"""
+    size = len(head) + len(relevant) + len(details)
+    carousels = []
+    while size < target_kb * 1024:
+        block = _carousel(rng, 12) + _inline_script(rng, 3000)
+        carousels.append(block)
+        size += len(block)
+    half = len(carousels) // 2
+    body = carousels[:half] + [relevant, details] + carousels[half:]
+    html = (f'<!doctype html><html lang="en-in"><head><title>Synthetic Book {index}</title>{head}</head>'
+            f'<body><div id="dp-container">{"".join(body)}</div></body></html>')
+    return html.encode("utf-8")
+
+
+def expected_fields(index):
+    """Ground truth for make_product_page(index), for sanity checks."""
+    rng = random.Random(index)
+    pages = rng.randrange(120, 900)
+    reviews = rng.randrange(0, 25000)
+    rating = round(rng.uniform(3.0, 5.0), 1)
+    return {"page_count": pages, "review_count": reviews, "avg_rating": rating}
@@ -0,0 +1,221 @@
+"""
+Compact in-memory representations of scraped book records.
+
+A scraped record is a 13-key dict, which costs roughly 1 KB per book once its
+own copies of the format, seller and wishlist strings are counted. For long
+histories use:
+
+- `BookRecord`: a `__slots__` object with the same fields and interned
+  repeated strings. It supports `record["price"]` and `record.get("price")`,
+  so code written against the dicts keeps working.
+- `BookTable`: column storage (`array` for numbers and timestamps, category
+  codes for strings) for bulk work over 100k+ rows. Rows come back as
+  `BookRecord`s on demand.
+
+`as_dicts` turns a list of dicts, a list of BookRecords or a BookTable into
+plain dicts for the JSON/CSV writers.
+"""
+import sys
+from array import array
+from datetime import datetime, timedelta
+
+FIELDS = (
+    "title", "author", "price", "pages", "reviews", "avg_rating", "seller",
+    "value_per_page", "link", "asin", "wishlist_name", "format", "scraped_timestamp",
+)
+# Strings that repeat across a history (every run re-scrapes the same books); interned so
+# every record of a book shares one string object.
+INTERNED_FIELDS = ("title", "author", "seller", "link", "asin", "wishlist_name", "format")
+FLOAT_FIELDS = ("price", "avg_rating", "value_per_page")
+INT_FIELDS = ("pages", "reviews")
+
+_MISSING_INT = -1
+_EPOCH = datetime(1970, 1, 1)   # Naive arithmetic: scrape timestamps are local wall-clock times
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class BookRecord:
+    """One scraped book. Keys outside FIELDS (e.g. details_timestamp) are kept in `extra`."""
+
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, **fields):
+        extra = None
+        for name in FIELDS:
+            value = fields.pop(name, None)
+            setattr(self, name, _intern(value) if name in INTERNED_FIELDS else value)
+        if fields:
+            extra = fields
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(**record)
+
+    def to_dict(self):
+        record = {name: getattr(self, name) for name in FIELDS}
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+    def get(self, key, default=None):
+        if key in FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key):
+        if key in FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __eq__(self, other):
+        return isinstance(other, BookRecord) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"BookRecord(asin={self.asin!r}, title={self.title!r}, price={self.price!r})"
+
+
+class BookTable:
+    """
+    Column-oriented record container. Numeric fields live in `array`s (NaN or
+    -1 for missing values), timestamps as int64 microseconds and strings as
+    codes into a per-column category list.
+    """
+
+    def __init__(self):
+        self.floats = {name: array("d") for name in FLOAT_FIELDS}
+        self.ints = {name: array("q") for name in INT_FIELDS}
+        self.codes = {name: array("I") for name in INTERNED_FIELDS}
+        self.categories = {name: [] for name in INTERNED_FIELDS}
+        self._category_index = {name: {} for name in INTERNED_FIELDS}
+        self.timestamps = array("q")
+        self.extras = {}    # row -> dict of keys outside FIELDS, only for rows that have any
+
+    @classmethod
+    def from_dicts(cls, records):
+        table = cls()
+        table.extend(records)
+        return table
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def _code(self, name, value):
+        index = self._category_index[name]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(self.categories[name])
+            self.categories[name].append(_intern(value))
+        return code
+
+    def append(self, record):
+        """Adds a dict or BookRecord."""
+        if isinstance(record, BookRecord):
+            record = record.to_dict()
+        row = len(self)
+        for name in FLOAT_FIELDS:
+            value = record.get(name)
+            self.floats[name].append(float("nan") if value is None else float(value))
+        for name in INT_FIELDS:
+            value = record.get(name)
+            self.ints[name].append(_MISSING_INT if value is None else int(value))
+        for name in INTERNED_FIELDS:
+            self.codes[name].append(self._code(name, record.get(name)))
+        extra = {k: v for k, v in record.items() if k not in FIELDS}
+        stamp = record.get("scraped_timestamp")
+        try:
+            micros = _to_micros(stamp) if stamp is not None else _MISSING_INT
+        except (TypeError, ValueError):
+            micros = _MISSING_INT
+            extra["scraped_timestamp"] = stamp
+        self.timestamps.append(micros)
+        if extra:
+            self.extras[row] = extra
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def column(self, name):
+        """The raw column: an array for numbers/timestamps, a list of values otherwise."""
+        if name in self.floats:
+            return self.floats[name]
+        if name in self.ints:
+            return self.ints[name]
+        if name in self.codes:
+            categories = self.categories[name]
+            return [categories[code] for code in self.codes[name]]
+        if name == "scraped_timestamp":
+            return self.timestamps
+        raise KeyError(name)
+
+    def row(self, i):
+        """Row `i` as a BookRecord."""
+        fields = {}
+        for name, values in self.floats.items():
+            value = values[i]
+            fields[name] = None if value != value else value
+        for name, values in self.ints.items():
+            value = values[i]
+            fields[name] = None if value == _MISSING_INT else value
+        for name, codes in self.codes.items():
+            fields[name] = self.categories[name][codes[i]]
+        micros = self.timestamps[i]
+        fields["scraped_timestamp"] = None if micros == _MISSING_INT else _from_micros(micros)
+        if i in self.extras:
+            fields.update(self.extras[i])
+        return BookRecord(**fields)
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def take(self, indices):
+        """New table with the given rows, in order."""
+        table = BookTable()
+        table.extend(self.row(i).to_dict() for i in indices)
+        return table
+
+    def latest_by(self, key="asin"):
+        """Row indices of the most recent record per `key` value (rows without a key are dropped)."""
+        latest = {}
+        keys = self.column(key)
+        for i, value in enumerate(keys):
+            if value is not None and (value not in latest or self.timestamps[i] >= self.timestamps[latest[value]]):
+                latest[value] = i
+        return sorted(latest.values())
+
+    def argsort(self, name, reverse=False, indices=None):
+        """Row indices sorted by a numeric column, rows with a missing value left out."""
+        values = self.column(name)
+        missing = _MISSING_INT if name in self.ints else None
+        rows = range(len(self)) if indices is None else indices
+        rows = [i for i in rows if values[i] == values[i] and values[i] != missing]
+        return sorted(rows, key=values.__getitem__, reverse=reverse)
+
+
+def _to_micros(stamp):
+    moment = datetime.fromisoformat(stamp)
+    if moment.tzinfo is not None or moment.isoformat() != stamp:
+        raise ValueError(stamp)     # Keep anything that would not round-trip as text
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(micros):
+    return (_EPOCH + micros * _MICROSECOND).isoformat()
+
+
+def as_dicts(books):
+    """Iterates plain dicts from a list of dicts or BookRecords, or a BookTable."""
+    for book in books:
+        yield book.to_dict() if isinstance(book, BookRecord) else book
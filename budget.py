@@ -0,0 +1,141 @@
+"""
+"Best books to buy under ₹X": a knapsack over a wishlist's latest state.
+
+Each book with a price gets a utility from 0 to 100, a weighted mix of:
+
+- importance: its importance_rating (0-5) from the dashboard's
+  my_ratings.json ({asin: rating}), unrated books count as 0
+- rating: avg_rating / 5, shrunk towards 0 for books with few reviews
+  (reviews / (reviews + REVIEW_PRIOR)), so one 5-star review is not a classic
+- value: where its value_per_page ranks in the wishlist, 1 for the cheapest
+  per page and 0 for the dearest (0.5 when unknown)
+
+`solve` picks the set with the highest total utility whose total price fits
+the budget. It is an exact depth-first branch-and-bound over the books in
+order of utility per rupee. The bound at each node is the fractional
+knapsack of the remaining books, found with a binary search over prefix sums,
+and books of equal price are only taken best-first. A few thousand books
+take tens of milliseconds (benchmarks/bench_budget.py). Prices are used as
+they are, not rounded onto a grid. If `node_limit` is reached, the best
+set found so far is returned, flagged as not proven optimal.
+"""
+import bisect
+import json
+import os
+from itertools import accumulate
+
+from product_key import asin_of
+
+DEFAULT_WEIGHTS = {"importance": 0.5, "rating": 0.3, "value": 0.2}
+REVIEW_PRIOR = 20
+NODE_LIMIT = 2_000_000
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        return None
+    return value
+
+
+def load_ratings(path):
+    """{asin: importance_rating} from a my_ratings.json the dashboard downloaded; {} without one."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {asin: rating for asin, rating in json.load(f).items() if _number(rating) is not None}
+
+
+def utilities(records, ratings=None, weights=None):
+    """Utility (0-100) of each record, in order."""
+    ratings = ratings or {}
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+    total_weight = sum(weights.values()) or 1
+
+    valued = sorted({v for r in records if (v := _number(r.get("value_per_page"))) is not None})
+    value_rank = {v: 1 - i / (len(valued) - 1) if len(valued) > 1 else 1.0 for i, v in enumerate(valued)}
+
+    scores = []
+    for record in records:
+        importance = min(5, max(0, ratings.get(asin_of(record), 0))) / 5
+        reviews = _number(record.get("reviews")) or 0
+        rating = (_number(record.get("avg_rating")) or 0) / 5 * reviews / (reviews + REVIEW_PRIOR)
+        value = value_rank.get(_number(record.get("value_per_page")), 0.5)
+        scores.append(100 * (weights["importance"] * importance + weights["rating"] * rating
+                             + weights["value"] * value) / total_weight)
+    return scores
+
+
+def solve(prices, values, budget, node_limit=NODE_LIMIT):
+    """
+    0/1 knapsack: (indices of the chosen items, their total value, proven optimal).
+    Items with a price above the budget or a value of 0 or less are never chosen.
+    """
+    order = sorted((i for i in range(len(prices)) if 0 < prices[i] <= budget and values[i] > 0),
+                   key=lambda i: values[i] / prices[i], reverse=True)
+    p = [prices[i] for i in order]
+    v = [values[i] for i in order]
+    n = len(order)
+    prefix_p = [0] + list(accumulate(p))
+    prefix_v = [0] + list(accumulate(v))
+
+    def bound(i, capacity):
+        """Best value reachable from item i on with `capacity` left, allowing a fraction of one item."""
+        j = bisect.bisect_right(prefix_p, prefix_p[i] + capacity, i) - 1     # Items i..j-1 fit whole
+        value = prefix_v[j] - prefix_v[i]
+        if j < n:
+            value += (capacity - (prefix_p[j] - prefix_p[i])) * v[j] / p[j]
+        return value
+
+    # Books of equal price come in order of value, so some optimal set takes a prefix of each
+    # price: once a book is left out, every later one at its price is too. Without this, a
+    # wishlist full of ₹299 and ₹499 books has countless equivalent sets to wade through.
+    banned = {}         # price -> how many excluded books on the current path have it
+    bans = []           # (position, price) of those exclusions, in path order
+    best_value, best_set = 0, []
+    taken = []          # Positions in `order` of the current partial solution
+    i, capacity, value, nodes = 0, budget, 0, 0
+    while True:
+        nodes += 1
+        if nodes > node_limit:
+            return sorted(order[k] for k in best_set), best_value, False
+        if i < n and value + bound(i, capacity) > best_value + 1e-9:
+            if p[i] <= capacity and not banned.get(p[i]):
+                taken.append(i)
+                capacity -= p[i]
+                value += v[i]
+            i += 1
+            continue
+        if value > best_value:
+            best_value, best_set = value, list(taken)
+        if not taken:
+            return sorted(order[k] for k in best_set), best_value, True
+        k = taken.pop()             # Backtrack: try the branch without item k
+        while bans and bans[-1][0] > k:
+            banned[bans.pop()[1]] -= 1
+        bans.append((k, p[k]))
+        banned[p[k]] = banned.get(p[k], 0) + 1
+        capacity += p[k]
+        value -= v[k]
+        i = k + 1
+
+
+def plan(records, budget, ratings=None, weights=None, node_limit=NODE_LIMIT):
+    """The books to buy within `budget` out of the latest records, as the dict export_plan writes."""
+    records = [r for r in records if _number(r.get("price")) is not None and r["price"] > 0]
+    scores = utilities(records, ratings, weights)
+    chosen, total_utility, optimal = solve([r["price"] for r in records], scores, budget, node_limit)
+    books = sorted(({"asin": asin_of(records[i]), "title": records[i].get("title"), "link": records[i].get("link"),
+                     "price": records[i]["price"], "utility": round(scores[i], 2),
+                     "importance_rating": (ratings or {}).get(asin_of(records[i]), 0),
+                     "wishlist_name": records[i].get("wishlist_name")} for i in chosen),
+                   key=lambda book: book["utility"], reverse=True)
+    return {"budget": budget, "total_price": round(sum(book["price"] for book in books), 2),
+            "total_utility": round(total_utility, 2), "optimal": optimal, "candidates": len(records),
+            "asins": [book["asin"] for book in books], "books": books}
+
+
+def export_plan(result, path):
+    """Writes the plan as JSON for the dashboard (its `asins` are the books to tick)."""
+    from atomic_write import atomic_write
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    atomic_write(path, json.dumps(result, indent=4, ensure_ascii=False))
@@ -1,4 +1,11 @@
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atomic_write import atomic_open
+from json_stream import iter_json_array
+from product_key import asin_of, canonical_url
 
 def compare_prices(old_file_path, new_file_path):
     """
@@ -13,11 +20,15 @@ def compare_prices(old_file_path, new_file_path):
         list: A list of dictionaries for books with decreased prices.
               Returns an empty list if any file fails to load or no prices have decreased.
     """
+    # Both files are streamed; only the old price per ASIN is kept in memory.
+    # Older files may lack the 'asin' field; it is then taken from the link.
     try:
-        with open(old_file_path, 'r') as f:
-            old_data = json.load(f)
-        with open(new_file_path, 'r') as f:
-            new_data = json.load(f)
+        old_prices = {asin_of(item): item.get('price') for item in iter_json_array(old_file_path)}
+        decreased_prices = []
+        for new_book in iter_json_array(new_file_path):
+            book_info = _price_decrease(new_book, old_prices)
+            if book_info:
+                decreased_prices.append(book_info)
     except FileNotFoundError:
         print("Error: One of the input files was not found.")
         return []
@@ -25,49 +36,47 @@ def compare_prices(old_file_path, new_file_path):
         print("Error: Could not decode one of the JSON files.")
         return []
 
-    old_prices = {item['asin']: item for item in old_data}
-    decreased_prices = []
+    return decreased_prices
 
-    for new_book in new_data:
-        asin = new_book.get('asin')
-        new_price = new_book.get('price')
+def _price_decrease(new_book, old_prices):
+    """The decrease record for one book, or None when its price did not drop."""
+    asin = asin_of(new_book)
+    new_price = new_book.get('price')
 
-        # Check if the book existed in the old data and has a valid price
-        if asin in old_prices and new_price is not None:
-            old_book = old_prices[asin]
-            old_price = old_book.get('price')
+    # Check if the book existed in the old data and has a valid price
+    if not asin or asin not in old_prices or new_price is None:
+        return None
+    old_price = old_prices[asin]
 
-            # Only proceed if the old price is also valid and greater than the new price
-            if old_price is not None and new_price < old_price:
-                price_decrease = old_price - new_price
-                
-                # Calculate percentage decrease if both prices are not zero
-                percentage_decrease = 0
-                if old_price > 0:
-                    percentage_decrease = (price_decrease / old_price) * 100
+    # Only proceed if the old price is also valid and greater than the new price
+    if old_price is None or new_price >= old_price:
+        return None
+    price_decrease = old_price - new_price
 
-                book_info = {
-                    'title': new_book.get('title'),
-                    'author': new_book.get('author'),
-                    'asin': asin,
-                    'link': new_book.get('link'),
-                    'new_price': new_price,
-                    'old_price': old_price,
-                    'price_decrease_abs': round(price_decrease, 2),
-                    'price_decrease_perc': round(percentage_decrease, 2),
-                    'pages': new_book.get('pages'),
-                    'reviews': new_book.get('reviews'),
-                    'avg_rating': new_book.get('avg_rating'),
-                    'wishlist_name': new_book.get('wishlist_name'),
-                    'format': new_book.get('format'),
-                }
-                decreased_prices.append(book_info)
+    # Calculate percentage decrease if both prices are not zero
+    percentage_decrease = 0
+    if old_price > 0:
+        percentage_decrease = (price_decrease / old_price) * 100
 
-    return decreased_prices
+    return {
+        'title': new_book.get('title'),
+        'author': new_book.get('author'),
+        'asin': asin,
+        'link': canonical_url(new_book.get('link'), asin),
+        'new_price': new_price,
+        'old_price': old_price,
+        'price_decrease_abs': round(price_decrease, 2),
+        'price_decrease_perc': round(percentage_decrease, 2),
+        'pages': new_book.get('pages'),
+        'reviews': new_book.get('reviews'),
+        'avg_rating': new_book.get('avg_rating'),
+        'wishlist_name': new_book.get('wishlist_name'),
+        'format': new_book.get('format'),
+    }
 
 def save_to_json(data, output_file_path):
     """Saves a list of dictionaries to a JSON file."""
-    with open(output_file_path, 'w') as f:
+    with atomic_open(output_file_path) as f:
         json.dump(data, f, indent=4)
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+"""
+Cover images for the books of a run, the option 4.py turns on ('scraping.cover_images').
+
+The extractor adds each book's `image_url` (the largest size in the page's
+data-a-dynamic-image list); `download_covers` saves it as
+<dir>/<wishlist>/<ASIN><ext> before the run is stored and sets the record's
+`image_file_path`. A cover already on disk is not downloaded again, so a
+re-scrape only fetches the covers of new books. Downloads share the keep-alive
+sessions of http_fetcher.py.
+"""
+import os
+from urllib.parse import urlsplit
+
+from atomic_write import atomic_write
+from product_key import asin_of
+
+
+def cover_path(record, directory):
+    extension = os.path.splitext(urlsplit(record["image_url"]).path)[1] or ".jpg"
+    return os.path.join(directory, record.get("wishlist_name") or "", f"{asin_of(record)}{extension}")
+
+
+def _download(url, path, timeout):
+    import requests
+    from http_fetcher import get_session, release_session
+    session = get_session()
+    try:
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        atomic_write(path, response.content)
+        return True
+    except (requests.RequestException, OSError) as e:
+        print(f"Error downloading image {url}: {e}")
+        return False
+    finally:
+        release_session(session)
+
+
+def download_covers(records, directory, workers=4, timeout=30):
+    """Downloads the missing covers of `records` and sets their image_file_path; returns how many were downloaded."""
+    from concurrent.futures import ThreadPoolExecutor
+    pending = []
+    for record in records:
+        if not record.get("image_url") or not asin_of(record):
+            continue
+        path = cover_path(record, directory)
+        if os.path.exists(path):
+            record["image_file_path"] = path
+        else:
+            pending.append((record, path))
+    if not pending:
+        return 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda item: _download(item[0]["image_url"], item[1], timeout), pending))
+    for (record, path), downloaded in zip(pending, results):
+        record["image_file_path"] = path if downloaded else None
+    return sum(results)
@@ -0,0 +1,278 @@
+"""
+Delta-encoded snapshots of all_wishlists.json.
+
+Consecutive combined files differ in a handful of prices and review counts,
+yet every full copy repeats all ~1300 records. This store keeps a full base
+every `base_every` versions (or sooner, when a delta would be more than
+`BASE_RATIO` of a full copy) and, in between, only what changed per book:
+
+    {"removed": [i], "changed": [[i, {"set": {...}, "unset": [...]}]], "added": [[key, record]]}
+
+where i is the book's position in the previous version. A book's key is
+product_key.record_key, the key all_wishlists.json is merged by:
+"<wishlist_name>/<asin>" (the same ASIN sits in several wishlists), falling
+back to the canonical link for records without an ASIN. Record order is stored
+(as positions) only when it differs from "previous order, removed books
+dropped, new books appended", which is how merge_json_array writes the file.
+
+`records(i)` rebuilds version i from the nearest cached state or base, so
+stepping through history applies each delta once. `write_pair` materialises
+the dashboard's current/previous files on demand.
+
+    python delta_snapshots.py report web*     # Storage compared with the full copies
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from atomic_write import atomic_write
+from json_stream import iter_json_array, write_json_array
+from product_key import record_key
+from snapshot_store import CURRENT_NAME, PREVIOUS_NAME, date_copies, find_copies
+
+DEFAULT_DIR = os.path.join("scraped_data", "snapshots", "delta")
+MANIFEST_FILE = "manifest.json"
+BASE_EVERY = 20
+BASE_RATIO = 0.5
+CACHE_SIZE = 4
+
+
+def keyed(records):
+    """(order, {key: record}); repeated keys are made unique with a #n suffix."""
+    order, by_key = [], {}
+    for record in records:
+        key = record_key(record)
+        if key in by_key:
+            n = 2
+            while f"{key}#{n}" in by_key:
+                n += 1
+            key = f"{key}#{n}"
+        order.append(key)
+        by_key[key] = record
+    return order, by_key
+
+
+def _same(a, b):
+    return a == b and type(a) is type(b)     # 367 and 367.0 serialise differently
+
+
+def diff(old, new):
+    """Delta turning state `old` into state `new`; None when they are identical."""
+    old_order, old_records = old
+    new_order, new_records = new
+    delta = {"removed": [], "changed": [], "added": []}
+    for position, key in enumerate(old_order):
+        if key not in new_records:
+            delta["removed"].append(position)
+            continue
+        previous, record = old_records[key], new_records[key]
+        change = {"set": {name: value for name, value in record.items()
+                          if name not in previous or not _same(previous[name], value)},
+                  "unset": [name for name in previous if name not in record]}
+        if list(_updated(previous, change)) != list(record):
+            change["fields"] = list(record)     # Only needed when the update alone gets the field order wrong
+        if change["set"] or change["unset"] or "fields" in change:
+            delta["changed"].append([position, change])
+    delta["added"] = [[key, new_records[key]] for key in new_order if key not in old_records]
+    natural = _natural_order(old_order, delta)
+    if natural != new_order:
+        positions = {key: i for i, key in enumerate(natural)}
+        delta["order"] = [positions[key] for key in new_order]
+    if not (delta["removed"] or delta["changed"] or delta["added"] or "order" in delta):
+        return None
+    return delta
+
+
+def _natural_order(old_order, delta):
+    removed = set(delta["removed"])
+    return [key for i, key in enumerate(old_order) if i not in removed] + [key for key, _ in delta["added"]]
+
+
+def _updated(record, change):
+    record = {name: value for name, value in record.items() if name not in change["unset"]}
+    record.update(change["set"])
+    if "fields" in change:
+        record = {name: record[name] for name in change["fields"]}
+    return record
+
+
+def apply(state, delta):
+    """New state from `state` and `delta`; `state` itself is left untouched."""
+    order, records = state
+    records = dict(records)
+    for position in delta["removed"]:
+        del records[order[position]]
+    for position, change in delta["changed"]:
+        records[order[position]] = _updated(records[order[position]], change)
+    records.update(delta["added"])
+    natural = _natural_order(order, delta)
+    if "order" in delta:
+        natural = [natural[i] for i in delta["order"]]
+    return natural, records
+
+
+class DeltaStore:
+    def __init__(self, directory=DEFAULT_DIR, base_every=BASE_EVERY, cache_size=CACHE_SIZE):
+        self.directory = directory
+        self.base_every = base_every
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self.versions = []
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.versions = json.load(f).get("versions", [])
+        self._cache = OrderedDict()     # version index -> state, least recently used first
+        self._cache_size = cache_size
+
+    def _path(self, version):
+        return os.path.join(self.directory, version["file"])
+
+    def _load(self, version):
+        with open(self._path(version), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _remember(self, index, state):
+        self._cache[index] = state
+        self._cache.move_to_end(index)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    # --- Reading ---
+
+    def state(self, index=-1):
+        """(order, {key: record}) of version `index`."""
+        index = range(len(self.versions))[index]
+        if index in self._cache:
+            self._cache.move_to_end(index)
+            return self._cache[index]
+        base = max(i for i in range(index + 1) if self.versions[i]["kind"] == "base")
+        start = max((i for i in self._cache if base <= i < index), default=None)
+        if start is None:
+            state = keyed(self._load(self.versions[base])["records"])
+            start = base
+        else:
+            state = self._cache[start]
+        for i in range(start + 1, index + 1):
+            state = apply(state, self._load(self.versions[i]))
+        self._remember(index, state)
+        return state
+
+    def records(self, index=-1):
+        """The combined file's records as of version `index`."""
+        order, records = self.state(index)
+        return [records[key] for key in order]
+
+    def find(self, when):
+        """Index of the version that was current at `when` (a datetime), or None."""
+        stamp = when.isoformat()
+        found = None
+        for i, version in enumerate(self.versions):
+            if version["taken_at"] > stamp:
+                break
+            found = i
+        return found
+
+    def write_pair(self, web_dir, index=-1, current_name=CURRENT_NAME, previous_name=PREVIOUS_NAME):
+        """Writes version `index` and the one before it as the dashboard's current/previous files."""
+        index = range(len(self.versions))[index]
+        write_json_array(os.path.join(web_dir, current_name), self.records(index))
+        if index > 0:
+            write_json_array(os.path.join(web_dir, previous_name), self.records(index - 1))
+
+    # --- Recording ---
+
+    def add(self, records, taken_at=None, source=None):
+        """Records a new latest version; returns (version, created), created False when nothing changed."""
+        new = keyed(records)
+        taken_at = (taken_at or datetime.now()).isoformat()
+        if self.versions and taken_at < self.versions[-1]["taken_at"]:
+            raise ValueError(f"Snapshot taken at {taken_at} is older than the latest version")
+        delta = diff(self.state(), new) if self.versions else None
+        if self.versions and delta is None:
+            return self.versions[-1], False
+
+        index = len(self.versions)
+        payload = None
+        if delta is not None:
+            last_base = max(i for i, v in enumerate(self.versions) if v["kind"] == "base")
+            payload = json.dumps(delta, ensure_ascii=False, separators=(",", ":"))
+            if (index - last_base >= self.base_every
+                    or len(payload.encode("utf-8")) > BASE_RATIO * self.versions[last_base]["bytes"]):
+                payload = None
+        kind = "delta" if payload is not None else "base"
+        if payload is None:
+            payload = json.dumps({"records": [new[1][key] for key in new[0]]}, ensure_ascii=False, separators=(",", ":"))
+        version = {"taken_at": taken_at, "kind": kind, "file": f"{index:06d}.{kind}.json",
+                   "items": len(new[0]), "bytes": len(payload.encode("utf-8")), "source": source}
+        atomic_write(self._path(version), payload)
+        self.versions.append(version)
+        atomic_write(self.manifest_path, json.dumps({"versions": self.versions}, indent=4))
+        self._remember(index, new)
+        return version, True
+
+    def storage_bytes(self):
+        return sum(os.path.getsize(self._path(v)) for v in self.versions) + os.path.getsize(self.manifest_path)
+
+
+def report(paths, base_every=BASE_EVERY):
+    """Loads the given copies into a scratch store, checks every reconstruction and prints the sizes."""
+    dated = date_copies(find_copies(paths))
+    directory = tempfile.mkdtemp(prefix="delta_report_")
+    try:
+        store = DeltaStore(directory, base_every)
+        copies_bytes, sources = 0, []
+        for taken_at, path in dated:
+            copies_bytes += os.path.getsize(path)
+            if store.add(iter_json_array(path), taken_at, source=path)[1]:
+                sources.append(path)
+        compact_bytes = slowest = 0
+        for i, path in enumerate(sources):
+            expected = list(iter_json_array(path))
+            compact_bytes += len(json.dumps(expected, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            store._cache.clear()
+            started = time.perf_counter()
+            rebuilt = store.records(i)
+            slowest = max(slowest, time.perf_counter() - started)
+            if rebuilt != expected:
+                raise AssertionError(f"Version {i} does not reconstruct {path}")
+        full_bytes = sum(os.path.getsize(path) for path in sources)
+        delta_bytes = store.storage_bytes()
+        bases = sum(1 for v in store.versions if v["kind"] == "base")
+        mb = 1024 * 1024
+        print(f"{len(dated)} copies as stored today:        {copies_bytes / mb:6.1f} MB")
+        print(f"{len(sources)} distinct versions, full files:   {full_bytes / mb:6.1f} MB")
+        print(f"  ... as compact JSON (no indent):   {compact_bytes / mb:6.1f} MB")
+        print(f"Delta-encoded, {bases} bases + {len(sources) - bases} deltas: {delta_bytes / mb:6.1f} MB "
+              f"({full_bytes / delta_bytes:.1f}x smaller than the full files, "
+              f"{compact_bytes / delta_bytes:.1f}x smaller than compact full copies)")
+        print(f"Every version reconstructs exactly; slowest cold reconstruction {slowest * 1000:.0f} ms")
+        return copies_bytes, full_bytes, delta_bytes
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delta-encoded all_wishlists.json snapshots")
+    parser.add_argument("--dir", default=DEFAULT_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_cmd = sub.add_parser("report", help="storage of the given copies, full vs delta-encoded")
+    report_cmd.add_argument("paths", nargs="+")
+    report_cmd.add_argument("--base-every", type=int, default=BASE_EVERY)
+    pair_cmd = sub.add_parser("pair", help="write the current/previous files for the dashboard")
+    pair_cmd.add_argument("web_dir")
+    pair_cmd.add_argument("--at", help="ISO date/time; default: the latest version")
+    args = parser.parse_args()
+
+    if args.command == "report":
+        report(args.paths, args.base_every)
+    else:
+        deltas = DeltaStore(args.dir)
+        at = deltas.find(datetime.fromisoformat(args.at)) if args.at else -1
+        if at is None:
+            parser.error(f"No version as old as {args.at}")
+        deltas.write_pair(args.web_dir, at)
+        print(f"Wrote version {range(len(deltas.versions))[at]} and its predecessor to {args.web_dir}")
@@ -0,0 +1,159 @@
+"""
+Coordinator/worker mode for scraping over a shared JobQueue.
+
+The coordinator enumerates each wishlist, publishes one job per book and
+ingests finished wishlists into `save_results`. Workers lease jobs, run the
+per-book scrape function and post the resulting record. Scrape functions are
+passed in by the caller (amazon_wishlist/app.py), so this module has no
+Selenium dependency.
+
+Workers on other hosts only need the queue file on shared storage and the
+same scraper checkout.
+
+A job whose page was a robot check goes back to the queue without using up
+an attempt, up to max_attempts times; the worker's circuit breaker
+(robot_check.py) pauses it first. Once the breaker gives up, or a job was
+requeued too often, jobs fail as usual so the run can finish.
+"""
+import multiprocessing
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from job_queue import JobQueue, default_worker_id
+from robot_check import FetchingStopped, PageBlocked
+
+
+def new_run_id():
+    return datetime.now().strftime("%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:6]
+
+
+def publish_wishlists(queue, run_id, wishlists, enumerate_fn):
+    """
+    Enumerates every wishlist and publishes its books; returns {wishlist name: job count}.
+    Workers start on the first wishlist's jobs while later ones are still being enumerated.
+    """
+    published = {}
+    queue.open_run(run_id)
+    try:
+        for wishlist in wishlists:
+            book_data_list = enumerate_fn(wishlist)
+            # Payload is the book_data tuple process_single_book expects.
+            jobs = [(book_data[0], list(book_data)) for book_data in book_data_list]
+            published[wishlist["name"]] = queue.publish(run_id, wishlist["name"], jobs)
+            print(f"📤 Published {len(jobs)} jobs for '{wishlist['name']}'")
+    finally:
+        queue.close_run(run_id)
+    return published
+
+
+def ingest_finished(queue, run_id, wishlist_names, save_fn):
+    """Saves every wishlist whose jobs are all finished; returns the names still pending."""
+    pending = []
+    for name in wishlist_names:
+        if not queue.is_finished(run_id, name):
+            pending.append(name)
+            continue
+        job_ids, books = queue.take_results(run_id, name)
+        if job_ids:
+            if books:
+                save_fn(books, name)
+                print(f"\n✅ Ingested {len(books)} books for '{name}'.")
+            queue.mark_ingested(job_ids)
+    return pending
+
+
+def coordinate(queue, run_id, wishlist_names, save_fn, poll_interval=5, stop_check=None):
+    """Ingests results until every job of the run is finished (or stop_check() is true)."""
+    pending = list(wishlist_names)
+    while pending:
+        if stop_check and stop_check():
+            break
+        pending = ingest_finished(queue, run_id, pending, save_fn)
+        if pending:
+            counts = queue.counts(run_id)
+            total = sum(counts.values())
+            print(f"\r⏳ {counts['done'] + counts['failed']}/{total} jobs finished "
+                  f"({counts['leased']} in progress, {counts['failed']} failed)", end="")
+            time.sleep(poll_interval)
+    print()
+    return queue.counts(run_id)
+
+
+def run_coordinator(queue, run_id, wishlists, enumerate_fn, save_fn, poll_interval=5, stop_check=None):
+    """Publishes all wishlists, then waits for remote workers and ingests their results."""
+    publish_wishlists(queue, run_id, wishlists, enumerate_fn)
+    return coordinate(queue, run_id, [w["name"] for w in wishlists], save_fn, poll_interval, stop_check)
+
+
+def run_worker(queue, process_fn, worker_id=None, idle_exit=False, poll_interval=2, stop_check=None):
+    """Leases and processes jobs until stopped (or, with idle_exit, until the queue drains)."""
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    while not (stop_check and stop_check()):
+        job = queue.lease(worker_id)
+        if job is None:
+            if idle_exit and not queue.has_work():
+                break
+            time.sleep(poll_interval)
+            continue
+        job_id, payload = job
+        try:
+            result = process_fn(tuple(payload))
+        except FetchingStopped as e:
+            queue.fail(job_id, worker_id, e)
+            continue
+        except PageBlocked as e:
+            if queue.requeue(job_id, worker_id, e):
+                print(f"[{worker_id}] Job {job_id} got a robot check; requeued.")
+            else:
+                print(f"[{worker_id}] Job {job_id} is still blocked after {queue.max_attempts} requeues; failed.")
+            continue
+        except Exception as e:
+            print(f"[{worker_id}] Job {job_id} failed: {e}")
+            queue.fail(job_id, worker_id, e)
+            continue
+        if result is None:
+            queue.fail(job_id, worker_id, "no details extracted")
+        else:
+            queue.complete(job_id, worker_id, result)
+            processed += 1
+    return processed
+
+
+def run_single_host(queue, run_id, wishlists, enumerate_fn, save_fn, worker_target, workers=4,
+                    use_processes=True, poll_interval=5):
+    """
+    Coordinator plus `workers` local workers on one machine. `worker_target(queue_path, worker_id)`
+    must be a picklable top-level function when use_processes is True; with
+    use_processes=False workers run as threads, which is the mode to use in tests.
+    """
+    started = []
+    for i in range(workers):
+        worker_id = f"{default_worker_id()}-local{i}"
+        if use_processes:
+            worker = multiprocessing.Process(target=worker_target, args=(queue.path, worker_id), daemon=True)
+        else:
+            worker = threading.Thread(target=worker_target, args=(queue.path, worker_id), daemon=True)
+        started.append(worker)
+
+    # Open the run first so idle_exit workers wait for jobs instead of quitting on an empty queue.
+    queue.open_run(run_id)
+    for worker in started:
+        worker.start()
+    publish_wishlists(queue, run_id, wishlists, enumerate_fn)
+    counts = coordinate(queue, run_id, [w["name"] for w in wishlists], save_fn, poll_interval)
+    for worker in started:
+        worker.join(timeout=poll_interval * 2)
+    return counts
+
+
+def open_queue(config, path=None):
+    """JobQueue configured from the 'distributed' config section."""
+    settings = config.get("distributed", {})
+    return JobQueue(
+        path or settings.get("queue_path", "scraped_data/job_queue.sqlite"),
+        visibility_timeout=settings.get("visibility_timeout", 300),
+        max_attempts=settings.get("max_attempts", 3),
+    )
@@ -0,0 +1,96 @@
+"""
+Pool of warm Selenium drivers that survives between scrape runs.
+
+Starting Chrome costs a few seconds per driver; the long-running daemon keeps
+drivers alive and hands them out per book instead. Drivers are recycled after
+`max_uses` pages (Chrome's memory grows over time) and replaced when a health
+check fails. `recycle()` replaces all of them, e.g. after a robot check.
+"""
+import queue
+import threading
+import time
+
+
+class DriverPool:
+    def __init__(self, factory, size=4, max_uses=200):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self._idle = []         # Most recently released last, so warm drivers are reused first
+        self._uses = {}
+        self._available = threading.Condition()     # Notified when a driver is released or quit
+        self._created = 0
+        self.generation = 0     # Drivers started before the last recycle() are quit on release
+        self._generations = {}
+
+    def acquire(self, timeout=None):
+        """
+        Returns a healthy driver, starting a new one if the pool is not full yet. Waits for a
+        release (or a retired driver's free slot); raises queue.Empty after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._available:
+                while not self._idle and self._created >= self.size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Empty
+                    self._available.wait(remaining)
+                driver = self._idle.pop() if self._idle else None
+                if driver is None:
+                    self._created += 1
+            if driver is None:
+                try:
+                    driver = self.factory()
+                except Exception:
+                    self._free_slot()
+                    raise
+                self._uses[id(driver)] = 0
+                self._generations[id(driver)] = self.generation
+                return driver
+            if self._healthy(driver):
+                return driver
+            self._discard(driver)
+
+    def release(self, driver, broken=False):
+        """Returns a driver to the pool; broken or worn-out drivers are quit instead."""
+        uses = self._uses.get(id(driver), 0) + 1
+        self._uses[id(driver)] = uses
+        if broken or uses >= self.max_uses or self._generations.get(id(driver)) != self.generation:
+            self._discard(driver)
+        else:
+            with self._available:
+                self._idle.append(driver)
+                self._available.notify()
+
+    def _healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _free_slot(self):
+        with self._available:
+            self._created -= 1
+            self._available.notify()    # A waiting acquire() can start the replacement
+
+    def _discard(self, driver):
+        self._uses.pop(id(driver), None)
+        self._generations.pop(id(driver), None)
+        self._free_slot()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def recycle(self):
+        """Quits the idle drivers now and the busy ones when they are released; new ones start fresh."""
+        self.generation += 1
+        self.close()
+
+    def close(self):
+        with self._available:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
@@ -0,0 +1,171 @@
+"""
+Lean-page Chrome profile for the product-page scrapers.
+
+The extractor only reads text from a handful of server-rendered containers
+(#productTitle, detail bullets, reviews, byline, seller). Images, fonts,
+ad iframes and tracking scripts are pure overhead, so the lean profile blocks
+them with Chrome preferences plus CDP ``Network.setBlockedURLs`` and switches
+the page load strategy to ``eager`` (return at DOMContentLoaded).
+
+Per-page bandwidth and latency are recorded so the run summary can report
+what the lean profile saves compared with the full profile.
+"""
+import json
+import os
+import threading
+import time
+
+from atomic_write import atomic_open
+
+# URL patterns handed to Network.setBlockedURLs ('*' is a wildcard).
+DEFAULT_BLOCKED_URLS = [
+    # Resource types the extractor never reads
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8",
+    "*m.media-amazon.com/images/*",
+    # Ads, tracking and third-party scripts
+    "*amazon-adsystem.com*", "*aax-eu.amazon*", "*fls-eu.amazon*", "*fls-na.amazon*",
+    "*unagi.amazon*", "*unagi-na.amazon*", "*/rd/uedata*", "*/gp/adbypass/*",
+    "*doubleclick.net*", "*googletagmanager.com*", "*google-analytics.com*",
+    "*googlesyndication.com*", "*facebook.net*", "*scorecardresearch.com*",
+]
+
+DEFAULT_LEAN_PROFILE = {
+    "enabled": True,
+    "page_load_strategy": "eager",
+    "block_images": True,
+    "blocked_urls": DEFAULT_BLOCKED_URLS,
+    "extra_blocked_urls": [],
+}
+
+# Chrome content settings: 2 = block
+_BLOCKING_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+    "profile.default_content_setting_values.media_stream": 2,
+    "profile.default_content_setting_values.plugins": 2,
+    "profile.default_content_setting_values.popups": 2,
+}
+
+PAGE_STATS_FILE = "page_stats.json"
+
+# Transfer size of the document plus every sub-resource that was not blocked.
+_TRANSFER_SIZE_JS = """
+const nav = performance.getEntriesByType('navigation');
+let total = nav.length ? (nav[0].transferSize || 0) : 0;
+for (const r of performance.getEntriesByType('resource')) total += (r.transferSize || 0);
+return total;
+"""
+
+
+def get_lean_settings(config):
+    """Merges the 'lean_profile' section of the scraping config over the defaults."""
+    user = (config or {}).get("scraping", {}).get("lean_profile", {})
+    settings = dict(DEFAULT_LEAN_PROFILE)
+    settings.update(user)
+    settings["blocked_urls"] = list(settings.get("blocked_urls") or []) + list(settings.get("extra_blocked_urls") or [])
+    return settings
+
+
+def apply_lean_options(options, settings):
+    """Adds the lean-profile preferences to a ChromeOptions object."""
+    if not settings or not settings.get("enabled"):
+        return options
+    prefs = dict(_BLOCKING_PREFS)
+    if not settings.get("block_images", True):
+        prefs.pop("profile.managed_default_content_settings.images")
+    options.add_experimental_option("prefs", prefs)
+    options.page_load_strategy = settings.get("page_load_strategy", "eager")
+    if settings.get("block_images", True):
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--disable-remote-fonts")
+    return options
+
+
+def enable_url_blocking(driver, settings):
+    """Installs the CDP URL blocklist on a freshly started driver."""
+    if not settings or not settings.get("enabled") or not settings.get("blocked_urls"):
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": settings["blocked_urls"]})
+    except Exception as e:
+        # Non-Chromium drivers have no CDP; the Chrome prefs still apply.
+        print(f"Warning: Could not install URL blocklist: {e}")
+
+
+def profile_name(settings):
+    return "lean" if settings and settings.get("enabled") else "full"
+
+
+class PageStats:
+    """Thread-safe per-page bandwidth/latency collector for one scrape run."""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.pages = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, driver, started):
+        """Records one product page; `started` is the time.perf_counter() before driver.get()."""
+        elapsed = time.perf_counter() - started
+        try:
+            transferred = int(driver.execute_script(_TRANSFER_SIZE_JS) or 0)
+        except Exception:
+            transferred = 0
+        with self._lock:
+            self.pages += 1
+            self.bytes += transferred
+            self.seconds += elapsed
+
+    def averages(self):
+        if not self.pages:
+            return None
+        return self.bytes / self.pages, self.seconds / self.pages
+
+    def report(self, output_dir):
+        """Prints the run summary and folds this run into the stored per-profile baseline."""
+        averages = self.averages()
+        if not averages:
+            return
+        avg_bytes, avg_seconds = averages
+        print(f"\n📊 Page stats ({self.profile} profile): {self.pages} pages, "
+              f"{avg_bytes / 1024:.0f} KB/page, {avg_seconds:.2f}s/page")
+
+        stats_path = os.path.join(output_dir, PAGE_STATS_FILE)
+        stored = {}
+        if os.path.exists(stats_path):
+            with open(stats_path, "r", encoding="utf-8") as f:
+                try:
+                    stored = json.load(f)
+                except json.JSONDecodeError:
+                    stored = {}
+
+        other = stored.get("full" if self.profile == "lean" else "lean")
+        if other and other.get("pages"):
+            other_bytes = other["bytes"] / other["pages"]
+            other_seconds = other["seconds"] / other["pages"]
+            if self.profile == "lean":
+                saved_bytes, saved_seconds = other_bytes - avg_bytes, other_seconds - avg_seconds
+                base_bytes, base_seconds = other_bytes, other_seconds
+            else:
+                saved_bytes, saved_seconds = avg_bytes - other_bytes, avg_seconds - other_seconds
+                base_bytes, base_seconds = avg_bytes, avg_seconds
+            pct_bytes = 100 * saved_bytes / base_bytes if base_bytes else 0
+            pct_seconds = 100 * saved_seconds / base_seconds if base_seconds else 0
+            print(f"   Lean profile saves {saved_bytes / 1024:.0f} KB/page ({pct_bytes:.0f}%) "
+                  f"and {saved_seconds:.2f}s/page ({pct_seconds:.0f}%) vs the full profile.")
+        else:
+            missing = "full" if self.profile == "lean" else "lean"
+            print(f"   No '{missing}' profile baseline yet; toggle scraping.lean_profile.enabled for one run to compare.")
+
+        entry = stored.setdefault(self.profile, {"pages": 0, "bytes": 0, "seconds": 0.0})
+        entry["pages"] += self.pages
+        entry["bytes"] += self.bytes
+        entry["seconds"] += self.seconds
+        with atomic_open(stats_path) as f:
+            json.dump(stored, f, indent=4)
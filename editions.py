@@ -0,0 +1,184 @@
+"""
+Book identity: one clean `format` per record, and editions grouped into works.
+
+`clean_format` turns the product page's format block ("Paperback\\n\\n₹367.00")
+into the format name alone; build_book_record applies it to every new record,
+and readers apply it to older ones.
+
+`cluster` groups the Paperback, Hardcover and Kindle ASINs of the same work.
+Every record gets blocking keys:
+
+- ("a", author surname, first title word)
+- ("t", normalized main title), for records without an author, or whose
+  author is spelled differently
+
+where the main title is the part before ":", "|" or " - ", lowercased, without
+bracketed notes, edition/format words or stop words. Only records that share
+a key are compared, so the work is linear in the number of ASINs plus the
+pairs inside each (small) block, never all pairs. Two records are the same
+work when their main-title word sets have a Jaccard similarity of at least
+`threshold`, their authors do not conflict and they name the same volume
+("Volume II", "Vol. 2" and "Book II" all read as volume 2), so the volumes of
+a set stay apart. Matches are merged with
+union-find, so "1984", "1984 (Deluxe Hardbound Edition)" and "1984 | George
+Orwell | International Bestseller" all land in one work.
+
+A work id is readable and stable across runs: "<surname>/<main-title-slug>",
+e.g. "orwell/1984" or "marx/capital-vol-2".
+"""
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from product_key import asin_of
+
+FORMAT_UNKNOWN = "Unknown"
+STOP_WORDS = {"a", "an", "the", "of", "and", "to", "in", "on", "for", "by", "with", "your", "you", "how"}
+EDITION_WORDS = {
+    "edition", "editions", "ed", "deluxe", "hardbound", "hardcover", "paperback", "kindle", "english", "hindi",
+    "old", "new", "revised", "updated", "expanded", "illustrated", "unabridged", "abridged", "anniversary",
+    "collectors", "special", "international", "bestseller", "book", "books", "classic", "classics", "vol",
+    "volume", "1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th", "9th", "10th", "25th", "2e", "3e", "4e", "5e",
+}
+NO_AUTHOR = {"null", "none", "unknown", "na", "various", "anonymous"}
+CREDENTIALS = {"dr", "mr", "mrs", "ms", "prof", "phd", "md", "mbe", "obe", "jr", "sr", "lcsw", "cfa", "cpa"}
+MAX_BLOCK = 500      # Bigger blocks are skipped; their members still meet in their other block
+
+_BRACKETS_RE = re.compile(r"[(\[{][^)\]}]*[)\]}]")
+_SPLIT_RE = re.compile(r"\s*(?::|\||;|\s[-–—]\s)\s*")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_VOLUME_RE = re.compile(r"\b(?:vol|volume|book|part)s?\.?\s*([0-9]+|[ivx]+)\b")
+_ROMAN = {"i": 1, "v": 5, "x": 10}
+
+
+def clean_format(value):
+    """The format name alone: the first line of the format block, without prices or placeholders."""
+    for line in (value or "").splitlines():
+        line = line.strip()
+        if line and "₹" not in line and line not in ("—", "-"):
+            return line
+    return FORMAT_UNKNOWN
+
+
+def _fold(text):
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in text if not unicodedata.combining(c)).lower().replace("'", "").replace("’", "")
+
+
+def title_words(title, author=None):
+    """
+    Words of the main title, without edition notes, stop words and the author's name
+    ("1984 George Orwell"); all words if that leaves none.
+    """
+    folded = _BRACKETS_RE.sub(" ", _fold(title))
+    main = next((part for part in _SPLIT_RE.split(folded) if _WORD_RE.search(part)), "")
+    words = _WORD_RE.findall(main)
+    noise = EDITION_WORDS | set(_WORD_RE.findall(_fold(author)))
+    significant = [w for w in words if w not in STOP_WORDS and w not in noise]
+    return significant or [w for w in words if w not in EDITION_WORDS] or words
+
+
+def volume_of(title):
+    """The volume number a title names ("Volume III", "Vol.2", "Books IV-V"), or None."""
+    match = _VOLUME_RE.search(_fold(title))
+    if not match:
+        return None
+    number = match.group(1)
+    if number.isdigit():
+        return int(number)
+    values = [_ROMAN[c] for c in number]
+    return sum(-v if v < values[k + 1] else v for k, v in enumerate(values[:-1])) + values[-1]
+
+
+def author_surname(author):
+    """Surname of the first listed author, or None."""
+    first = _fold(author).split(",")[0]
+    words = [w for w in _WORD_RE.findall(first) if w not in CREDENTIALS and w not in NO_AUTHOR and len(w) > 1]
+    return words[-1] if words else None
+
+
+def blocking_keys(words, surname):
+    keys = [("t", " ".join(words))] if words else []
+    if surname and words:
+        keys.append(("a", surname, words[0]))
+    return keys
+
+
+def _similar(a, b, threshold):
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) >= threshold
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        self.parent[self.find(i)] = self.find(j)
+
+
+def cluster(records, threshold=0.8):
+    """{asin: work id} for the records (any number per ASIN; the first title and author seen are used)."""
+    asins, words, surnames, volumes, seen = [], [], [], [], set()
+    for record in records:
+        asin = asin_of(record)
+        if not asin or asin in seen:
+            continue
+        seen.add(asin)
+        asins.append(asin)
+        words.append(title_words(record.get("title"), record.get("author")))
+        surnames.append(author_surname(record.get("author")))
+        volumes.append(volume_of(record.get("title")))
+
+    def same_work(i, j):
+        if volumes[i] != volumes[j] or (surnames[i] and surnames[j] and surnames[i] != surnames[j]):
+            return False
+        return _similar(words[i], words[j], threshold)
+
+    blocks = defaultdict(list)
+    for i in range(len(asins)):
+        for key in blocking_keys(words[i], surnames[i]):
+            blocks[key].append(i)
+
+    groups = _UnionFind(len(asins))
+    for key, members in blocks.items():
+        if len(members) > MAX_BLOCK:
+            continue
+        for x, i in enumerate(members):
+            for j in members[x + 1:]:
+                if same_work(i, j):
+                    groups.union(i, j)
+
+    members_of = defaultdict(list)
+    for i in range(len(asins)):
+        members_of[groups.find(i)].append(i)
+    work_of = {}
+    for members in members_of.values():
+        title = Counter(" ".join(words[i]) for i in members).most_common(1)[0][0]
+        surname = Counter(surnames[i] for i in members if surnames[i]).most_common(1)
+        work_id = f"{surname[0][0] if surname else 'unknown'}/{title.replace(' ', '-') or 'untitled'}"
+        if volumes[members[0]] is not None:
+            work_id += f"-vol-{volumes[members[0]]}"
+        for i in members:
+            work_of[asins[i]] = work_id
+    return work_of
+
+
+def works(records, threshold=0.8):
+    """{work id: [latest record of each edition]}, largest works first."""
+    latest = {}
+    for record in records:
+        asin = asin_of(record)
+        if asin and (asin not in latest or (record.get("scraped_timestamp") or "") >= (latest[asin].get("scraped_timestamp") or "")):
+            latest[asin] = record
+    work_of = cluster(latest.values(), threshold)
+    grouped = defaultdict(list)
+    for asin, record in latest.items():
+        grouped[work_of[asin]].append(record)
+    return dict(sorted(grouped.items(), key=lambda item: -len(item[1])))
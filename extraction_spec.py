@@ -0,0 +1,185 @@
+"""
+Declarative, precompiled product-page extraction with lxml.
+
+Each field maps to an ordered list of rules; the first rule that yields a
+value wins, which reproduces the fallback cascades of the Selenium scrapers
+(e.g. find_pages_in_detail_bullets -> _tech_details -> _description ->
+_book_info) without re-walking the page for every fallback.
+
+All XPath expressions are compiled once at import. A page is handled in one
+pass: a single anchor query collects every container any rule can read
+(by id or data-hook) and the rules then only look inside those small
+subtrees. The "any <table>" last resort runs only when every anchored rule
+for page_count missed.
+"""
+import re
+from collections import namedtuple
+
+from lxml import etree, html as lxml_html
+
+from product_key import ASIN_RE
+
+# anchor:  "id" or "hook:<data-hook>" of the container, or None for a document-wide path
+# path:    XPath relative to the anchor selecting candidate elements
+# pattern: regex whose first group is the value (None = use the text itself)
+# convert: callable applied to the matched group
+# contains: lowercase keyword a candidate's text must contain
+# attr:    read this attribute instead of the text
+# text:    "words" (whitespace-collapsed, like WebElement.text) or "lines"
+# join:    join all candidates' values with this separator instead of taking the first
+Rule = namedtuple("Rule", "anchor path pattern convert contains attr text join")
+Rule.__new__.__defaults__ = (".", None, None, None, None, "words", None)
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _to_int(value):
+    return int(value.replace(",", ""))
+
+
+PAGES = r"(\d+)\s*pages"
+
+EXTRACTION_SPEC = {
+    "page_count": [
+        Rule("detailBullets_feature_div", f".//*[{_has_class('a-list-item')}]", PAGES, int, contains="page"),
+        Rule("productDetails_techSpec_section_1", ".//tr", r"(\d+)", int, contains="page"),
+        Rule("productDetails_detailBullets_sections1", ".//tr", r"(\d+)", int, contains="page"),
+        Rule("productDescription", ".", PAGES, int),
+        Rule(None, "//table", PAGES, int, contains="page"),
+    ],
+    "review_count": [
+        Rule("acrCustomerReviewText", ".", r"([\d,]+)", _to_int),
+        Rule("hook:total-review-count", ".", r"([\d,]+)", _to_int),
+    ],
+    "avg_rating": [
+        Rule("hook:rating-out-of-text", ".", r"([\d\.]+)\s*out of 5", float),
+        Rule("acrPopover", ".", r"([\d\.]+)\s*out of 5", float, attr="title"),
+    ],
+    "book_format": [
+        Rule("tmmSwatches", f".//*[{_has_class('a-button-selected')}]//*[{_has_class('a-button-text')}]", text="lines"),
+    ],
+    "author": [
+        Rule("bylineInfo", f".//*[{_has_class('author')}]/a", join=", "),
+    ],
+    "seller": [
+        Rule("sellerProfileTriggerId"),
+    ],
+}
+
+DEFAULTS = {
+    "page_count": None, "review_count": None, "book_format": "Unknown",
+    "has_keep_badge": False, "author": None, "publication_date": None,
+    "asin": None, "avg_rating": None, "seller": None
+}
+
+# Amazon serves UTF-8; without this lxml guesses latin-1 for bytes lacking a <meta charset>.
+_UTF8_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+
+
+class CompiledSpec:
+    """An extraction spec with every XPath and regex compiled."""
+
+    def __init__(self, spec):
+        self.fields = []
+        anchors = set()
+        for field, rules in spec.items():
+            compiled = []
+            for rule in rules:
+                compiled.append((
+                    rule,
+                    etree.XPath(rule.path),
+                    re.compile(rule.pattern, re.IGNORECASE) if rule.pattern else None,
+                ))
+                if rule.anchor:
+                    anchors.add(rule.anchor)
+            self.fields.append((field, compiled))
+
+        ids = sorted(a for a in anchors if not a.startswith("hook:"))
+        hooks = sorted(a[5:] for a in anchors if a.startswith("hook:"))
+        predicates = [f"@id='{i}'" for i in ids] + [f"@data-hook='{h}'" for h in hooks]
+        self.anchor_query = etree.XPath(f"//*[{' or '.join(predicates)}]")
+        self.title_query = etree.XPath("//*[@id='productTitle']")
+
+    def collect_anchors(self, tree):
+        """One document pass: container key -> first element with that id/data-hook."""
+        found = {}
+        for element in self.anchor_query(tree):
+            key = element.get("id")
+            if key and key not in found:
+                found[key] = element
+            hook = element.get("data-hook")
+            if hook and f"hook:{hook}" not in found:
+                found[f"hook:{hook}"] = element
+        return found
+
+    def apply(self, tree):
+        anchors = self.collect_anchors(tree)
+        values = {}
+        for field, rules in self.fields:
+            for rule, path, pattern in rules:
+                if rule.anchor:
+                    root = anchors.get(rule.anchor)
+                    if root is None:
+                        continue
+                else:
+                    root = tree
+                value = _apply_rule(rule, path(root), pattern)
+                if value is not None:
+                    values[field] = value
+                    break
+        return values
+
+
+def _text_of(element, rule):
+    if rule.attr:
+        return element.get(rule.attr) or ""
+    if rule.text == "lines":
+        return "\n".join(part.strip() for part in element.itertext() if part.strip())
+    return " ".join(" ".join(element.itertext()).split())
+
+
+def _apply_rule(rule, candidates, pattern):
+    values = []
+    for element in candidates:
+        text = _text_of(element, rule)
+        if not text:
+            continue
+        if rule.contains and rule.contains not in text.lower():
+            continue
+        if pattern:
+            match = pattern.search(text)
+            if not match:
+                continue
+            value = match.group(1)
+        else:
+            value = text
+        if rule.convert:
+            try:
+                value = rule.convert(value)
+            except ValueError:
+                continue
+        if rule.join is None:
+            return value
+        values.append(value)
+    return rule.join.join(values) if values else None
+
+
+COMPILED_SPEC = CompiledSpec(EXTRACTION_SPEC)
+
+
+def extract_details(html, link, spec=COMPILED_SPEC):
+    """Returns the details dict for one product page, or None if it is not a product page."""
+    if isinstance(html, bytes):
+        tree = lxml_html.document_fromstring(html, parser=_UTF8_PARSER)
+    else:
+        tree = lxml_html.document_fromstring(html)
+    if not spec.title_query(tree):
+        return None
+    details = dict(DEFAULTS)
+    asin_match = ASIN_RE.search(link or "")
+    if asin_match:
+        details["asin"] = asin_match.group(1)
+    details.update(spec.apply(tree))
+    return details
@@ -0,0 +1,164 @@
+"""
+Streaming pre-filter that cuts a product page down to the regions we read.
+
+A product page is ~1 MB of scripts, carousels and inline JSON around a few KB
+of useful markup. `RegionFilter` scans the raw byte stream chunk by chunk,
+copies out only the containers listed in REGION_IDS / REGION_HOOKS (matching
+nested open/close tags of the same name) and discards everything else as it
+goes, so neither the full page nor a DOM of it is ever held in memory.
+
+Keep REGION_IDS and REGION_HOOKS in sync with the anchors in extraction_spec.py.
+"""
+import re
+
+REGION_IDS = [
+    "productTitle", "bylineInfo", "averageCustomerReviews", "acrCustomerReviewText",
+    "detailBullets_feature_div", "productDetails_techSpec_section_1",
+    "productDetails_detailBullets_sections1", "productDescription",
+    "tmmSwatches", "merchant-info", "sellerProfileTriggerId",
+]
+REGION_HOOKS = ["rating-out-of-text", "total-review-count"]
+
+# Bytes kept from the end of a chunk that had no match, so a start tag split
+# across two chunks is still found.
+_TAIL = 4096
+
+
+def _needles(ids, hooks):
+    """Literal attribute strings to look for. bytes.find on each is several times
+    faster than one regex alternation over every tag of the page."""
+    needles = []
+    for attr, values in ((b"id", ids), (b"data-hook", hooks)):
+        for value in values:
+            for quote in (b'"', b"'"):
+                needles.append(attr + b"=" + quote + value.encode() + quote)
+    return needles
+
+
+_DEFAULT_NEEDLES = _needles(REGION_IDS, REGION_HOOKS)
+_TAG_OPEN_RE = re.compile(rb'<([a-zA-Z][\w-]*)\b')
+_TAG_END_RE = re.compile(rb'[^<>]*>')
+_tag_res = {}
+
+
+def _tag_re(name):
+    """Open or close tag of one element name, compiled once per name."""
+    pattern = _tag_res.get(name)
+    if pattern is None:
+        pattern = _tag_res[name] = re.compile(
+            rb'<(/?)' + re.escape(name) + rb'\b[^>]*?(/?)>', re.IGNORECASE)
+    return pattern
+
+
+class RegionFilter:
+    """Feed raw page bytes in chunks; `close()` returns a small HTML document."""
+
+    def __init__(self, ids=None, hooks=None):
+        if ids is None and hooks is None:
+            self.needles = _DEFAULT_NEEDLES
+        else:
+            self.needles = _needles(ids or [], hooks or [])
+        self.buffer = b""
+        self.regions = []
+        self.bytes_in = 0
+        # Inside a region: (tag name, region start offset, nesting depth, scan offset)
+        self.open_region = None
+
+    def feed(self, chunk):
+        self.bytes_in += len(chunk)
+        self.buffer += chunk
+        self._scan()
+
+    def _find_target(self, buffer, pos, positions):
+        """(start, end) of the earliest target attribute at or after pos, or None.
+        `positions` caches each needle's next hit so the buffer is searched once per needle."""
+        best = None
+        for needle in self.needles:
+            index = positions.get(needle)
+            if index is None or -1 < index < pos:
+                index = buffer.find(needle, pos)
+                while index > 0 and buffer[index - 1] not in b" \t\r\n":
+                    # Part of a longer attribute name, e.g. data-csa-id="..."
+                    index = buffer.find(needle, index + 1)
+                positions[needle] = index
+            if index > 0 and (best is None or index < best[0]):
+                best = (index, index + len(needle))
+        return best
+
+    def _scan(self):
+        buffer = self.buffer
+        pos = 0
+        positions = {}
+        while True:
+            if self.open_region is None:
+                match = self._find_target(buffer, pos, positions)
+                tag_start = buffer.rfind(b"<", pos, match[0]) if match else -1
+                tag = _TAG_OPEN_RE.match(buffer, tag_start) if tag_start != -1 else None
+                tag_end = _TAG_END_RE.match(buffer, match[1]) if tag else None
+                if match and tag and not tag_end and buffer.find(b"<", match[1]) == -1:
+                    # The start tag continues in the next chunk.
+                    self.buffer = buffer[tag_start:]
+                    return
+                if not tag_end or b">" in buffer[tag_start:match[0]]:
+                    if match:
+                        # Attribute text outside a start tag (e.g. inside a script); skip it.
+                        pos = match[1]
+                        continue
+                    # Keep only a tail that may hold the beginning of a split start tag.
+                    cut = max(pos, len(buffer) - _TAIL)
+                    last_lt = buffer.rfind(b"<", cut)
+                    self.buffer = buffer[last_lt:] if last_lt != -1 else b""
+                    return
+                name = tag.group(1)
+                if buffer[tag_end.end() - 2:tag_end.end()] == b"/>":
+                    self.regions.append(buffer[tag_start:tag_end.end()])
+                    pos = tag_end.end()
+                    continue
+                self.open_region = (name, tag_start, 1, tag_end.end())
+
+            name, start, depth, scan = self.open_region
+            tag_re = _tag_re(name)
+            for match in tag_re.finditer(buffer, scan):
+                if match.group(1):
+                    depth -= 1
+                elif not match.group(2):
+                    depth += 1
+                scan = match.end()
+                if depth == 0:
+                    break
+            if depth == 0:
+                self.regions.append(buffer[start:scan])
+                self.open_region = None
+                pos = scan
+                continue
+            # Region continues in the next chunk; drop everything before it.
+            self.buffer = buffer[start:]
+            self.open_region = (name, 0, depth, scan - start)
+            return
+
+    def close(self):
+        if self.open_region is not None:
+            # Truncated page: keep what we have, the HTML parser closes open tags.
+            self.regions.append(self.buffer[self.open_region[1]:])
+            self.open_region = None
+        self.buffer = b""
+        return b"<html><head><meta charset=\"utf-8\"></head><body>" + b"\n".join(self.regions) + b"</body></html>"
+
+
+def prefilter_html(html, chunk_size=65536):
+    """Convenience wrapper for a page already in memory (bytes or str)."""
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    region_filter = RegionFilter()
+    for offset in range(0, len(html), chunk_size):
+        region_filter.feed(html[offset:offset + chunk_size])
+    return region_filter.close()
+
+
+def prefilter_stream(chunks):
+    """Filters an iterable of byte chunks, e.g. requests' `iter_content()`."""
+    region_filter = RegionFilter()
+    for chunk in chunks:
+        if chunk:
+            region_filter.feed(chunk)
+    return region_filter.close()
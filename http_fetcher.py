@@ -0,0 +1,92 @@
+"""
+Plain-HTTP product page fetching for the staged fetch/parse pipeline.
+
+Fetch threads only move bytes; parsing happens in a separate process pool
+(see `parse_product_page` in product_parser.py), so the GIL is never held by
+BeautifulSoup while a socket is waiting. Robot-check and throttle pages raise
+robot_check.PageBlocked rather than returning None, so the caller can requeue
+the book.
+"""
+import itertools
+import queue
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import robot_check
+from html_prefilter import prefilter_stream
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+
+# Sessions are checked out per fetch rather than tied to a thread, so their
+# keep-alive connections outlive the fetch thread pool and stay warm between
+# runs of a long-lived process (see scheduler_daemon.py). A session made before
+# the circuit breaker switched identities is closed instead of reused.
+_idle_sessions = queue.LifoQueue()
+
+
+def make_session(pool_size=8):
+    """Creates a keep-alive session sized for `pool_size` concurrent fetch threads."""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.headers["User-Agent"] = robot_check.user_agent()
+    session.identity = robot_check.identity()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """Checks out an idle session (or creates one); hand it back with release_session()."""
+    while True:
+        try:
+            session = _idle_sessions.get_nowait()
+        except queue.Empty:
+            return make_session()
+        if session.identity == robot_check.identity():
+            return session
+        session.close()
+
+
+def release_session(session):
+    if session.identity == robot_check.identity():
+        _idle_sessions.put(session)
+    else:
+        session.close()
+
+
+def fetch_page(url, timeout=15, prefilter=False):
+    """
+    Returns the raw page bytes, or None on an HTTP or network error; raises
+    PageBlocked for a robot check or throttle page (checked on the first chunk).
+    With prefilter=True the body is streamed through the region pre-filter and
+    only the few KB the extractor reads are returned.
+    """
+    session = get_session()
+    try:
+        response = session.get(url, timeout=timeout, stream=True)
+        with response:
+            if response.status_code in robot_check.BLOCK_STATUSES:
+                raise robot_check.PageBlocked(url, f"HTTP {response.status_code}")
+            if response.status_code != 200:
+                print(f"HTTP {response.status_code} for {url}")
+                return None
+            chunks = response.iter_content(chunk_size=65536)
+            first = next(chunks, b"")
+            signature = robot_check.detect(first)
+            if signature:
+                raise robot_check.PageBlocked(url, signature)
+            if prefilter:
+                return prefilter_stream(itertools.chain([first], chunks))
+            return first + b"".join(chunks)
+    except requests.RequestException as e:
+        print(f"Error fetching {url}: {e}")
+        return None
+    finally:
+        release_session(session)
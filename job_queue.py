@@ -0,0 +1,228 @@
+"""
+SQLite-backed job queue for distributed scraping.
+
+The coordinator publishes one job per book; workers (threads, processes, or
+other hosts sharing the queue file) lease jobs, scrape them and post results.
+A lease that is not completed within the visibility timeout becomes visible
+again, so a crashed worker never loses a book. Completing a job is first-wins,
+and every result is handed to `save_results` exactly once via the `ingested`
+flag, so re-delivered jobs and coordinator restarts are harmless.
+
+A job whose page was blocked by a robot check is requeued without using up
+an attempt, but only `max_attempts` times: with the circuit breaker disabled
+nothing pauses the workers, and the job would otherwise circle forever.
+"""
+import json
+import os
+import socket
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            TEXT PRIMARY KEY,
+    run_id        TEXT NOT NULL,
+    wishlist_name TEXT NOT NULL,
+    payload       TEXT NOT NULL,
+    state         TEXT NOT NULL DEFAULT 'queued',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    requeues      INTEGER NOT NULL DEFAULT 0,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    result        TEXT,
+    error         TEXT,
+    ingested      INTEGER NOT NULL DEFAULT 0,
+    updated       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+CREATE INDEX IF NOT EXISTS jobs_run ON jobs (run_id, wishlist_name);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id   TEXT PRIMARY KEY,
+    is_open  INTEGER NOT NULL DEFAULT 1,
+    created  REAL NOT NULL
+);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    def __init__(self, path, visibility_timeout=300, max_attempts=3):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "requeues" not in columns:     # Queue files from before requeue() had a cap
+                conn.execute("ALTER TABLE jobs ADD COLUMN requeues INTEGER NOT NULL DEFAULT 0")
+
+    def _connect(self):
+        # A fresh connection per call keeps the queue usable from any thread or process.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return _Closing(conn)
+
+    # --- Coordinator side ---
+
+    def open_run(self, run_id):
+        """Marks a run as still publishing, so idle workers keep waiting for its jobs."""
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO runs (run_id, created) VALUES (?, ?)", (run_id, time.time()))
+            conn.execute("UPDATE runs SET is_open = 1 WHERE run_id = ?", (run_id,))
+
+    def close_run(self, run_id):
+        with self._connect() as conn:
+            conn.execute("UPDATE runs SET is_open = 0 WHERE run_id = ?", (run_id,))
+
+    def publish(self, run_id, wishlist_name, jobs):
+        """Enqueues (key, payload) pairs; keys already published for this run are ignored."""
+        now = time.time()
+        rows = [(f"{run_id}:{key}", run_id, wishlist_name, json.dumps(payload, ensure_ascii=False), now)
+                for key, payload in jobs]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (id, run_id, wishlist_name, payload, updated) VALUES (?, ?, ?, ?, ?)",
+                rows)
+            conn.execute("COMMIT")
+        return len(rows)
+
+    def counts(self, run_id, wishlist_name=None):
+        """{state: count} for a run (optionally one wishlist), with expired leases counted as queued."""
+        query = "SELECT state, lease_expires FROM jobs WHERE run_id = ?"
+        args = [run_id]
+        if wishlist_name is not None:
+            query += " AND wishlist_name = ?"
+            args.append(wishlist_name)
+        counts = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        now = time.time()
+        with self._connect() as conn:
+            for state, expires in conn.execute(query, args):
+                if state == "leased" and expires is not None and expires < now:
+                    state = "queued"
+                counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    def is_finished(self, run_id, wishlist_name=None):
+        counts = self.counts(run_id, wishlist_name)
+        return counts["queued"] == 0 and counts["leased"] == 0
+
+    def take_results(self, run_id, wishlist_name):
+        """(job ids, results) of completed jobs not yet ingested."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, result FROM jobs WHERE run_id = ? AND wishlist_name = ? "
+                "AND state = 'done' AND ingested = 0 ORDER BY id",
+                (run_id, wishlist_name)).fetchall()
+        ids = [row[0] for row in rows]
+        results = [json.loads(row[1]) for row in rows if row[1] and row[1] != "null"]
+        return ids, results
+
+    def mark_ingested(self, job_ids):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("UPDATE jobs SET ingested = 1 WHERE id = ?", [(i,) for i in job_ids])
+            conn.execute("COMMIT")
+
+    # --- Worker side ---
+
+    def lease(self, worker_id):
+        """Claims the oldest visible job; returns (job id, payload) or None."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, payload FROM jobs WHERE (state = 'queued' OR (state = 'leased' AND lease_expires < ?)) "
+                "AND attempts < ? ORDER BY updated, id LIMIT 1",
+                (now, self.max_attempts)).fetchone()
+            if row is None:
+                # Leases that expired on their last attempt are failures, not work.
+                conn.execute(
+                    "UPDATE jobs SET state = 'failed', error = COALESCE(error, 'lease expired'), updated = ? "
+                    "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, now, self.max_attempts))
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated = ? WHERE id = ?",
+                (worker_id, now + self.visibility_timeout, now, row[0]))
+            conn.execute("COMMIT")
+        return row[0], json.loads(row[1])
+
+    def extend(self, job_id, worker_id):
+        """Heartbeat for long jobs: pushes the lease expiry out again."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND state = 'leased'",
+                (time.time() + self.visibility_timeout, job_id, worker_id))
+
+    def complete(self, job_id, worker_id, result):
+        """Stores a result. First completion wins; late duplicates are dropped."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'done', result = ?, lease_owner = ?, updated = ? "
+                "WHERE id = ? AND state != 'done'",
+                (json.dumps(result, ensure_ascii=False), worker_id, time.time(), job_id))
+            return cursor.rowcount == 1
+
+    def fail(self, job_id, worker_id, error):
+        """Makes the job visible again, or marks it failed after max_attempts."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "error = ?, lease_owner = NULL, lease_expires = NULL, updated = ? "
+                "WHERE id = ? AND lease_owner = ? AND state = 'leased'",
+                (self.max_attempts, str(error), time.time(), job_id, worker_id))
+
+    def requeue(self, job_id, worker_id, error):
+        """
+        Puts the job back at the end of the queue without using up an attempt (its page was
+        blocked, not broken); marks it failed once it was requeued max_attempts times.
+        Returns True if the job was requeued.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT requeues FROM jobs WHERE id = ? AND lease_owner = ? AND state = 'leased'",
+                               (job_id, worker_id)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return False
+            requeued = row[0] < self.max_attempts
+            conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts - ?, requeues = requeues + 1, error = ?, "
+                "lease_owner = NULL, lease_expires = NULL, updated = ? WHERE id = ?",
+                ("queued" if requeued else "failed", int(requeued), str(error), time.time(), job_id))
+            conn.execute("COMMIT")
+        return requeued
+
+    def has_work(self):
+        """True while any job is queued or leased, or a run is still publishing."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM jobs WHERE state IN ('queued', 'leased') "
+                "UNION ALL SELECT 1 FROM runs WHERE is_open = 1 LIMIT 1").fetchone()
+        return row is not None
+
+
+class _Closing:
+    """Context manager that closes (not just commits) the sqlite connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, *exc):
+        if exc[0] is not None and self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+        self.conn.close()
+        return False
@@ -0,0 +1,173 @@
+"""
+Streaming access to the JSON-array files the scraper writes.
+
+historical_data.json only ever grows, so loading it whole (json.load) needs
+memory proportional to years of history. `iter_json_array` walks the top-level
+array with `JSONDecoder.raw_decode` over a sliding buffer and yields one record
+at a time; memory stays bounded by the largest single record plus the chunk
+size. `write_json_array` and `append_json_array` write the same indent=4 layout
+json.dump produces, record by record.
+"""
+import json
+import os
+import textwrap
+
+from atomic_write import atomic_open
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(path, chunk_size=CHUNK_SIZE):
+    """
+    Yields the elements of the top-level JSON array in `path`. A file that is
+    empty yields nothing; anything else malformed raises json.JSONDecodeError,
+    exactly like json.load would.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buffer, pos, eof = "", 0, False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        fill()
+        skip_whitespace()
+        if pos >= len(buffer):
+            return
+        if buffer[pos] != "[":
+            raise json.JSONDecodeError("Expecting '['", buffer, pos)
+        pos += 1
+        expect_value = None     # None: first element or ']', True: after ',', False: after a value
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            char = buffer[pos]
+            if char == "]" and expect_value is not True:
+                return
+            if expect_value is False:
+                if char != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                pos += 1
+                expect_value = True
+                continue
+            while True:
+                try:
+                    value, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                # A number (or literal) running into the end of the buffer may continue in the next chunk.
+                if end == len(buffer) and not eof:
+                    fill()
+                    continue
+                break
+            pos = end
+            expect_value = False
+            yield value
+
+
+def _format_record(record):
+    return textwrap.indent(json.dumps(record, indent=4, ensure_ascii=False), "    ")
+
+
+def write_records(f, records):
+    """Writes an indent=4 JSON array to an open text file; returns the record count."""
+    count = 0
+    for record in records:
+        f.write(("[\n" if count == 0 else ",\n") + _format_record(record))
+        count += 1
+    f.write("\n]" if count else "[]")
+    return count
+
+
+def write_json_array(path, records, backups=0):
+    """Streams `records` into `path` atomically; returns the record count."""
+    with atomic_open(path, backups=backups) as f:
+        count = write_records(f, records)
+    return count
+
+
+def merge_json_array(path, records, key, backups=0):
+    """
+    Rewrites the array in `path` with `records` merged in by `key` (a field
+    name, or a function of a record): existing entries with the same key are
+    replaced in place, new ones are appended. Streams the existing file;
+    returns the resulting record count.
+    """
+    key_of = key if callable(key) else (lambda record: record.get(key))
+    updates = {key_of(record): record for record in records}
+    existing = iter_json_array(path) if os.path.exists(path) else iter(())
+
+    def merged():
+        seen = set()
+        for record in existing:
+            record_key = key_of(record)
+            if record_key in seen:
+                continue
+            seen.add(record_key)
+            yield updates.pop(record_key, record)
+        yield from updates.values()
+
+    return write_json_array(path, merged(), backups)
+
+
+def append_json_array(path, records, backups=0):
+    """
+    Appends records to the array in `path` without parsing it: the existing
+    bytes up to the closing bracket are copied through, so memory use does not
+    depend on the size of the file. Returns the number of records appended.
+    """
+    records = list(records)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return write_json_array(path, records, backups)
+    if not records:
+        return 0
+    end, empty = _closing_bracket(path)
+    with open(path, "rb") as src, atomic_open(path, "wb", backups=backups) as dst:
+        remaining = end
+        while remaining:
+            chunk = src.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            dst.write(chunk)
+            remaining -= len(chunk)
+        body = ",\n".join(_format_record(r) for r in records)
+        dst.write((("\n" if empty else ",\n") + body + "\n]").encode("utf-8"))
+    return len(records)
+
+
+def _closing_bracket(path):
+    """(offset of the last non-whitespace byte before the final ']', whether the array is empty)."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b""
+        while position > 0 and tail.strip() in (b"", b"]") and len(tail) < 1 << 20:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+    stripped = tail.rstrip()
+    if not stripped.endswith(b"]"):
+        raise json.JSONDecodeError("Expecting ']' at end of file", tail.decode("utf-8", "replace"), len(tail))
+    before = stripped[:-1].rstrip()
+    return position + len(before), before.endswith(b"[")
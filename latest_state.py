@@ -0,0 +1,151 @@
+"""
+Materialized "latest state per ASIN" view of a wishlist's history.
+
+Reading the latest record of every book used to mean scanning the whole
+history (BookTable.latest_by). This table is instead kept up
+to date by save_results: each run's records are upserted by ASIN, so a
+lookup is a dict access and nothing rereads the history. Per ASIN it holds:
+
+- record: the most recent record (by scraped_timestamp)
+- first_seen / last_seen: the oldest and newest scraped_timestamp
+- observations: how many history records it has
+- min_price / max_price: over every observation with a price
+- last_change / previous_price: when the price last moved, and from what
+
+It lives in <output_dir>/<wishlist>/latest_state.json next to the store's
+history version it was last updated for. If the history changed behind its
+back (another tool, an older version of the scraper, a restored backup), the
+versions differ and the table is rebuilt from the history once.
+
+    python latest_state.py show WISHLIST [ASIN] [--data scraped_data]
+"""
+import argparse
+import json
+import os
+
+from atomic_write import atomic_write
+from product_key import asin_of
+
+STATE_FILE = "latest_state.json"
+STATE_FORMAT = 1
+
+
+def history_key(store, wishlist_name):
+    """The store's history version of a wishlist, tagged with the store kind; None without history."""
+    version = store.history_version(wishlist_name)
+    return None if version is None else f"{store.name}:{version}"
+
+
+def _price(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        return None
+    return value
+
+
+class LatestState:
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}       # asin -> entry
+        self.version = None
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("format") == STATE_FORMAT:
+                    self.entries, self.version = data["entries"], data["version"]
+            except (json.JSONDecodeError, KeyError):
+                pass    # Version stays None, so load() rebuilds it
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, asin):
+        return asin in self.entries
+
+    def get(self, asin):
+        return self.entries.get(asin)
+
+    def update(self, records):
+        """Upserts observations by ASIN; returns how many were applied (records without an ASIN are skipped)."""
+        applied = 0
+        for record in records:
+            asin = asin_of(record)
+            if not asin: continue
+            applied += 1
+            stamp = record.get("scraped_timestamp") or ""
+            price = _price(record.get("price"))
+            entry = self.entries.get(asin)
+            if entry is None:
+                self.entries[asin] = {"record": record, "first_seen": stamp, "last_seen": stamp, "observations": 1,
+                                      "min_price": price, "max_price": price, "last_change": None, "previous_price": None}
+                continue
+
+            entry["observations"] += 1
+            if price is not None:
+                entry["min_price"] = price if entry["min_price"] is None else min(entry["min_price"], price)
+                entry["max_price"] = price if entry["max_price"] is None else max(entry["max_price"], price)
+            if stamp < entry["first_seen"]:
+                entry["first_seen"] = stamp
+            if stamp >= entry["last_seen"]:     # An older observation arriving late only widens the range
+                old_price = _price(entry["record"].get("price"))
+                if price is not None and old_price is not None and price != old_price:
+                    entry["last_change"], entry["previous_price"] = stamp, old_price
+                entry["record"], entry["last_seen"] = record, stamp
+        return applied
+
+    def records(self):
+        """Latest record per ASIN, in order of when each was last seen."""
+        return [entry["record"] for entry in sorted(self.entries.values(), key=lambda entry: entry["last_seen"])]
+
+    def records_by_asin(self):
+        """{asin: latest record}, e.g. to carry the books a run skipped into its snapshot."""
+        return {asin: entry["record"] for asin, entry in self.entries.items()}
+
+    def save(self, version):
+        self.version = version
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        atomic_write(self.path, json.dumps({"format": STATE_FORMAT, "version": version, "entries": self.entries},
+                                           ensure_ascii=False, separators=(",", ":")))
+
+
+def state_path(output_dir, wishlist_name):
+    return os.path.join(output_dir, wishlist_name, STATE_FILE)
+
+
+def load(store, wishlist_name, output_dir):
+    """The wishlist's latest state, rebuilt from the store's history if it is missing or out of date."""
+    state = LatestState(state_path(output_dir, wishlist_name))
+    version = history_key(store, wishlist_name)
+    if state.version != version:
+        state.entries = {}
+        if version is not None:
+            state.update(store.history(wishlist_name))
+            print(f"Rebuilt the latest state of '{wishlist_name}' from its history ({len(state)} items).")
+        state.save(version)
+    return state
+
+
+def _print_entry(asin, entry):
+    record = entry["record"]
+    change = f", last change {entry['last_change']} from {entry['previous_price']}" if entry["last_change"] else ""
+    print(f"{asin}  {record.get('title', '')[:60]}\n"
+          f"    price {record.get('price')} (min {entry['min_price']}, max {entry['max_price']}{change})\n"
+          f"    seen {entry['observations']}x, {entry['first_seen']} .. {entry['last_seen']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latest state per ASIN of a wishlist")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show_cmd = sub.add_parser("show", help="print the latest state of one ASIN, or of every item")
+    show_cmd.add_argument("wishlist")
+    show_cmd.add_argument("asin", nargs="?")
+    show_cmd.add_argument("--data", default="scraped_data")
+    args = parser.parse_args()
+    state = LatestState(state_path(args.data, args.wishlist))
+    if args.asin:
+        if args.asin not in state:
+            raise SystemExit(f"No state for {args.asin} in '{args.wishlist}'.")
+        _print_entry(args.asin, state.get(args.asin))
+    else:
+        for asin, entry in state.entries.items():
+            _print_entry(asin, entry)
@@ -0,0 +1,184 @@
+"""
+One-off migration to ASIN keys and canonical /dp/<ASIN> links (product_key.py).
+
+Files written before product_key.py hold links with coliid/colid/psc/ref_
+query strings, and the combined file was keyed by link, so the same book can
+sit in it twice. This rewrites, under the data directory:
+
+- all_wishlists.json and every run snapshot (<wishlist>/<wishlist>_<ts>.json
+  and .jsonl): canonical links, asin filled in, one entry per wishlist and
+  ASIN (the most recently scraped one, at the position of the first)
+- historical_data.json and history.jsonl: canonical links and asin; repeated
+  observations (same wishlist, ASIN and scraped_timestamp) are dropped
+- wishlist.sqlite: the same for the records table
+
+plus the dashboards' combined files next to the data directory
+(web*/all_wishlists.json, unless --no-dashboards) and any extra combined-style
+files given. JSON files go through the same backup rotation as the store
+(.bak1 ... .bakN, N = export.history_backups, 3 by default), and the database
+is copied to wishlist.sqlite.bak first. Files that need no change are not
+touched, so running it twice is harmless. The latest state and analytics
+caches notice the new history versions and rebuild by themselves.
+
+    python migrate_keys.py [--data scraped_data] [--backups 3] [--no-dashboards] [--dry-run] [FILE ...]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+
+from atomic_write import atomic_open
+from json_stream import iter_json_array, write_json_array
+from product_key import asin_of, canonical_record, record_key
+
+SNAPSHOT_RE = re.compile(r"_\d{8}_\d{6}\.jsonl?$")
+DASHBOARD_PATTERN = os.path.join("web*", "all_wishlists.json")
+
+
+def _normalize(record, counts):
+    updated = canonical_record(record)
+    if updated.get("link") != record.get("link") or updated.get("asin") != record.get("asin"):
+        counts["rewritten"] += 1
+    counts["records"] += 1
+    return updated
+
+
+def _latest_per_key(records, counts):
+    """One record per record_key, the most recently scraped, in order of first appearance."""
+    latest = {}
+    for record in records:
+        record = _normalize(record, counts)
+        key = record_key(record)
+        if key in latest:
+            counts["duplicates"] += 1
+            if (record.get("scraped_timestamp") or "") < (latest[key].get("scraped_timestamp") or ""):
+                continue
+        latest[key] = record
+    return list(latest.values())
+
+
+def _without_repeats(records, counts):
+    """Normalized records, minus repeated observations of the same book at the same time."""
+    seen = set()
+    for record in records:
+        record = _normalize(record, counts)
+        observation = (record_key(record), record.get("scraped_timestamp"))
+        if observation in seen:
+            counts["duplicates"] += 1
+            continue
+        seen.add(observation)
+        yield record
+
+
+def _iter_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _write_jsonl(path, records, backups):
+    with atomic_open(path, backups=backups) as f:
+        f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+def migrate_file(path, history, dry_run=False, backups=3):
+    """Migrates one JSON array or JSONL file; returns its counts."""
+    counts = {"records": 0, "rewritten": 0, "duplicates": 0}
+    jsonl = path.endswith(".jsonl")
+    read = _iter_jsonl if jsonl else iter_json_array
+    if history:
+        # Histories can be large: one streaming pass counts, a second one rewrites if anything changed.
+        for _ in _without_repeats(read(path), counts): pass
+        records = _without_repeats(read(path), dict.fromkeys(counts, 0))
+    else:
+        records = _latest_per_key(read(path), counts)
+    if not dry_run and (counts["rewritten"] or counts["duplicates"]):
+        if jsonl:
+            _write_jsonl(path, records, backups)
+        else:
+            write_json_array(path, records, backups=backups)
+    return counts
+
+
+def migrate_sqlite(path, dry_run=False):
+    """Canonical links and asins in the records table; repeated history observations are deleted."""
+    import sqlite3
+    counts = {"records": 0, "rewritten": 0, "duplicates": 0}
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        updates, seen, repeats = [], set(), []
+        for rowid, wishlist_name, in_history, data in conn.execute(
+                "SELECT rowid, wishlist_name, in_history, data FROM records ORDER BY rowid"):
+            record = json.loads(data)
+            updated = _normalize(record, counts)
+            if updated != record:
+                updates.append((updated.get("asin"), updated.get("link"), json.dumps(updated, ensure_ascii=False), rowid))
+            observation = (wishlist_name, in_history, asin_of(updated) or updated.get("link"), updated.get("scraped_timestamp"))
+            if in_history and observation in seen:
+                repeats.append((rowid,))
+            seen.add(observation)
+        counts["duplicates"] = len(repeats)
+        if not dry_run and (updates or repeats):
+            conn.close()
+            shutil.copy2(path, f"{path}.bak")
+            conn = sqlite3.connect(path, timeout=30)
+            with conn:
+                conn.executemany("UPDATE records SET asin = ?, link = ?, data = ? WHERE rowid = ?", updates)
+                conn.executemany("DELETE FROM records WHERE rowid = ?", repeats)
+    finally:
+        conn.close()
+    return counts
+
+
+def run(data_dir="scraped_data", extra_files=(), dry_run=False, backups=3, dashboards=True):
+    """
+    Migrates every file under `data_dir`, the web*/all_wishlists.json files next to it
+    (with `dashboards`) and `extra_files`; prints a line per changed file, returns the totals.
+    """
+    combined = [os.path.join(data_dir, "all_wishlists.json"), *extra_files]
+    if dashboards:
+        combined += sorted(glob.glob(os.path.join(os.path.dirname(os.path.normpath(data_dir)), DASHBOARD_PATTERN)))
+    combined = list(dict.fromkeys(os.path.normpath(path) for path in combined))
+    jobs = [(path, False) for path in combined if os.path.exists(path)]
+    for path in sorted(glob.glob(os.path.join(data_dir, "*", "*"))):
+        name = os.path.basename(path)
+        if name in ("historical_data.json", "history.jsonl"):
+            jobs.append((path, True))
+        elif SNAPSHOT_RE.search(name):
+            jobs.append((path, False))
+
+    totals = {"records": 0, "rewritten": 0, "duplicates": 0}
+    results = []
+    for path, history in jobs:
+        try:
+            results.append((path, migrate_file(path, history, dry_run, backups)))
+        except json.JSONDecodeError:
+            print(f"Skipped '{path}': it is damaged (restore it from a .bak first).")
+    sqlite_path = os.path.join(data_dir, "wishlist.sqlite")
+    if os.path.exists(sqlite_path):
+        results.append((sqlite_path, migrate_sqlite(sqlite_path, dry_run)))
+
+    verb = "Would change" if dry_run else "Changed"
+    for path, counts in results:
+        for key in totals:
+            totals[key] += counts[key]
+        if counts["rewritten"] or counts["duplicates"]:
+            print(f"{verb} {path}: {counts['rewritten']} of {counts['records']} records re-keyed, "
+                  f"{counts['duplicates']} duplicates removed")
+    print(f"{len(results)} files, {totals['records']} records: {totals['rewritten']} re-keyed, "
+          f"{totals['duplicates']} duplicates removed" + (" (dry run, nothing written)" if dry_run else ""))
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate saved data to ASIN keys and canonical links")
+    parser.add_argument("files", nargs="*", help="extra combined files to dedupe, e.g. a dashboard's all_wishlists.json")
+    parser.add_argument("--data", default="scraped_data")
+    parser.add_argument("--backups", type=int, default=3, help="backup versions per file (export.history_backups)")
+    parser.add_argument("--no-dashboards", action="store_true", help="leave the web*/all_wishlists.json files alone")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    args = parser.parse_args()
+    run(args.data, args.files, args.dry_run, args.backups, not args.no_dashboards)
@@ -0,0 +1,232 @@
+"""
+Columnar Parquet export of scraped runs, partitioned by wishlist and date.
+
+    scraped_data/parquet/wishlist_name=IT%20Books/date=2026-06-10/<run>-0.parquet
+
+Columns are typed (float price, int pages/reviews, dictionary-encoded format
+and seller, timestamps), so notebooks load a year of history in milliseconds
+instead of parsing indent=4 JSON. `read_dataset` pushes wishlist/date filters
+down to the directory layout and other filters to the Parquet row groups.
+
+Backfill every JSON snapshot already in the tree (webN folders, compare/ and
+scraped_data) with:
+
+    python parquet_export.py backfill [--root .] [--out scraped_data/parquet]
+
+Requires pyarrow (`pip install pyarrow`).
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+from datetime import datetime
+
+pa = ds = None  # pyarrow takes ~200 ms to import, so it is loaded by the first call that needs it
+
+from product_key import asin_of
+
+DEFAULT_DIR = os.path.join("scraped_data", "parquet")
+
+
+def _schema():
+    return pa.schema([
+        ("title", pa.string()),
+        ("author", pa.string()),
+        ("price", pa.float64()),
+        ("pages", pa.int32()),
+        ("reviews", pa.int32()),
+        ("avg_rating", pa.float32()),
+        ("seller", pa.dictionary(pa.int32(), pa.string())),
+        ("format", pa.dictionary(pa.int32(), pa.string())),
+        ("value_per_page", pa.float64()),
+        ("link", pa.string()),
+        ("asin", pa.string()),
+        ("scraped_timestamp", pa.timestamp("us")),
+        ("wishlist_name", pa.string()),
+        ("date", pa.string()),
+    ])
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([("wishlist_name", pa.string()), ("date", pa.string())]), flavor="hive")
+
+
+def _require_pyarrow():
+    global pa, ds
+    if pa is not None:
+        return
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow") from None
+    pa, ds = pyarrow, pyarrow.dataset
+
+
+def _number(value, kind):
+    if value is None or value == "":
+        return None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _timestamp(stamp):
+    try:
+        return datetime.fromisoformat(stamp) if stamp else None
+    except (TypeError, ValueError):
+        return None
+
+
+def to_table(books, default_wishlist="unknown", default_timestamp=None):
+    """Arrow table with the typed export schema; missing or malformed values become nulls."""
+    _require_pyarrow()
+    columns = {name: [] for name in _schema().names}
+    for book in books:
+        scraped = _timestamp(book.get("scraped_timestamp") or default_timestamp)
+        columns["title"].append(book.get("title"))
+        columns["author"].append(book.get("author"))
+        columns["price"].append(_number(book.get("price"), float))
+        columns["pages"].append(_number(book.get("pages"), int))
+        columns["reviews"].append(_number(book.get("reviews"), int))
+        columns["avg_rating"].append(_number(book.get("avg_rating"), float))
+        columns["seller"].append(book.get("seller"))
+        columns["format"].append(book.get("format"))
+        columns["value_per_page"].append(_number(book.get("value_per_page"), float))
+        columns["link"].append(book.get("link"))
+        columns["asin"].append(asin_of(book))
+        columns["scraped_timestamp"].append(scraped)
+        columns["wishlist_name"].append(book.get("wishlist_name") or default_wishlist)
+        columns["date"].append(scraped.date().isoformat() if scraped else "unknown")
+    return pa.Table.from_pydict(columns, schema=_schema())
+
+
+def write_table(table, root=DEFAULT_DIR, run_id=None):
+    """Writes one run into the partitioned dataset; rewriting the same run_id replaces its files."""
+    _require_pyarrow()
+    run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    ds.write_dataset(
+        table, root, format="parquet", partitioning=_partitioning(),
+        basename_template=f"{run_id}-{{i}}.parquet", existing_data_behavior="overwrite_or_ignore")
+    return table.num_rows
+
+
+def export_run(books, root=DEFAULT_DIR, run_id=None):
+    """Called from save_results for every scraped run."""
+    return write_table(to_table(books), root, run_id)
+
+
+def read_dataset(root=DEFAULT_DIR, wishlists=None, start=None, end=None, asins=None, columns=None, where=None):
+    """
+    Loads the dataset as an Arrow table. `wishlists` and the ISO `start`/`end`
+    dates prune whole partitions; `asins` and any extra `where` expression
+    (pyarrow.dataset.field(...) comparisons) are evaluated against Parquet
+    statistics before rows are decoded. Use `.to_pandas()` on the result for a DataFrame.
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(root, format="parquet", partitioning=_partitioning(), schema=_schema())
+    conditions = []
+    if wishlists:
+        conditions.append(ds.field("wishlist_name").isin(list(wishlists)))
+    if start:
+        conditions.append(ds.field("date") >= start)
+    if end:
+        conditions.append(ds.field("date") <= end)
+    if asins:
+        conditions.append(ds.field("asin").isin(list(asins)))
+    if where is not None:
+        conditions.append(where)
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+# --- Backfill ---
+
+SNAPSHOT_PATTERNS = [
+    os.path.join("web*", "*.json"),
+    os.path.join("web*", "scraped_data", "**", "*.json"),
+    os.path.join("compare", "*.json"),
+    os.path.join("scraped_data", "**", "*.json"),
+]
+
+
+def _load_snapshot(path):
+    """Book records in a JSON snapshot, or [] for anything else (configs, ratings, price comparisons)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+        return []
+    if not isinstance(data, list) or not data or not isinstance(data[0], dict):
+        return []
+    if "title" not in data[0] or "price" not in data[0]:
+        return []
+    return data
+
+
+def _file_timestamp(path):
+    """When a snapshot without scrape times was taken: its last commit, else its modification time."""
+    try:
+        result = subprocess.run(["git", "log", "-1", "--format=%ct", "--", os.path.basename(path)],
+                                cwd=os.path.dirname(path) or ".", capture_output=True, text=True)
+        seconds = int(result.stdout.strip()) if result.returncode == 0 and result.stdout.strip() else None
+    except OSError:
+        seconds = None
+    return datetime.fromtimestamp(seconds or os.path.getmtime(path)).isoformat(timespec="seconds")
+
+
+def backfill(root=".", out=None):
+    """
+    Exports every JSON snapshot under `root` into the dataset. Records seen in
+    several files (combined files, per-run files and histories overlap) are
+    written once, keyed by ASIN (or link), scrape time and price. Records
+    without a scrape time get the earliest one in their file; files without any
+    (the oldest dashboards) get the file's commit or modification time.
+    Re-running replaces the previous backfill output.
+    """
+    _require_pyarrow()
+    out = out or os.path.join(root, DEFAULT_DIR)
+    seen, books, undated = set(), [], []
+    paths = sorted({p for pattern in SNAPSHOT_PATTERNS for p in glob.glob(os.path.join(root, pattern), recursive=True)})
+    files = 0
+    for path in paths:
+        records = _load_snapshot(path)
+        if not records:
+            continue
+        files += 1
+        stamps = [r["scraped_timestamp"] for r in records if r.get("scraped_timestamp")]
+        if not stamps:
+            stamps = [_file_timestamp(path)]
+            undated.append((path, stamps[0]))
+        # Per-wishlist folders name the wishlist when old records lack the field.
+        folder = os.path.basename(os.path.dirname(path))
+        fallback_wishlist = folder if os.path.basename(os.path.dirname(os.path.dirname(path))) == "scraped_data" else "unknown"
+        for record in records:
+            stamp = record.get("scraped_timestamp") or min(stamps)
+            key = (asin_of(record) or record.get("link"), stamp, str(record.get("price")))
+            if key in seen:
+                continue
+            seen.add(key)
+            books.append(dict(record, scraped_timestamp=stamp,
+                              wishlist_name=record.get("wishlist_name") or fallback_wishlist))
+    if books:
+        write_table(to_table(books), out, run_id="backfill")
+    print(f"Backfilled {len(books)} unique records from {files} files into {out}")
+    for path, stamp in undated:
+        print(f"  {path}: no scrape timestamps, dated {stamp} from the file")
+    return len(books)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parquet export of scraped wishlist data")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fill = sub.add_parser("backfill", help="export every existing JSON snapshot")
+    fill.add_argument("--root", default=".")
+    fill.add_argument("--out", default=None)
+    args = parser.parse_args()
+    if args.command == "backfill":
+        backfill(args.root, args.out)
@@ -0,0 +1,269 @@
+"""
+Memory-mapped binary price history, indexed by ASIN.
+
+Answering "price history for this ASIN" used to mean parsing every
+historical_data.json. The index keeps one fixed-width 28-byte record per
+observation:
+
+    asin_id uint32 | timestamp int64 (µs) | price float64 | reviews int32 | rating float32
+
+Files in the index directory (default scraped_data/price_index):
+
+- prices.bin: records sorted by (asin_id, timestamp), read through mmap
+- index.bin: (first record, count) per asin_id, behind a header holding the
+  prices.bin record count it was built for
+- asins.txt: one ASIN per line; the line number is the asin_id
+- pending.bin: unsorted records appended by save_results since the last
+  compaction, merged into prices.bin once it grows past a fraction of it
+
+A lookup slices the mapped file without parsing anything; `view()` exposes
+the whole store as a NumPy structured array for vectorized analysis.
+
+    python price_index.py build [--data scraped_data]
+    python price_index.py show ASIN
+"""
+import argparse
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+from array import array
+from datetime import datetime, timedelta
+
+from atomic_write import atomic_write
+from json_stream import iter_json_array
+
+np = None      # Loaded by view(); lookups and appends need only the standard library
+DTYPE = None
+
+RECORD = struct.Struct("<Iqdif")
+HEADER = struct.Struct("<Q")
+DEFAULT_DIR = os.path.join("scraped_data", "price_index")
+COMPACT_MIN_PENDING = 5000      # Records
+COMPACT_PENDING_RATIO = 0.25    # ... or this fraction of prices.bin, whichever is larger
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NAN = float("nan")
+
+def _micros(stamp):
+    return (datetime.fromisoformat(stamp) - _EPOCH) // _MICROSECOND
+
+
+def _require_numpy():
+    global np, DTYPE
+    if np is not None:
+        return
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("The NumPy view needs numpy: pip install numpy") from None
+    np = numpy
+    DTYPE = np.dtype([("asin_id", "<u4"), ("ts", "<i8"), ("price", "<f8"), ("reviews", "<i4"), ("rating", "<f4")])
+
+
+def _number(value, kind, missing):
+    try:
+        return missing if value is None else kind(value)
+    except (TypeError, ValueError):
+        return missing
+
+
+class PriceIndex:
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.prices_path = os.path.join(directory, "prices.bin")
+        self.index_path = os.path.join(directory, "index.bin")
+        self.asins_path = os.path.join(directory, "asins.txt")
+        self.pending_path = os.path.join(directory, "pending.bin")
+        self.asins = []
+        if os.path.exists(self.asins_path):
+            with open(self.asins_path, "r", encoding="utf-8") as f:
+                self.asins = [line.strip() for line in f if line.strip()]
+        self.ids = {asin: i for i, asin in enumerate(self.asins)}
+        self._file = self._map = None
+        self._index = None
+
+    # --- Reading ---
+
+    def _open_main(self):
+        if self._map is not None or not os.path.exists(self.prices_path):
+            return
+        if os.path.getsize(self.prices_path) == 0:
+            return
+        self._file = open(self.prices_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index = self._load_index(len(self._map) // RECORD.size)
+
+    def _load_index(self, count):
+        """(first record, count) pairs per asin_id; rebuilt from prices.bin if stale."""
+        index = array("Q")
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                header = f.read(HEADER.size)
+                if len(header) == HEADER.size and HEADER.unpack(header)[0] == count:
+                    index.frombytes(f.read())
+                    return index
+        # Interrupted compaction: derive the index from the sorted records themselves.
+        index.extend([0, 0] * len(self.asins))
+        for position, record in enumerate(RECORD.iter_unpack(self._map)):
+            asin_id = record[0]
+            if index[2 * asin_id + 1] == 0:
+                index[2 * asin_id] = position
+            index[2 * asin_id + 1] += 1
+        return index
+
+    def _pending(self, asin_id=None):
+        if not os.path.exists(self.pending_path):
+            return []
+        with open(self.pending_path, "rb") as f:
+            data = f.read()
+        data = data[:len(data) - len(data) % RECORD.size]   # Ignore a torn final record
+        return [r for r in RECORD.iter_unpack(data) if asin_id is None or r[0] == asin_id]
+
+    def records(self, asin):
+        """Raw (asin_id, ts_micros, price, reviews, rating) tuples of one ASIN, oldest first."""
+        asin_id = self.ids.get(asin)
+        if asin_id is None:
+            return []
+        self._open_main()
+        result = []
+        if self._map is not None and 2 * asin_id + 1 < len(self._index):
+            start, count = self._index[2 * asin_id], self._index[2 * asin_id + 1]
+            result = list(RECORD.iter_unpack(memoryview(self._map)[start * RECORD.size:(start + count) * RECORD.size]))
+        pending = self._pending(asin_id)
+        if pending:
+            by_time = {r[1]: r for r in result}
+            by_time.update((r[1], r) for r in pending)
+            result = [by_time[ts] for ts in sorted(by_time)]
+        return result
+
+    def history(self, asin):
+        """[(datetime, price, reviews, rating)] of one ASIN, oldest first, with missing values as None."""
+        return [(_EPOCH + ts * _MICROSECOND,
+                 None if math.isnan(price) else price,
+                 None if reviews < 0 else reviews,
+                 None if math.isnan(rating) else round(rating, 2))
+                for _, ts, price, reviews, rating in self.records(asin)]
+
+    def view(self):
+        """All records as a NumPy structured array over the mapped file (pending records are compacted first)."""
+        _require_numpy()
+        if self._pending():
+            self.compact()
+        self._open_main()
+        if self._map is None:
+            return np.zeros(0, dtype=DTYPE)
+        return np.frombuffer(self._map, dtype=DTYPE)
+
+    def asin_view(self, asin):
+        """Zero-copy NumPy slice of one ASIN's records."""
+        records = self.view()
+        asin_id = self.ids.get(asin)
+        if asin_id is None or 2 * asin_id + 1 >= len(self._index):
+            return records[:0]
+        start = self._index[2 * asin_id]
+        return records[start:start + self._index[2 * asin_id + 1]]
+
+    # --- Writing ---
+
+    def _asin_id(self, asin, new_asins):
+        asin_id = self.ids.get(asin)
+        if asin_id is None:
+            asin_id = self.ids[asin] = len(self.asins)
+            self.asins.append(asin)
+            new_asins.append(asin)
+        return asin_id
+
+    def append(self, books):
+        """Adds the observations of one save_results call; compacts when enough are pending."""
+        new_asins, packed = [], bytearray()
+        for book in books:
+            asin, stamp = book.get("asin"), book.get("scraped_timestamp")
+            if not asin or not stamp:
+                continue
+            try:
+                ts = _micros(stamp)
+            except (TypeError, ValueError):
+                continue
+            packed += RECORD.pack(self._asin_id(asin, new_asins), ts,
+                                  _number(book.get("price"), float, _NAN),
+                                  _number(book.get("reviews"), int, -1),
+                                  _number(book.get("avg_rating"), float, _NAN))
+        # ASINs first, so a record never refers to an id that is not on disk.
+        if new_asins:
+            with open(self.asins_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{asin}\n" for asin in new_asins))
+        if packed:
+            with open(self.pending_path, "ab") as f:
+                f.write(packed)
+        main_count = os.path.getsize(self.prices_path) // RECORD.size if os.path.exists(self.prices_path) else 0
+        pending_count = os.path.getsize(self.pending_path) // RECORD.size if os.path.exists(self.pending_path) else 0
+        if pending_count >= max(COMPACT_MIN_PENDING, COMPACT_PENDING_RATIO * main_count):
+            self.compact()
+        return len(packed) // RECORD.size
+
+    def compact(self):
+        """Merges pending records into prices.bin (sorted, one record per ASIN and timestamp)."""
+        self._open_main()
+        merged = {}
+        if self._map is not None:
+            for record in RECORD.iter_unpack(self._map):
+                merged[record[:2]] = record
+        for record in self._pending():
+            merged[record[:2]] = record
+        self.close()
+        records = [merged[key] for key in sorted(merged)]
+
+        index = array("Q", [0, 0] * len(self.asins))
+        for position, record in enumerate(records):
+            asin_id = record[0]
+            if index[2 * asin_id + 1] == 0:
+                index[2 * asin_id] = position
+            index[2 * asin_id + 1] += 1
+
+        atomic_write(self.prices_path, b"".join(RECORD.pack(*r) for r in records))
+        atomic_write(self.index_path, HEADER.pack(len(records)) + index.tobytes())
+        if os.path.exists(self.pending_path):
+            os.remove(self.pending_path)
+        return len(records)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._file = self._map = self._index = None
+
+
+def build(data_dir="scraped_data", directory=None):
+    """Builds (or tops up) the index from every wishlist's historical_data.json."""
+    index = PriceIndex(directory or os.path.join(data_dir, "price_index"))
+    total = 0
+    for path in sorted(glob.glob(os.path.join(data_dir, "*", "historical_data.json"))):
+        try:
+            total += index.append(iter_json_array(path))
+        except json.JSONDecodeError:
+            print(f"Stopped at a damaged record in {path}")
+    count = index.compact()
+    index.close()
+    print(f"Indexed {total} observations; {count} unique records for {len(index.asins)} ASINs in {index.directory}")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Binary price-history index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="index every historical_data.json")
+    build_cmd.add_argument("--data", default="scraped_data")
+    show_cmd = sub.add_parser("show", help="print the price history of one ASIN")
+    show_cmd.add_argument("asin")
+    show_cmd.add_argument("--dir", default=DEFAULT_DIR)
+    args = parser.parse_args()
+    if args.command == "build":
+        build(args.data)
+    else:
+        for moment, price, reviews, rating in PriceIndex(args.dir).history(args.asin):
+            print(f"{moment:%Y-%m-%d %H:%M}  price {price}  reviews {reviews}  rating {rating}")
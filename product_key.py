@@ -0,0 +1,59 @@
+"""
+Product identity: the ASIN is the key of a book, and https://<host>/dp/<ASIN> its link.
+
+Wishlist links carry per-list query strings (coliid, colid, psc, ref_), so
+the same product added to two lists, or re-added to one, used to get two
+different links. Everything that dedupes, merges or caches goes through
+this module instead:
+
+- asin_of: the ASIN of a record or of any product link (/dp/, /gp/product/,
+  /gp/aw/d/)
+- canonical_url: the query-free /dp/<ASIN> link
+- canonical_record: a record with its asin filled in and its link canonical
+- record_key: "<wishlist>/<ASIN>", how the combined all_wishlists.json and
+  the snapshots tell entries apart (a book may be on several lists)
+"""
+import re
+from urllib.parse import urlsplit
+
+ASIN_RE = re.compile(r"/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})")
+DEFAULT_HOST = "www.amazon.in"
+
+
+def asin_of(record_or_link):
+    """ASIN of a record (its 'asin' field, else its link) or of a product link."""
+    if isinstance(record_or_link, dict):
+        if record_or_link.get("asin"):
+            return record_or_link["asin"]
+        record_or_link = record_or_link.get("link")
+    match = ASIN_RE.search(record_or_link or "")
+    return match.group(1) if match else None
+
+
+def canonical_url(link, asin=None):
+    """https://<host>/dp/<ASIN> for a product link; any other link just loses its query string and /ref= part."""
+    if not link and not asin:
+        return link
+    parts = urlsplit(link or "")
+    host = parts.netloc or DEFAULT_HOST
+    asin = asin or asin_of(link)
+    if asin:
+        return f"https://{host}/dp/{asin}"
+    return f"{parts.scheme or 'https'}://{host}{parts.path.split('/ref=')[0]}"
+
+
+def canonical_record(record):
+    """A copy of the record with `asin` filled in from its link and the link canonical."""
+    asin = asin_of(record)
+    updated = dict(record)
+    if asin:
+        updated["asin"] = asin
+    if record.get("link") or asin:
+        updated["link"] = canonical_url(record.get("link"), asin)
+    return updated
+
+
+def record_key(record):
+    """"<wishlist>/<ASIN>", or the canonical link for the rare record without an ASIN."""
+    asin = asin_of(record)
+    return f"{record.get('wishlist_name')}/{asin}" if asin else canonical_url(record.get("link"))
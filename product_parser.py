@@ -0,0 +1,128 @@
+"""
+Parses a raw Amazon product page into the compact details dict.
+
+Every fetcher backend of the amazon_wishlist package ends here: it receives
+the page HTML instead of a live driver, so it can run in a worker process of a
+ProcessPoolExecutor. The extractors in amazon_wishlist/extractors.py wrap it.
+
+When lxml is installed the precompiled spec in extraction_spec.py is used;
+the BeautifulSoup cascade below is the fallback and the benchmark baseline.
+"""
+import re
+
+from bs4 import BeautifulSoup
+
+from product_key import ASIN_RE
+
+try:
+    from extraction_spec import extract_details
+    _BS4_FEATURES = "lxml"
+except ImportError:
+    extract_details = None
+    _BS4_FEATURES = "html.parser"
+
+PAGES_RE = re.compile(r'(\d+)\s*pages')
+NUMBER_RE = re.compile(r'(\d+)')
+COUNT_RE = re.compile(r'([\d,]+)')
+RATING_RE = re.compile(r'([\d\.]+)\s*out of 5')
+
+TECH_TABLE_IDS = ["productDetails_techSpec_section_1", "productDetails_detailBullets_sections1"]
+
+
+def empty_details(link):
+    details = {
+        "page_count": None, "review_count": None, "book_format": "Unknown",
+        "has_keep_badge": False, "author": None, "publication_date": None,
+        "asin": None, "avg_rating": None, "seller": None
+    }
+    asin_match = ASIN_RE.search(link or "")
+    if asin_match:
+        details["asin"] = asin_match.group(1)
+    return details
+
+
+def _text(element):
+    """Whitespace-collapsed text, like Selenium's WebElement.text."""
+    return " ".join(element.get_text(" ").split())
+
+
+def find_pages(soup):
+    """Same cascade as the find_pages_in_* helpers: bullets, tech tables, description, any table."""
+    bullets = soup.find(id="detailBullets_feature_div")
+    if bullets:
+        for item in bullets.select(".a-list-item"):
+            text = _text(item).lower()
+            if "page" in text:
+                match = PAGES_RE.search(text)
+                if match:
+                    return int(match.group(1))
+
+    for table_id in TECH_TABLE_IDS:
+        table = soup.find(id=table_id)
+        if not table:
+            continue
+        for row in table.find_all("tr"):
+            text = _text(row).lower()
+            if "page" in text:
+                match = NUMBER_RE.search(text)
+                if match:
+                    return int(match.group(1))
+
+    description = soup.find(id="productDescription")
+    if description:
+        match = PAGES_RE.search(_text(description).lower())
+        if match:
+            return int(match.group(1))
+
+    for table in soup.find_all("table"):
+        text = _text(table).lower()
+        if "page" in text:
+            match = PAGES_RE.search(text)
+            if match:
+                return int(match.group(1))
+    return None
+
+
+def parse_product_page(html, link):
+    """Returns the details dict for one product page (bytes or str)."""
+    if extract_details:
+        return extract_details(html, link)
+    return parse_product_page_bs4(html, link)
+
+
+def parse_product_page_bs4(html, link):
+    """BeautifulSoup port of the cascaded find_element lookups."""
+    details = empty_details(link)
+    soup = BeautifulSoup(html, _BS4_FEATURES)
+    if not soup.find(id="productTitle"):
+        return None
+
+    details["page_count"] = find_pages(soup)
+
+    for selector in ("#acrCustomerReviewText", "span[data-hook='total-review-count']"):
+        element = soup.select_one(selector)
+        if element:
+            match = COUNT_RE.search(_text(element))
+            if match:
+                details["review_count"] = int(match.group(1).replace(',', ''))
+                break
+
+    element = soup.select_one("span[data-hook='rating-out-of-text']")
+    if element:
+        match = RATING_RE.search(_text(element))
+        if match:
+            details["avg_rating"] = float(match.group(1))
+
+    element = soup.select_one("#tmmSwatches .a-button-selected .a-button-text")
+    if element:
+        details["book_format"] = element.get_text("\n", strip=True)
+
+    authors = soup.select("#bylineInfo .author a")
+    if authors:
+        details["author"] = ", ".join(_text(a) for a in authors)
+
+    element = soup.find(id="sellerProfileTriggerId")
+    if element:
+        details["seller"] = _text(element)
+
+    return details
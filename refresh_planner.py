@@ -0,0 +1,216 @@
+"""
+Volatility-aware refresh planning per ASIN.
+
+Most prices sit flat for weeks while a few swing daily, so opening every
+product page on every run wastes most of the budget. From the price history of
+each ASIN we estimate a change rate (changes per day, with a prior so items
+seen only once or twice are not written off) and turn it into the probability
+that the price has changed since the item was last checked:
+
+    rate        = (changes + PRIOR_CHANGES) / (observed_days + PRIOR_DAYS),
+                  boosted while the last change is recent
+    probability = 1 - exp(-rate * days_since_checked)
+
+A run then visits new ASINs first and fills the rest of its page budget with
+the most-likely-changed items. `backtest` replays dated snapshots to compare
+the catch rate of price drops against a naive round-robin refresh.
+
+`refresh_from_list_view` is the prices-only mode: the wishlist rows already
+carry each item's price, so known books are updated without opening their
+product page at all.
+"""
+import math
+from datetime import datetime
+
+from product_key import asin_of
+
+PRIOR_CHANGES = 1.0     # One change ...
+PRIOR_DAYS = 60.0       # ... per 60 days until the history says otherwise
+RECENT_HALF_LIFE_DAYS = 14.0
+RECENT_BOOST = 1.0      # A change today doubles the rate; the boost halves every half-life
+
+DAY = 86400.0
+
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def price_series(records):
+    """{asin: [(timestamp, price), ...]} sorted by time, one point per timestamp."""
+    series = {}
+    for record in records:
+        asin, ts = asin_of(record), _timestamp(record.get("scraped_timestamp"))
+        if asin and ts is not None and record.get("price") is not None:
+            series.setdefault(asin, {})[ts] = record["price"]
+    return {asin: sorted(points.items()) for asin, points in series.items()}
+
+
+def item_stats(points):
+    """Summary used by the planner for one ASIN's [(timestamp, price)] series."""
+    changes, last_change = 0, None
+    for (_, previous), (ts, price) in zip(points, points[1:]):
+        if price != previous:
+            changes += 1
+            last_change = ts
+    return {
+        "first_seen": points[0][0],
+        "last_checked": points[-1][0],
+        "last_price": points[-1][1],
+        "changes": changes,
+        "last_change": last_change,
+        "observed_days": (points[-1][0] - points[0][0]) / DAY,
+    }
+
+
+def build_stats(records):
+    return {asin: item_stats(points) for asin, points in price_series(records).items()}
+
+
+def change_rate(stats, now):
+    """Estimated price changes per day (the volatility score)."""
+    rate = (stats["changes"] + PRIOR_CHANGES) / (stats["observed_days"] + PRIOR_DAYS)
+    if stats["last_change"] is not None:
+        age = max(0.0, now - stats["last_change"]) / DAY
+        rate *= 1 + RECENT_BOOST * 0.5 ** (age / RECENT_HALF_LIFE_DAYS)
+    return rate
+
+
+def change_probability(stats, now):
+    """Probability that the price moved since the item was last checked."""
+    elapsed = max(0.0, now - stats["last_checked"]) / DAY
+    return 1 - math.exp(-change_rate(stats, now) * elapsed)
+
+
+def plan_refresh(asins, stats, budget, now=None):
+    """
+    Picks at most `budget` ASINs to open: unseen ones first, then by descending
+    change probability. Returns (selected, skipped) preserving input order.
+    """
+    now = now if now is not None else datetime.now().timestamp()
+    new = [a for a in asins if a not in stats]
+    known = sorted((a for a in asins if a in stats), key=lambda a: -change_probability(stats[a], now))
+    chosen = set(new[:budget]) | set(known[:max(0, budget - len(new))])
+    return [a for a in asins if a in chosen], [a for a in asins if a not in chosen]
+
+
+def run_budget(pages_per_hour, stats, asins, now=None, max_hours=24 * 7):
+    """Pages this run may open: the hourly budget times the hours since the wishlist was last checked."""
+    now = now if now is not None else datetime.now().timestamp()
+    checked = [stats[a]["last_checked"] for a in asins if a in stats]
+    hours = (now - max(checked)) / 3600 if checked else max_hours
+    return max(1, int(pages_per_hour * min(max(hours, 1), max_hours)))
+
+
+# --- List-view refresh ---
+
+LIST_PRICE_MAX_JUMP = 0.5       # A list price this far (relative) from the last one is double-checked
+DETAILS_MAX_AGE_DAYS = 30       # Product page details older than this are re-scraped
+
+
+def list_view_problem(book_data, record, now, max_jump=LIST_PRICE_MAX_JUMP, max_age_days=DETAILS_MAX_AGE_DAYS):
+    """Why the list-view data for a known book cannot be trusted on its own, or None."""
+    link, title, price, _, _ = book_data
+    if price is None:
+        return "no list price"
+    if not record.get("pages") or not record.get("asin"):
+        return "incomplete details"
+    if (title or "").strip().casefold() != (record.get("title") or "").strip().casefold():
+        return "title changed"
+    last_price = record.get("price")
+    if last_price and abs(price - last_price) / last_price > max_jump:
+        return "price jump"
+    checked = _timestamp(record.get("details_timestamp") or record.get("scraped_timestamp"))
+    if checked is None or (now - checked) / DAY > max_age_days:
+        return "stale details"
+    return None
+
+
+def refresh_from_list_view(book_data_list, latest, max_jump=LIST_PRICE_MAX_JUMP, max_age_days=DETAILS_MAX_AGE_DAYS):
+    """
+    Prices-only refresh: updates known books straight from their wishlist-row
+    price and returns (updated records, book_data that still needs its product
+    page, {reason: count}). New ASINs and suspicious rows go to the second list.
+    """
+    now = datetime.now()
+    records, needs_page, reasons = [], [], {}
+    for book_data in book_data_list:
+        record = latest.get(asin_of(book_data[0]))
+        problem = "new" if record is None else list_view_problem(book_data, record, now.timestamp(), max_jump, max_age_days)
+        if problem:
+            reasons[problem] = reasons.get(problem, 0) + 1
+            needs_page.append(book_data)
+            continue
+        link, title, price, _, wishlist_name = book_data
+        updated = dict(record)
+        updated.update({
+            "price": price, "link": link, "wishlist_name": wishlist_name,
+            "value_per_page": price / record["pages"],
+            "details_timestamp": record.get("details_timestamp") or record.get("scraped_timestamp"),
+            "scraped_timestamp": now.isoformat(),
+        })
+        records.append(updated)
+    return records, needs_page, reasons
+
+
+# --- Backtest ---
+
+def drop_events(snapshots):
+    """
+    (asin, start, end) windows during which a dropped price was on offer, from
+    [(timestamp, {asin: price})] snapshots sorted by time.
+    """
+    events = []
+    for (t0, before), (t1, after), nxt in zip(snapshots, snapshots[1:], snapshots[2:] + [None]):
+        end = nxt[0] if nxt else None
+        for asin, price in after.items():
+            if price is not None and before.get(asin) is not None and price < before[asin]:
+                events.append((asin, t1, end))
+    return events
+
+
+def backtest(snapshots, pages_per_day, strategy="volatility", tick_hours=24, history=None):
+    """
+    Replays dated snapshots (ground truth between them is the last snapshot's
+    price) and refreshes `pages_per_day` pages per day with the given strategy:
+    'volatility' (this planner) or 'naive' (round-robin, oldest check first).
+    `history` snapshots are treated as already fully observed, like the
+    historical_data.json a wishlist has when it switches to planned refreshes.
+    Returns {'caught', 'drops', 'catch_rate', 'pages'}.
+    """
+    if len(snapshots) < 2:
+        return {"caught": 0, "drops": 0, "catch_rate": None, "pages": 0}
+    tick = tick_hours * 3600
+    per_tick = max(1, int(pages_per_day * tick_hours / 24))
+    events = drop_events(snapshots)
+    checks = {}         # asin -> list of check timestamps
+    observed = {}       # asin -> [(timestamp, price)] seen by the planner
+    for ts, prices in history or []:
+        for asin, price in prices.items():
+            if price is not None:
+                observed.setdefault(asin, []).append((ts, price))
+    pages, index, truth = 0, -1, {}
+    now, end = snapshots[0][0], snapshots[-1][0] + tick
+    while now < end:
+        while index + 1 < len(snapshots) and snapshots[index + 1][0] <= now:
+            index += 1
+            truth = snapshots[index][1]
+        asins = [a for a, p in truth.items() if p is not None]
+        if strategy == "naive":
+            asins.sort(key=lambda a: observed[a][-1][0] if a in observed else -1)
+            selected = asins[:per_tick]
+        else:
+            stats = {a: item_stats(observed[a]) for a in asins if a in observed}
+            selected, _ = plan_refresh(asins, stats, per_tick, now)
+        for asin in selected:
+            observed.setdefault(asin, []).append((now, truth[asin]))
+            checks.setdefault(asin, []).append(now)
+        pages += len(selected)
+        now += tick
+    caught = sum(1 for asin, start, stop in events
+                 if any(start <= t and (stop is None or t < stop) for t in checks.get(asin, [])))
+    return {"caught": caught, "drops": len(events),
+            "catch_rate": caught / len(events) if events else None, "pages": pages}
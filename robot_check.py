@@ -0,0 +1,184 @@
+"""
+Robot-check detection and a circuit breaker that pauses fetching while Amazon throttles.
+
+When Amazon distrusts a client it answers product URLs with a small
+interstitial instead of the product: the "Enter the characters you see below"
+captcha (a form posting to /errors/validateCaptcha) or the 503 "Sorry!
+Something went wrong!" page. Neither has a #productTitle, so every worker
+used to wait out its full timeout on every remaining book and drop it.
+
+- detect(page): the signature of a blocked page (bytes or str), found with
+  bytes.find in its first SCAN_BYTES, or None. Fetchers check responses
+  before pre-filtering, which would cut an interstitial down to nothing.
+- BLOCK_SELECTOR: CSS the Selenium fetcher waits for next to #productTitle,
+  so a captcha is noticed as soon as it renders.
+- PageBlocked: raised by a fetch that got an interstitial. The pipeline
+  retries the book after the pause and carries over its last known record if
+  it stays blocked; distributed workers put the job back in the queue.
+- CircuitBreaker: one per run, shared by every worker. `threshold` blocked
+  pages in a row open it: every fetch waits `pause` seconds (doubled on each
+  trip, up to `max_pause`, plus jitter) and the next user agent is used, so
+  fetchers start new sessions and drivers. Then one probe goes through; a
+  product page closes the breaker, another interstitial reopens it. After
+  `max_trips` trips the run stops fetching: the remaining fetches fail at
+  once with FetchingStopped (a PageBlocked) instead of each timing out.
+"""
+import random
+import threading
+import time
+
+SCAN_BYTES = 32768   # Interstitials are a few KB; their markers sit well within this
+SIGNATURES = [
+    ("captcha", b"/errors/validateCaptcha"),
+    ("captcha", b'id="captchacharacters"'),
+    ("robot check", b"Robot Check</title>"),
+    ("automated access", b"To discuss automated access to Amazon data"),
+    ("throttled", b"Sorry! Something went wrong!"),
+    ("throttled", b"ref=cs_503_"),
+]
+BLOCK_STATUSES = {429, 503}
+BLOCK_SELECTOR = "form[action*='validateCaptcha'], #captchacharacters, a[href*='ref=cs_503_']"
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+]
+DEFAULT_SETTINGS = {"threshold": 2, "pause": 15, "max_pause": 300, "max_trips": 4}
+
+_identity = 0    # Bumped on every trip; sessions and drivers made under an older one are replaced
+
+
+class PageBlocked(Exception):
+    """A fetch got a robot check or throttle page instead of the product."""
+
+    def __init__(self, url, signature):
+        super().__init__(f"{signature} page for {url}" if url else signature)
+        self.url = url
+        self.signature = signature
+
+
+class FetchingStopped(PageBlocked):
+    """The circuit breaker gave up for this run; raised before fetching."""
+
+
+def detect(page):
+    """Name of the interstitial `page` is, or None for any other page."""
+    if not page:
+        return None
+    head = page[:SCAN_BYTES]
+    if isinstance(head, str):
+        head = head.encode("utf-8", "ignore")
+    for name, marker in SIGNATURES:
+        if head.find(marker) != -1:
+            return name
+    return None
+
+
+def identity():
+    """Counter of the current client identity (user agent, sessions, drivers)."""
+    return _identity
+
+
+def user_agent():
+    return USER_AGENTS[_identity % len(USER_AGENTS)]
+
+
+def new_identity():
+    """Switches to the next user agent; fetchers notice the new identity and drop their sessions."""
+    global _identity
+    _identity += 1
+    return _identity
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=2, pause=15, max_pause=300, max_trips=4, clock=time.monotonic):
+        self.threshold = threshold
+        self.pause = pause
+        self.max_pause = max_pause
+        self.max_trips = max_trips
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.consecutive = 0      # Blocked pages since the last product page
+        self.blocked_pages = 0
+        self.trips = 0
+        self.open_until = 0
+        self.half_open = False    # The pause is over; only one probe fetch may run
+        self.probing = False
+        self.gave_up = False
+
+    def delay(self):
+        """
+        Seconds to wait before the next fetch, 0 to go ahead (which in the half-open
+        state makes the caller the probe). Raises PageBlocked once the breaker gave up.
+        """
+        with self.lock:
+            if self.gave_up:
+                raise FetchingStopped(None, "robot checks persisted; fetching stopped for this run")
+            now = self.clock()
+            if now < self.open_until:
+                return self.open_until - now
+            if self.half_open:
+                if self.probing:
+                    return 0.5
+                self.probing = True
+            return 0
+
+    def wait(self, stop_check=None):
+        """Blocks while the breaker is open; returns early once stop_check() is true."""
+        while True:
+            delay = self.delay()
+            if not delay or (stop_check and stop_check()):
+                return
+            time.sleep(min(delay, 0.5))
+
+    def success(self):
+        """A product page came through."""
+        with self.lock:
+            self.consecutive = 0
+            if self.half_open and self.clock() >= self.open_until:
+                self.half_open = self.probing = False
+                print("\n✅ Product pages are coming through again; fetching resumed.")
+
+    def failed(self):
+        """A fetch failed for another reason (network, timeout): it says nothing about throttling."""
+        with self.lock:
+            self.probing = False
+
+    def blocked(self, signature):
+        """A fetch got an interstitial; opens the breaker after `threshold` in a row, or on a failed probe."""
+        with self.lock:
+            self.blocked_pages += 1
+            self.consecutive += 1
+            probe = self.probing
+            self.probing = False
+            now = self.clock()
+            if now < self.open_until or self.gave_up:
+                return      # Fetches that were in flight when the breaker opened
+            if not probe and self.consecutive < self.threshold:
+                return
+            self.trips += 1
+            self.consecutive = 0
+            if self.trips > self.max_trips:
+                self.gave_up = True
+                print(f"\n🛑 Still getting {signature} pages after {self.max_trips} pauses; "
+                      "the remaining books are kept for the next run.")
+                return
+            pause = min(self.max_pause, self.pause * 2 ** (self.trips - 1)) * random.uniform(1, 1.25)
+            self.open_until = now + pause
+            self.half_open = True
+            new_identity()
+            print(f"\n🚧 Got a {signature} page: pausing all fetching for {pause:.0f}s with a new user agent "
+                  f"and sessions (pause {self.trips} of {self.max_trips}).")
+
+    def summary(self):
+        return {"blocked_pages": self.blocked_pages, "trips": self.trips, "gave_up": self.gave_up}
+
+
+def from_config(settings):
+    """CircuitBreaker from the 'scraping.robot_check' config section, or None when disabled."""
+    if not settings.get("enabled", True):
+        return None
+    options = {key: settings.get(key, default) for key, default in DEFAULT_SETTINGS.items()}
+    return CircuitBreaker(**options)
@@ -0,0 +1,310 @@
+"""
+Long-running scrape scheduler with per-wishlist cron/interval schedules.
+
+Unlike `run_scheduler` (one global time, config reloaded and drivers started
+from scratch on every run), the daemon keeps warm resources between runs and
+gives every wishlist its own schedule from the 'daemon' config section:
+
+    "daemon": {
+        "default": {"interval_minutes": 1440},
+        "jitter_seconds": 300,
+        "wishlists": {
+            "IT Books": {"cron": "30 2 * * *", "priority": 0},
+            "Penguin Books": {"interval_minutes": 360, "jitter_seconds": 60}
+        }
+    }
+
+Runs execute one at a time on the daemon thread, so they never overlap; when
+several wishlists are due together the lowest priority number goes first.
+Next-run times and last-run stats are written to a status file after every
+change.
+"""
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from atomic_write import atomic_open
+
+STATUS_FILE = "daemon_status.json"
+LOCK_FILE = "daemon.lock"
+
+# --- Schedules ---
+
+_CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+
+def _parse_cron_field(field, low, high):
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/")
+            step = int(step)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-"))
+        else:
+            start = end = int(part)
+            if step != 1:
+                end = high
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field '{field}' out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Standard 5-field cron: minute hour day-of-month month day-of-week (0 = Sunday)."""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expression}'")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_cron_field(f, low, high) for f, (low, high) in zip(fields, _CRON_RANGES))
+        # Cron semantics: if both day fields are restricted, either may match.
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        if self.any_day:
+            return weekday_ok
+        if self.any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, timestamp):
+        moment = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 4)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+                continue
+            if moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+                continue
+            return moment.timestamp()
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+    def describe(self):
+        return f"cron '{self.expression}'"
+
+
+class IntervalSchedule:
+    def __init__(self, minutes):
+        if minutes <= 0:
+            raise ValueError("interval_minutes must be positive")
+        self.seconds = minutes * 60
+
+    def next_after(self, timestamp):
+        return timestamp + self.seconds
+
+    def describe(self):
+        return f"every {self.seconds / 60:g} min"
+
+
+def parse_schedule(spec):
+    if spec.get("cron"):
+        return CronSchedule(spec["cron"])
+    return IntervalSchedule(spec.get("interval_minutes", 1440))
+
+
+class ScheduleEntry:
+    def __init__(self, wishlist, schedule, priority=10, jitter=0):
+        self.wishlist = wishlist
+        self.name = wishlist["name"]
+        self.schedule = schedule
+        self.priority = priority
+        self.jitter = jitter
+        self.next_run = None
+        self.last_run = None
+
+    def plan(self, after):
+        self.next_run = self.schedule.next_after(after) + random.uniform(0, self.jitter)
+
+
+def legacy_default(config):
+    """Translates the old global 'schedule' section (daily/weekly at HH:MM) into a cron spec."""
+    legacy = config.get("schedule", {})
+    hour, minute = legacy.get("time", "02:00").split(":")
+    weekday = "1" if legacy.get("frequency", "daily") == "weekly" else "*"
+    return {"cron": f"{int(minute)} {int(hour)} * * {weekday}"}
+
+
+def build_entries(config, previous=None):
+    """ScheduleEntry per configured wishlist; keeps next-run/last-run state of `previous` entries."""
+    daemon = config.get("daemon", {})
+    default = daemon.get("default") or legacy_default(config)
+    global_jitter = daemon.get("jitter_seconds", 300)
+    per_wishlist = daemon.get("wishlists", {})
+    old = {e.name: e for e in previous or []}
+    entries = []
+    for wishlist in config.get("wishlists", []):
+        spec = dict(default)
+        spec.update(per_wishlist.get(wishlist["name"], {}))
+        if not spec.get("enabled", True):
+            continue
+        entry = ScheduleEntry(wishlist, parse_schedule(spec), spec.get("priority", 10),
+                              spec.get("jitter_seconds", global_jitter))
+        if wishlist["name"] in old:
+            entry.last_run = old[wishlist["name"]].last_run
+            entry.next_run = old[wishlist["name"]].next_run
+        entries.append(entry)
+    return entries
+
+
+# --- Daemon ---
+
+class SchedulerDaemon:
+    """
+    `run_fn(wishlist, config)` scrapes one wishlist and returns its books;
+    `load_config()` is re-read only when the config file changes.
+    """
+
+    def __init__(self, load_config, run_fn, output_dir, config_path=None, run_on_start=False):
+        self.load_config = load_config
+        self.run_fn = run_fn
+        self.output_dir = output_dir
+        self.config_path = config_path
+        self.run_on_start = run_on_start
+        self.status_path = os.path.join(output_dir, STATUS_FILE)
+        self.lock_path = os.path.join(output_dir, LOCK_FILE)
+        self.config = None
+        self.entries = []
+        self.running = None
+        self._config_mtime = None
+
+    def _reload_if_changed(self):
+        mtime = os.path.getmtime(self.config_path) if self.config_path and os.path.exists(self.config_path) else None
+        if self.entries and mtime == self._config_mtime:
+            return
+        self._config_mtime = mtime
+        first_load = not self.entries
+        self.config = self.load_config()
+        self.entries = build_entries(self.config, self.entries)
+        now = time.time()
+        for entry in self.entries:
+            if entry.next_run is None:
+                if first_load and self.run_on_start:
+                    entry.next_run = now + random.uniform(0, entry.jitter)
+                else:
+                    entry.plan(now)
+        if not first_load:
+            print("🔄 Configuration changed; schedules reloaded.")
+        self.write_status()
+
+    def due_entry(self, now):
+        due = [e for e in self.entries if e.next_run is not None and e.next_run <= now]
+        if not due:
+            return None
+        return min(due, key=lambda e: (e.priority, e.next_run))
+
+    def run_entry(self, entry):
+        self.running = entry.name
+        self.write_status()
+        started = time.time()
+        stats = {"started": datetime.fromtimestamp(started).isoformat(timespec="seconds")}
+        print(f"\n⏰ {stats['started']} Running '{entry.name}' ({entry.schedule.describe()})")
+        try:
+            books = self.run_fn(entry.wishlist, self.config) or []
+            stats.update(status="ok", books=len(books))
+        except Exception as e:
+            print(f"Error in scheduled run for '{entry.name}': {e}")
+            stats.update(status="error", error=str(e))
+        finished = time.time()
+        stats["duration_seconds"] = round(finished - started, 1)
+        entry.last_run = stats
+        # Planned from the finish time, so a long run can never queue up a backlog of itself.
+        entry.plan(finished)
+        self.running = None
+        self.write_status()
+
+    def status(self):
+        return {
+            "pid": os.getpid(),
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "running": self.running,
+            "wishlists": [{
+                "name": e.name,
+                "schedule": e.schedule.describe(),
+                "priority": e.priority,
+                "next_run": datetime.fromtimestamp(e.next_run).isoformat(timespec="seconds") if e.next_run else None,
+                "last_run": e.last_run,
+            } for e in sorted(self.entries, key=lambda e: e.next_run or 0)],
+        }
+
+    def write_status(self):
+        with atomic_open(self.status_path) as f:
+            json.dump(self.status(), f, indent=4, ensure_ascii=False)
+
+    def _acquire_lock(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if os.path.exists(self.lock_path):
+            with open(self.lock_path, "r") as f:
+                pid = f.read().strip()
+            if pid.isdigit() and _pid_alive(int(pid)):
+                raise RuntimeError(f"Another daemon (pid {pid}) is already running; see {self.lock_path}")
+            os.remove(self.lock_path)
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+
+    def _release_lock(self):
+        try:
+            os.remove(self.lock_path)
+        except OSError:
+            pass
+
+    def run_forever(self, stop_check=lambda: False, max_sleep=30):
+        self._acquire_lock()
+        try:
+            while not stop_check():
+                self._reload_if_changed()
+                now = time.time()
+                entry = self.due_entry(now)
+                if entry:
+                    self.run_entry(entry)
+                    continue
+                upcoming = [e.next_run for e in self.entries if e.next_run]
+                wait = min(upcoming) - now if upcoming else max_sleep
+                time.sleep(max(1, min(wait, max_sleep)))
+        finally:
+            self._release_lock()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def print_status(output_dir):
+    """Prints the status file of a (possibly running) daemon."""
+    path = os.path.join(output_dir, STATUS_FILE)
+    if not os.path.exists(path):
+        print("No daemon status found. Start the daemon first.")
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        status = json.load(f)
+    print(f"\nDaemon pid {status['pid']}, updated {status['updated']}, running: {status['running'] or '-'}")
+    for w in status["wishlists"]:
+        last = w["last_run"] or {}
+        last_text = (f"{last.get('status')} {last.get('books', 0)} books in {last.get('duration_seconds')}s at {last.get('started')}"
+                     if last else "never")
+        print(f"- {w['name']:<20} next {w['next_run']}  ({w['schedule']}, priority {w['priority']})  last: {last_text}")
@@ -0,0 +1,263 @@
+"""
+Versioned, content-addressed snapshots of all_wishlists.json.
+
+The dashboard compares two versions of the combined file (all_wishlists.json
+and all_wishlists-old.json). Instead of copying them into a new webN folder
+by hand, every run records the combined file here:
+
+- objects/<aa>/<sha256>.json: each distinct snapshot stored once, read-only
+- manifest.json: the version list (oldest first) and the "current" and
+  "previous" pointers
+
+A run that produced a byte-identical file adds no version. Old versions are
+thinned by a retention policy (every version for the last `keep_last`, one per
+day for `daily_days`, then one per ISO week, optionally only for
+`weekly_weeks`), and objects no longer referenced are deleted. `publish`
+hard-links the current/previous pair into a dashboard folder.
+
+    python snapshot_store.py import web*            # Load the manual webN copies
+    python snapshot_store.py list
+    python snapshot_store.py publish web
+    python snapshot_store.py prune [--daily-days 30] [--weekly-weeks 52]
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import stat
+import uuid
+from datetime import datetime, timedelta
+
+from atomic_write import atomic_open, atomic_write
+from json_stream import iter_json_array
+
+DEFAULT_DIR = os.path.join("scraped_data", "snapshots")
+MANIFEST_FILE = "manifest.json"
+CURRENT_NAME = "all_wishlists.json"
+PREVIOUS_NAME = "all_wishlists-old.json"
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def newest_timestamp(path):
+    """The newest scraped_timestamp in the file, or None if no record has one."""
+    newest = max((r.get("scraped_timestamp") or "" for r in iter_json_array(path) if isinstance(r, dict)),
+                 default="")
+    return datetime.fromisoformat(newest) if newest else None
+
+
+def snapshot_time(path):
+    """When the snapshot was taken: its newest scraped_timestamp, else the file's modification time."""
+    return newest_timestamp(path) or datetime.fromtimestamp(os.path.getmtime(path))
+
+
+def _link_or_copy(source, destination):
+    """Atomically points `destination` at `source`'s data: a hard link where possible, else a copy."""
+    if os.path.exists(destination) and os.path.samefile(source, destination):
+        return      # Renaming a link over itself is a no-op that would leave the temporary name behind.
+    tmp_path = os.path.join(os.path.dirname(destination), f".{os.path.basename(destination)}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+class SnapshotStore:
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, "objects")
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self.versions = []
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.versions = json.load(f).get("versions", [])
+
+    # --- Lookup ---
+
+    def object_path(self, sha256):
+        return os.path.join(self.objects_dir, sha256[:2], f"{sha256}.json")
+
+    def current(self):
+        return self.versions[-1] if self.versions else None
+
+    def previous(self):
+        return self.versions[-2] if len(self.versions) > 1 else None
+
+    def find(self, when):
+        """The version that was current at `when` (a datetime), or None if it predates all of them."""
+        stamp = when.isoformat()
+        found = None
+        for version in self.versions:
+            if version["taken_at"] > stamp:
+                break
+            found = version
+        return found
+
+    # --- Recording ---
+
+    def add(self, path, taken_at=None, source=None):
+        """
+        Records `path` as a version taken at `taken_at` (default: its newest
+        scraped_timestamp). Returns (version, created); created is False when
+        the file is identical to the version it would follow or precede.
+        """
+        sha256 = file_digest(path)
+        taken_at = (taken_at or snapshot_time(path)).isoformat()
+        position = sum(1 for v in self.versions if v["taken_at"] <= taken_at)
+        neighbours = self.versions[max(0, position - 1):position + 1]
+        for version in neighbours:
+            if version["sha256"] == sha256:
+                return version, False
+
+        object_path = self.object_path(sha256)
+        if not os.path.exists(object_path):
+            with open(path, "rb") as src, atomic_open(object_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.chmod(object_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        version = {
+            "taken_at": taken_at, "sha256": sha256, "bytes": os.path.getsize(path),
+            "items": sum(1 for _ in iter_json_array(path)), "source": source or path,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.versions.insert(position, version)
+        self.save()
+        return version, True
+
+    def save(self):
+        current, previous = self.current(), self.previous()
+        manifest = {
+            "current": current["sha256"] if current else None,
+            "previous": previous["sha256"] if previous else None,
+            "versions": self.versions,
+        }
+        atomic_write(self.manifest_path, json.dumps(manifest, indent=4))
+
+    # --- Retention ---
+
+    def apply_retention(self, now=None, keep_last=2, daily_days=30, weekly_weeks=None):
+        """Drops versions outside the policy, deletes unreferenced objects; returns the dropped versions."""
+        now = now or datetime.now()
+        daily_cutoff = now - timedelta(days=daily_days)
+        weekly_cutoff = daily_cutoff - timedelta(weeks=weekly_weeks) if weekly_weeks is not None else None
+        kept, buckets = [], set()
+        # Newest first, so each day/week bucket keeps its latest version.
+        for i, version in enumerate(reversed(self.versions)):
+            moment = datetime.fromisoformat(version["taken_at"])
+            if i < keep_last:
+                bucket = ("version", i)
+            elif moment >= daily_cutoff:
+                bucket = ("day", moment.date())
+            elif weekly_cutoff is None or moment >= weekly_cutoff:
+                bucket = ("week",) + tuple(moment.isocalendar())[:2]
+            else:
+                continue
+            if bucket not in buckets:
+                buckets.add(bucket)
+                kept.append(version)
+        kept.reverse()
+        dropped = [v for v in self.versions if v not in kept]
+        if dropped:
+            self.versions = kept
+            self.save()
+        self.collect_garbage()
+        return dropped
+
+    def collect_garbage(self):
+        """Deletes objects no version refers to; returns the number removed."""
+        referenced = {v["sha256"] for v in self.versions}
+        removed = 0
+        for path in glob.glob(os.path.join(self.objects_dir, "*", "*.json")):
+            if os.path.basename(path)[:-len(".json")] not in referenced:
+                os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+                os.remove(path)
+                removed += 1
+        return removed
+
+    # --- Dashboard ---
+
+    def publish(self, web_dir, current_name=CURRENT_NAME, previous_name=PREVIOUS_NAME):
+        """Points web_dir/all_wishlists.json and all_wishlists-old.json at the current and previous versions."""
+        os.makedirs(web_dir, exist_ok=True)
+        for version, name in ((self.current(), current_name), (self.previous(), previous_name)):
+            if version is not None:
+                _link_or_copy(self.object_path(version["sha256"]), os.path.join(web_dir, name))
+
+
+def find_copies(paths):
+    """all_wishlists*.json files in the given folders (or the paths themselves), in natural folder order."""
+    files = []
+    # Natural folder order (web2 before web10), the best guide for copies without timestamps.
+    for path in sorted(paths, key=lambda p: [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", p)]):
+        files.extend(sorted(glob.glob(os.path.join(path, "all_wishlists*.json"))) if os.path.isdir(path) else [path])
+    return files
+
+
+def date_copies(paths):
+    """
+    [(taken_at, path)] sorted by time. Copies without any scraped_timestamp
+    (older scraper versions) are dated like the copy listed before them, so
+    `paths` should be in folder order.
+    """
+    dated = []
+    for path in paths:
+        try:
+            dated.append([newest_timestamp(path), path])
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"Skipping {path}: {e}")
+    known = [taken_at for taken_at, _ in dated if taken_at]
+    previous = min(known) if known else datetime.now()
+    for entry in dated:
+        entry[0] = previous = entry[0] or previous
+    return [tuple(entry) for entry in sorted(dated, key=lambda entry: entry[0])]
+
+
+def import_files(store, paths):
+    """Adds existing copies (e.g. web*/all_wishlists*.json) in time order; prints a dedup summary."""
+    dated = date_copies(paths)
+    total_bytes = created = 0
+    for taken_at, path in dated:
+        total_bytes += os.path.getsize(path)
+        created += store.add(path, taken_at, source=path)[1]
+    stored = sum(os.path.getsize(store.object_path(sha)) for sha in {v["sha256"] for v in store.versions})
+    print(f"Imported {len(dated)} files ({total_bytes / 1024 / 1024:.1f} MB): {created} new versions, "
+          f"{len(dated) - created} duplicates. Store holds {len(store.versions)} versions in "
+          f"{stored / 1024 / 1024:.1f} MB.")
+    return created
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned all_wishlists.json snapshots")
+    parser.add_argument("--dir", default=DEFAULT_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    import_cmd = sub.add_parser("import", help="add all_wishlists*.json files from the given folders or paths")
+    import_cmd.add_argument("paths", nargs="+")
+    sub.add_parser("list", help="list the stored versions")
+    publish_cmd = sub.add_parser("publish", help="link the current/previous pair into a dashboard folder")
+    publish_cmd.add_argument("web_dir")
+    prune_cmd = sub.add_parser("prune", help="apply the retention policy")
+    prune_cmd.add_argument("--daily-days", type=int, default=30)
+    prune_cmd.add_argument("--weekly-weeks", type=int, default=None)
+    args = parser.parse_args()
+
+    snapshots = SnapshotStore(args.dir)
+    if args.command == "import":
+        import_files(snapshots, find_copies(args.paths))
+    elif args.command == "list":
+        for v in snapshots.versions:
+            print(f"{v['taken_at'][:19]}  {v['sha256'][:12]}  {v['items']:5d} items  {v['bytes']:8d} bytes  {v['source']}")
+    elif args.command == "publish":
+        snapshots.publish(args.web_dir)
+        print(f"Published the current and previous snapshots to {args.web_dir}")
+    else:
+        dropped = snapshots.apply_retention(daily_days=args.daily_days, weekly_weeks=args.weekly_weeks)
+        print(f"Dropped {len(dropped)} versions; {len(snapshots.versions)} kept.")
@@ -0,0 +1,100 @@
+"""
+A writer killed with SIGKILL in the middle of writing historical_data.json must
+leave the file loadable with its old contents, and no temporary file behind.
+
+Each test starts a child process that writes to a large history through
+atomic_open or append_json_array, waits until the child reports that it is
+partway through the write, kills it and checks the file.
+
+    python -m pytest tests
+"""
+import glob
+import json
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from json_stream import append_json_array, write_json_array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORDS = 20000
+
+# The child prints "writing" once part of the new file is written, then hangs until killed.
+WRITER = """
+import sys
+import time
+
+import json_stream
+from atomic_write import atomic_open
+
+mode, path = sys.argv[1], sys.argv[2]
+new = [{"title": f"New book {i}", "price": i, "link": f"https://www.amazon.in/dp/N{i:09d}"} for i in range(50000)]
+
+def hang():
+    print("writing", flush=True)
+    time.sleep(60)
+
+if mode == "append":
+    # append_json_array copies the existing records into the temporary file, then formats the new ones
+    format_record = json_stream._format_record
+    def slow_format(record, calls=[]):
+        if not calls:
+            calls.append(record)
+            hang()
+        return format_record(record)
+    json_stream._format_record = slow_format
+    json_stream.append_json_array(path, new)
+else:
+    with atomic_open(path, backups=1) as f:
+        json_stream.write_records(f, new[:25000])
+        f.flush()
+        hang()
+"""
+
+
+def _history(directory):
+    path = os.path.join(directory, "IT Books", "historical_data.json")
+    records = [{"title": f"Book {i}", "price": 100 + i % 900, "asin": f"B{i:09d}",
+                "link": f"https://www.amazon.in/dp/B{i:09d}", "scraped_timestamp": "2026-01-01T00:00:00"}
+               for i in range(RECORDS)]
+    os.makedirs(os.path.dirname(path))
+    write_json_array(path, records)
+    return path, records
+
+
+def _kill_mid_write(mode, path):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    child = subprocess.Popen([sys.executable, "-c", WRITER, mode, path], cwd=ROOT, env=env,
+                             stdout=subprocess.PIPE, text=True)
+    try:
+        assert child.stdout.readline().strip() == "writing"
+        os.kill(child.pid, signal.SIGKILL)
+    finally:
+        child.wait(timeout=30)
+        child.stdout.close()
+    assert child.returncode == -signal.SIGKILL
+
+
+def _leftovers(path):
+    directory = os.path.dirname(path)
+    return glob.glob(os.path.join(directory, "*.tmp")) + glob.glob(os.path.join(directory, ".*.tmp"))
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+@pytest.mark.parametrize("mode", ["append", "rewrite"])
+def test_killed_writer_keeps_history(tmp_path, mode):
+    path, records = _history(str(tmp_path))
+    _kill_mid_write(mode, path)
+
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f) == records
+    assert _leftovers(path) == []
+    assert not os.path.exists(path + ".bak1")
+
+    # The next run appends to the surviving history as usual
+    append_json_array(path, [{"title": "After the crash"}])
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f) == records + [{"title": "After the crash"}]
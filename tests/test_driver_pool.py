@@ -0,0 +1,66 @@
+"""
+A driver retired while others wait for one (max_uses, recycle(), a failed
+health check) must free its slot for a waiting acquire().
+
+    python -m pytest tests
+"""
+import queue
+import threading
+
+import pytest
+
+from driver_pool import DriverPool
+
+
+class FakeDriver:
+    current_url = "about:blank"
+
+    def quit(self):
+        pass
+
+
+def _acquire_in_thread(pool):
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)), daemon=True)
+    waiter.start()
+    return waiter, acquired
+
+
+@pytest.mark.parametrize("retire", ["max_uses", "recycle", "broken"])
+def test_waiting_acquire_gets_a_replacement(retire):
+    pool = DriverPool(FakeDriver, size=1, max_uses=1 if retire == "max_uses" else 200)
+    busy = pool.acquire()
+    waiter, acquired = _acquire_in_thread(pool)
+    waiter.join(0.2)
+    assert waiter.is_alive()        # The pool is full, so it waits
+
+    if retire == "recycle":
+        pool.recycle()
+    pool.release(busy, broken=retire == "broken")
+    waiter.join(5)
+    assert not waiter.is_alive()
+    assert acquired and acquired[0] is not busy
+
+
+def test_acquire_times_out_when_every_driver_is_busy():
+    pool = DriverPool(FakeDriver, size=1)
+    pool.acquire()
+    with pytest.raises(queue.Empty):
+        pool.acquire(timeout=0.1)
+
+
+def test_workers_share_a_pool_that_keeps_retiring_drivers():
+    pool = DriverPool(FakeDriver, size=2, max_uses=3)
+    done = []
+
+    def work():
+        for _ in range(20):
+            pool.release(pool.acquire(timeout=5))
+        done.append(True)
+
+    workers = [threading.Thread(target=work, daemon=True) for _ in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(10)
+    assert len(done) == 6
@@ -1,361 +1,56 @@
 import time
 import csv
-import re
 import json
 import signal
 import sys
 import os
-import keyboard
-import schedule
+import re
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException
+# Enumeration, fetching and extraction come from the amazon_wishlist package, which imports
+# Selenium and lxml on first use; `schedule` and `keyboard` are imported by the functions
+# that use them: managing wishlists needs none of them, and `keyboard` needs root on Linux.
+from atomic_write import atomic_open
+from amazon_wishlist import app
 
 books_global = []
-current_book = 0
-total_books = 0
 stop_requested = False
 CONFIG_FILE = "wishlist_config.json"
 DEFAULT_OUTPUT_DIR = "scraped_data"
-
-def setup_driver():
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")  
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920x1080")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-notifications")
-    chrome_options.add_argument("--disable-popup-blocking")
-    chrome_options.add_argument("--log-level=3")
-    chrome_options.add_argument("--silent")
-    chrome_options.add_argument("--enable-unsafe-swiftshader")
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36")
-    
-    driver = webdriver.Chrome(options=chrome_options)
-    return driver
-
-def extract_price(price_text):
-    if not price_text:
-        return None
-    
-    price_match = re.search(r'₹\s*([\d,]+\.\d+|[\d,]+)', price_text)
-    if price_match:
-        return float(price_match.group(1).replace(',', ''))
-    return None
-
-def get_book_details(driver, link):
-    try:
-        print(f"Processing: {link.split('/')[-2] if '/' in link else link}")
-        
-        driver.get(link)
-        time.sleep(2)
-        
-        page_count = None
-        review_count = None
-        
-        methods = [
-            lambda: find_pages_in_detail_bullets(driver),
-            lambda: find_pages_in_tech_details(driver),
-            lambda: find_pages_in_description(driver),
-            lambda: find_pages_in_book_info(driver)
-        ]
-        
-        for method in methods:
-            try:
-                result = method()
-                if result:
-                    page_count = result
-                    break
-            except (NoSuchElementException, TimeoutException, StaleElementReferenceException):
-                continue
-        
-        review_selectors = [
-            (By.ID, "acrCustomerReviewText"),
-            (By.CSS_SELECTOR, "span[data-hook='total-review-count']"),
-            (By.CSS_SELECTOR, "#averageCustomerReviews #acrCustomerReviewText")
-        ]
-        
-        for selector_type, selector_value in review_selectors:
-            try:
-                review_element = WebDriverWait(driver, 2).until(
-                    EC.presence_of_element_located((selector_type, selector_value))
-                )
-                review_text = review_element.text
-                review_match = re.search(r'([\d,]+)', review_text)
-                if review_match:
-                    review_count = int(review_match.group(1).replace(',', ''))
-                    break
-            except (NoSuchElementException, TimeoutException, StaleElementReferenceException):
-                continue
-                
-        return page_count, review_count
-        
-    except Exception as e:
-        print(f"Error extracting details for {link}")
-        return None, None
-
-def find_pages_in_detail_bullets(driver):
-    try:
-        detail_bullets = WebDriverWait(driver, 3).until(
-            EC.presence_of_element_located((By.ID, "detailBullets_feature_div"))
-        )
-        
-        detail_items = detail_bullets.find_elements(By.CLASS_NAME, "a-list-item")
-        for item in detail_items:
-            text = item.text.lower()
-            if "page" in text:
-                page_match = re.search(r'(\d+)\s*pages', text)
-                if page_match:
-                    return int(page_match.group(1))
-    except (NoSuchElementException, TimeoutException, StaleElementReferenceException):
-        pass
-    return None
-
-def find_pages_in_tech_details(driver):
-    try:
-        table_ids = ["productDetails_techSpec_section_1", "productDetails_detailBullets_sections1"]
-        
-        for table_id in table_ids:
-            try:
-                table = driver.find_element(By.ID, table_id)
-                rows = table.find_elements(By.TAG_NAME, "tr")
-                for row in rows:
-                    text = row.text.lower()
-                    if "page" in text:
-                        page_match = re.search(r'(\d+)', text)
-                        if page_match:
-                            return int(page_match.group(1))
-            except NoSuchElementException:
-                continue
-    except Exception:
-        pass
-    return None
-
-def find_pages_in_description(driver):
-    try:
-        description = driver.find_element(By.ID, "productDescription")
-        text = description.text.lower()
-        page_match = re.search(r'(\d+)\s*pages', text)
-        if page_match:
-            return int(page_match.group(1))
-    except (NoSuchElementException, StaleElementReferenceException):
-        pass
-    return None
-
-def find_pages_in_book_info(driver):
-    try:
-        tables = driver.find_elements(By.TAG_NAME, "table")
-        for table in tables:
-            text = table.text.lower()
-            if "page" in text:
-                page_match = re.search(r'(\d+)\s*pages', text)
-                if page_match:
-                    return int(page_match.group(1))
-    except (NoSuchElementException, StaleElementReferenceException):
-        pass
-    return None
-
-def print_progress_bar(iteration, total, prefix='', suffix='', length=50, fill='█'):
-    if total == 0:
-        return
-        
-    percent = int(100 * (iteration / float(total)))
-    filled_length = int(length * iteration // total)
-    bar = fill * filled_length + '-' * (length - filled_length)
-    
-    print(f'\r{prefix} |{bar}| {percent}% {suffix}', end='\r')
-    
-    if iteration == total:
-        print()
+FIELDS = ["title", "price", "pages", "reviews", "value_per_page", "link", "wishlist_name"]
 
 def handle_keyboard_interrupt(*args):
-    global stop_requested, books_global
+    global stop_requested
     
     if not stop_requested:
-        print("\nStop requested. Saving current results...")
-        stop_requested = True
-        
-        if books_global:
-            save_results(books_global)
-            print(f"Saved {len(books_global)} books to files. Terminating...")
-        
-        time.sleep(1)
+        print("\nStop requested. Finishing the books in progress and saving current results...")
+        stop_requested = app.stop_requested = True
+    else:
         sys.exit(0)
 
 def scrape_wishlist(wishlist_data):
-    global books_global, current_book, total_books, stop_requested
+    """Enumerates a wishlist and scrapes its books through the package pipeline."""
+    global books_global
     
     wishlist_url = wishlist_data["url"]
     wishlist_name = wishlist_data["name"]
-    
-    driver = setup_driver()
+    app.configure(load_config())
     books = []
     
     try:
         print(f"Loading wishlist: {wishlist_name} - {wishlist_url}")
-        driver.get(wishlist_url)
-        time.sleep(3)
-        
-        try:
-            cookie_button = WebDriverWait(driver, 3).until(
-                EC.element_to_be_clickable((By.ID, "sp-cc-accept"))
-            )
-            cookie_button.click()
-            time.sleep(1)
-        except (TimeoutException, NoSuchElementException):
-            pass
-        
-        print("Scrolling to load all books...")
-        scroll_to_load_all_items(driver)
-        
-        book_links = []
-        book_titles = []
-        book_prices = []
-        
-        item_containers = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li[data-itemid]"))
-        )
+        book_data_list = app.enumerate_wishlist(wishlist_data)
+        print(f"Total unique books found: {len(book_data_list)}")
         
-        print(f"Found {len(item_containers)} potential book items")
+        with app.make_pipeline() as pipeline:
+            records = pipeline.scrape(book_data_list, "Processing books")
+        books = [{field: record.get(field) for field in FIELDS} for record in records]
+        books_global = books.copy()
         
-        for item in item_containers:
-            if stop_requested:
-                break
-                
-            try:
-                try:
-                    title_element = item.find_element(By.CSS_SELECTOR, "h2 a")
-                    book_title = title_element.text.strip()
-                    book_link = title_element.get_attribute("href")
-                    
-                    if book_title and book_link and book_link not in book_links:
-                        book_titles.append(book_title)
-                        book_links.append(book_link)
-                        
-                        try:
-                            price_element = item.find_element(By.CSS_SELECTOR, ".a-price .a-offscreen")
-                            price_text = price_element.get_attribute("innerHTML")
-                            price = extract_price(price_text)
-                            book_prices.append(price)
-                        except (NoSuchElementException, StaleElementReferenceException):
-                            try:
-                                price_element = item.find_element(By.CSS_SELECTOR, ".a-color-price")
-                                price_text = price_element.text
-                                price = extract_price(price_text)
-                                book_prices.append(price)
-                            except (NoSuchElementException, StaleElementReferenceException):
-                                book_prices.append(None)
-                        
-                        print(f"Found book: {book_title}")
-                except (NoSuchElementException, StaleElementReferenceException):
-                    continue
-            except Exception as e:
-                print(f"Error finding book elements")
-                continue
-        
-        total_books = len(book_links)
-        print(f"Total unique books found: {total_books}")
-        
-        for i, book_link in enumerate(book_links):
-            if stop_requested:
-                break
-                
-            current_book = i + 1
-            
-            print_progress_bar(current_book, total_books, 
-                            prefix=f'Processing books: {current_book}/{total_books}',
-                            suffix='Complete', length=50)
-            
-            try:
-                book_title = book_titles[i] if i < len(book_titles) else f"Book {i+1}"
-                price = book_prices[i] if i < len(book_prices) else None
-                
-                page_count, review_count = get_book_details(driver, book_link)
-                
-                value_per_page = None
-                if page_count and price and price > 0:
-                    value_per_page = price / page_count
-                
-                book_data = {
-                    "title": book_title,
-                    "price": price,
-                    "pages": page_count,
-                    "reviews": review_count,
-                    "link": book_link,
-                    "value_per_page": value_per_page,
-                    "wishlist_name": wishlist_name
-                }
-                
-                books.append(book_data)
-                books_global = books.copy()
-                
-                if current_book % 5 == 0:
-                    save_results(books, wishlist_name)
-                    
-            except Exception as e:
-                print(f"\nError processing book {current_book}")
-                continue
-            
     except Exception as e:
         print(f"Error in scrape_wishlist: {e}")
     
-    finally:
-        driver.quit()
-    
     return books
 
-def scroll_to_load_all_items(driver, max_scroll_attempts=12, scroll_pause_time=1.5):
-    global stop_requested
-    
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    
-    last_item_count = 0
-    no_change_count = 0
-    
-    try:
-        for scroll_attempt in range(max_scroll_attempts):
-            if stop_requested:
-                break
-                
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            
-            time.sleep(scroll_pause_time)
-            
-            items = driver.find_elements(By.CSS_SELECTOR, "li[data-itemid]")
-            current_item_count = len(items)
-            
-            print(f"Scroll {scroll_attempt+1}/{max_scroll_attempts}: Found {current_item_count} items")
-            
-            if current_item_count == last_item_count:
-                no_change_count += 1
-                if no_change_count >= 3:
-                    print("No new items loaded after multiple scrolls. Assuming all items are loaded.")
-                    break
-            else:
-                no_change_count = 0
-                
-            last_item_count = current_item_count
-            
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.8);")
-                time.sleep(scroll_pause_time)
-                
-                newer_height = driver.execute_script("return document.body.scrollHeight")
-                if newer_height == new_height:
-                    print("Reached end of page - no more scrolling needed")
-                    break
-                    
-            last_height = new_height
-    except Exception as e:
-        print(f"Error while scrolling")
-
 def ensure_directory_exists(directory):
     if not os.path.exists(directory):
         os.makedirs(directory)
@@ -380,7 +75,7 @@ def save_results(books, wishlist_name=None):
 def save_to_csv(books, filename):
     fieldnames = ["title", "price", "pages", "reviews", "value_per_page", "link", "wishlist_name"]
     
-    with open(filename, "w", newline="", encoding="utf-8") as csvfile:
+    with atomic_open(filename, newline="") as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
         for book in books:
@@ -389,7 +84,7 @@ def save_to_csv(books, filename):
     print(f"\nData saved to {filename}")
 
 def save_to_json(books, filename):
-    with open(filename, "w", encoding="utf-8") as jsonfile:
+    with atomic_open(filename) as jsonfile:
         json.dump(books, jsonfile, indent=4, ensure_ascii=False)
     
     print(f"Data saved to {filename}")
@@ -418,7 +113,7 @@ def load_config():
             with open(CONFIG_FILE, "r", encoding="utf-8") as f:
                 return json.load(f)
         else:
-            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+            with atomic_open(CONFIG_FILE) as f:
                 json.dump(default_config, f, indent=4)
             return default_config
     except Exception as e:
@@ -427,7 +122,7 @@ def load_config():
 
 def save_config(config):
     try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+        with atomic_open(CONFIG_FILE) as f:
             json.dump(config, f, indent=4)
         print(f"Configuration saved to {CONFIG_FILE}")
     except Exception as e:
@@ -632,6 +327,7 @@ def run_scheduled_task():
         print("No books were scraped.")
 
 def run_scheduler():
+    import schedule
     config = load_config()
     schedule_config = config.get("schedule", {})
     
@@ -659,8 +355,12 @@ def run_scheduler():
 def main():
     global stop_requested
     
-    keyboard.add_hotkey('ctrl+c', handle_keyboard_interrupt)
     signal.signal(signal.SIGINT, handle_keyboard_interrupt)
+    try:
+        import keyboard     # Global hotkey on top of SIGINT; optional, and root-only on Linux
+        keyboard.add_hotkey('ctrl+c', handle_keyboard_interrupt)
+    except (ImportError, OSError):
+        pass
     
     config = load_config()
     
@@ -694,12 +394,19 @@ def main():
                         save_results(books, wishlist["name"])
                 except Exception as e:
                     print(f"Error processing wishlist '{wishlist['name']}': {e}")
+                
+                if stop_requested:
+                    break
             
             if all_books:
                 save_results(all_books)
                 print(f"Total books scraped: {len(all_books)}")
             else:
                 print("No books were scraped.")
+            
+            if stop_requested:
+                print("Terminating...")
+                break
                 
         elif choice == "2":
             view_wishlists(config)
@@ -719,6 +426,10 @@ def main():
                         print(f"Successfully scraped {len(books)} books from '{wishlist['name']}'")
                     else:
                         print("No books were found in this wishlist.")
+                    
+                    if stop_requested:
+                        print("Terminating...")
+                        break
                 else:
                     print("Invalid selection.")
             except ValueError: